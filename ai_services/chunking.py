@@ -0,0 +1,68 @@
+"""
+Splits long texts into overlapping passages that fit the embedding model.
+
+all-mpnet-base-v2 truncates its input at 384 word pieces, so a long email
+embedded in one piece is only represented by its opening. Spans are
+(start, end) character offsets into the original text, so the matching
+passage can be shown back to the user verbatim.
+"""
+from typing import List, Sequence, Tuple
+
+# ~384 word pieces of French prose, with some margin.
+DEFAULT_CHUNK_CHARS = 1000
+DEFAULT_CHUNK_OVERLAP = 200
+
+# Preferred cut points, strongest first.
+_BREAKS = ("\n\n", "\n", ". ", "? ", "! ", "; ", ", ", " ")
+
+
+def _find_break(text: str, start: int, end: int) -> int:
+    """Last natural boundary in the second half of [start, end), else end."""
+    floor = start + (end - start) // 2
+    for marker in _BREAKS:
+        position = text.rfind(marker, floor, end)
+        if position != -1:
+            return position + len(marker)
+    return end
+
+
+def chunk_spans(
+    text: str,
+    max_chars: int = DEFAULT_CHUNK_CHARS,
+    overlap: int = DEFAULT_CHUNK_OVERLAP,
+) -> List[Tuple[int, int]]:
+    """Returns overlapping (start, end) spans covering the non-blank text."""
+    if not text or not text.strip():
+        return []
+    overlap = max(0, min(overlap, max_chars // 2))
+
+    spans = []
+    length = len(text)
+    start = len(text) - len(text.lstrip())
+    while start < length:
+        end = min(length, start + max_chars)
+        if end < length:
+            end = _find_break(text, start, end)
+        spans.append((start, end))
+        if end >= length:
+            break
+        next_start = max(end - overlap, start + 1)
+        # Resume on a word boundary so passages never start mid-word.
+        boundary = text.find(" ", next_start, end)
+        start = boundary + 1 if boundary != -1 else next_start
+        while start < length and text[start].isspace():
+            start += 1
+    return spans
+
+
+def mean_pool(vectors: Sequence[Sequence[float]]) -> List[float]:
+    """L2-normalized mean of unit vectors (cosine-friendly parent vector)."""
+    dimensions = len(vectors[0])
+    pooled = [0.0] * dimensions
+    for vector in vectors:
+        for i, value in enumerate(vector):
+            pooled[i] += value
+    norm = sum(value * value for value in pooled) ** 0.5
+    if not norm:
+        return list(vectors[0])
+    return [value / norm for value in pooled]
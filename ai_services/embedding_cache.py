@@ -0,0 +1,138 @@
+"""
+Two-tier cache for sentence embeddings.
+
+Tier 1 is a bounded in-process LRU, tier 2 is the EmbeddingCache table.
+Keys are a SHA-256 of the embedding model name and the whitespace-normalized
+text, so a repeated search query or an unchanged fragment never reaches the
+transformer forward pass again.
+"""
+import hashlib
+import logging
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MEMORY_SIZE = 2048
+
+
+def normalize_text(text: Optional[str]) -> Optional[str]:
+    """Collapses whitespace; the tokenizer ignores it, so vectors are unchanged."""
+    if text is None:
+        return None
+    normalized = " ".join(text.split())
+    return normalized or None
+
+
+def cache_key(normalized_text: str, model_name: str) -> str:
+    digest = hashlib.sha256()
+    digest.update(model_name.encode("utf-8"))
+    digest.update(b"\x00")
+    digest.update(normalized_text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class EmbeddingLRU:
+    """Thread-safe bounded LRU mapping cache keys to embedding vectors."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            vector = self._data.get(key)
+            if vector is not None:
+                self._data.move_to_end(key)
+            return vector
+
+    def set(self, key: str, vector: List[float]) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = vector
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_memory_cache = EmbeddingLRU(getattr(settings, "EMBEDDING_CACHE_SIZE", DEFAULT_MEMORY_SIZE))
+
+
+def _persistent_enabled() -> bool:
+    return getattr(settings, "EMBEDDING_CACHE_PERSISTENT", True)
+
+
+def get_many(keys: Iterable[str], model_name: str) -> Dict[str, List[float]]:
+    """Returns the cached vectors for the given keys (memory first, then DB)."""
+    found: Dict[str, List[float]] = {}
+    missing = []
+    for key in dict.fromkeys(keys):
+        vector = _memory_cache.get(key)
+        if vector is not None:
+            found[key] = list(vector)
+        else:
+            missing.append(key)
+
+    if not missing or not _persistent_enabled():
+        return found
+
+    from .models import EmbeddingCache
+
+    try:
+        with transaction.atomic():
+            rows = list(
+                EmbeddingCache.objects.filter(
+                    model_name=model_name, content_hash__in=missing
+                ).values_list("content_hash", "embedding")
+            )
+    except DatabaseError:
+        logger.warning("Embedding cache lookup failed; falling back to encoding.", exc_info=True)
+        return found
+
+    for key, embedding in rows:
+        vector = [float(value) for value in embedding]
+        _memory_cache.set(key, vector)
+        found[key] = list(vector)
+    return found
+
+
+def set_many(vectors: Dict[str, List[float]], model_name: str) -> None:
+    """Stores freshly computed vectors in both tiers."""
+    if not vectors:
+        return
+    for key, vector in vectors.items():
+        _memory_cache.set(key, list(vector))
+
+    if not _persistent_enabled():
+        return
+
+    from .models import EmbeddingCache
+
+    try:
+        with transaction.atomic():
+            EmbeddingCache.objects.bulk_create(
+                [
+                    EmbeddingCache(model_name=model_name, content_hash=key, embedding=vector)
+                    for key, vector in vectors.items()
+                ],
+                ignore_conflicts=True,
+            )
+    except DatabaseError:
+        logger.warning("Embedding cache write failed; vectors kept in memory only.", exc_info=True)
+
+
+def clear_memory_cache() -> None:
+    _memory_cache.clear()
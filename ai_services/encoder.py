@@ -0,0 +1,52 @@
+"""
+Raw sentence-transformer encoding, without any Django import.
+
+Kept separate from ai_services.services so it can be loaded as-is by the
+worker processes of the embedding backfill pipeline.
+"""
+from threading import Lock
+from typing import List, Optional
+
+EMBED_MODEL_NAME = "all-mpnet-base-v2"
+DEFAULT_ENCODE_BATCH_SIZE = 16
+
+_EMBED_MODEL = None
+_EMBED_MODEL_LOCK = Lock()
+
+
+def get_embed_model():
+    global _EMBED_MODEL
+    if _EMBED_MODEL is None:
+        from sentence_transformers import SentenceTransformer
+        with _EMBED_MODEL_LOCK:
+            if _EMBED_MODEL is None:
+                _EMBED_MODEL = SentenceTransformer(EMBED_MODEL_NAME)
+    return _EMBED_MODEL
+
+
+def set_torch_threads(num_threads: Optional[int]) -> None:
+    """Sets torch intra-op parallelism for this process (None keeps the default)."""
+    if not num_threads:
+        return
+    import torch
+    torch.set_num_threads(num_threads)
+
+
+def encode_texts(texts: List[str], batch_size: int = DEFAULT_ENCODE_BATCH_SIZE) -> List[List[float]]:
+    """Runs the forward pass on already-cleaned texts; no caching."""
+    if not texts:
+        return []
+    vectors = get_embed_model().encode(
+        texts,
+        batch_size=batch_size,
+        normalize_embeddings=True,
+        convert_to_numpy=True,
+        show_progress_bar=False,
+    )
+    return [vec.tolist() for vec in vectors]
+
+
+def init_worker(num_threads: Optional[int] = None) -> None:
+    """ProcessPoolExecutor initializer: pins threads and loads the model once."""
+    set_torch_threads(num_threads)
+    get_embed_model()
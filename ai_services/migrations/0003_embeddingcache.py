@@ -0,0 +1,29 @@
+# Generated by Django 5.2.4 on 2026-10-17 01:10
+
+import pgvector.django.vector
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_services', '0002_enable_pgvector_extension'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmbeddingCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_name', models.CharField(max_length=100)),
+                ('content_hash', models.CharField(max_length=64)),
+                ('embedding', pgvector.django.vector.VectorField(dimensions=768)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Embedding Cache Entry',
+                'verbose_name_plural': 'Embedding Cache Entries',
+                'constraints': [models.UniqueConstraint(fields=('model_name', 'content_hash'), name='embedding_cache_unique_key')],
+            },
+        ),
+    ]
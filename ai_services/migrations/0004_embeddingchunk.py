@@ -0,0 +1,36 @@
+# Generated by Django 5.2.4 on 2026-10-17 01:13
+
+import django.db.models.deletion
+import pgvector.django.indexes
+import pgvector.django.vector
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_services', '0003_embeddingcache'),
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmbeddingChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveIntegerField()),
+                ('chunk_index', models.PositiveIntegerField()),
+                ('start_offset', models.PositiveIntegerField()),
+                ('end_offset', models.PositiveIntegerField()),
+                ('embedding', pgvector.django.vector.VectorField(dimensions=768)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+            ],
+            options={
+                'verbose_name': 'Embedding Chunk',
+                'verbose_name_plural': 'Embedding Chunks',
+                'ordering': ['content_type', 'object_id', 'chunk_index'],
+                'indexes': [pgvector.django.indexes.HnswIndex(ef_construction=64, fields=['embedding'], m=16, name='embedding_chunk_hnsw', opclasses=['vector_cosine_ops'])],
+                'constraints': [models.UniqueConstraint(fields=('content_type', 'object_id', 'chunk_index'), name='embedding_chunk_unique_index')],
+            },
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from pgvector.django import HnswIndex, VectorField
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 
@@ -37,3 +38,61 @@ class GeminiResponse(models.Model):
 from django.db import models
 
 # Create your models here.
+
+
+class EmbeddingCache(models.Model):
+    """
+    Persistent tier of the embedding cache. Vectors are keyed by a hash of
+    the normalized text and the embedding model name, so identical text is
+    only ever encoded once across processes and deployments.
+    """
+    model_name = models.CharField(max_length=100)
+    content_hash = models.CharField(max_length=64)
+    embedding = VectorField(dimensions=768)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.model_name}:{self.content_hash[:12]}"
+
+    class Meta:
+        verbose_name = "Embedding Cache Entry"
+        verbose_name_plural = "Embedding Cache Entries"
+        constraints = [
+            models.UniqueConstraint(fields=["model_name", "content_hash"], name="embedding_cache_unique_key"),
+        ]
+
+
+class EmbeddingChunk(models.Model):
+    """
+    Embedding of one passage of a long text (email body, PDF analysis).
+    The offsets point into the source field, so the best-matching span can
+    be displayed; the parent keeps a pooled vector in its own embedding.
+    """
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    content_object = GenericForeignKey('content_type', 'object_id')
+
+    chunk_index = models.PositiveIntegerField()
+    start_offset = models.PositiveIntegerField()
+    end_offset = models.PositiveIntegerField()
+    embedding = VectorField(dimensions=768)
+
+    def __str__(self):
+        return f"Chunk {self.chunk_index} [{self.start_offset}:{self.end_offset}] of {self.content_type_id}:{self.object_id}"
+
+    class Meta:
+        ordering = ['content_type', 'object_id', 'chunk_index']
+        verbose_name = "Embedding Chunk"
+        verbose_name_plural = "Embedding Chunks"
+        constraints = [
+            models.UniqueConstraint(fields=["content_type", "object_id", "chunk_index"], name="embedding_chunk_unique_index"),
+        ]
+        indexes = [
+            HnswIndex(
+                name='embedding_chunk_hnsw',
+                fields=['embedding'],
+                m=16,
+                ef_construction=64,
+                opclasses=['vector_cosine_ops'],
+            ),
+        ]
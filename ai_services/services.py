@@ -9,6 +9,7 @@ import fitz  # PyMuPDF
 import PIL.Image
 import json
 from .utils import EvidenceFormatter
+from . import embedding_cache
 
 def get_ai_client():
     """Helper to initialize the new GenAI Client."""
@@ -303,65 +304,115 @@ def run_police_investigator_service(narratives_queryset):
     
     # C. Appel API (Force le JSON via votre fonction existante)
     return analyze_for_json_output(prompt_sequence)
-from threading import Lock
-from typing import Iterable, List, Optional
-
-_EMBED_MODEL = None
-_EMBED_MODEL_LOCK = Lock()
-_EMBED_MODEL_NAME = "all-mpnet-base-v2"
-
-def _get_embed_model():
-    global _EMBED_MODEL
-    if _EMBED_MODEL is None:
-        from sentence_transformers import SentenceTransformer
-        with _EMBED_MODEL_LOCK:
-            if _EMBED_MODEL is None:
-                _EMBED_MODEL = SentenceTransformer(_EMBED_MODEL_NAME)
-    return _EMBED_MODEL
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .chunking import chunk_spans, mean_pool
+from .encoder import DEFAULT_ENCODE_BATCH_SIZE, EMBED_MODEL_NAME as _EMBED_MODEL_NAME, encode_texts
+
+# Signature of the raw forward pass: (texts, batch_size) -> vectors.
+# The backfill pipeline swaps it for one that dispatches to worker processes.
+Encoder = Callable[[List[str], int], List[List[float]]]
 
 def _clean_text(text: Optional[str]) -> Optional[str]:
-    if text is None:
+    return embedding_cache.normalize_text(text)
+
+def embedding_fingerprint(text: Optional[str]) -> Optional[str]:
+    """
+    Hash of the text as the embedding model sees it (same key as the cache).
+    Stored next to each vector so stale embeddings can be detected.
+    """
+    cleaned = _clean_text(text)
+    if not cleaned:
         return None
-    text = text.strip()
-    return text if text else None
+    return embedding_cache.cache_key(cleaned, _EMBED_MODEL_NAME)
+
+def _encode_texts(
+    texts: List[str],
+    batch_size: int = DEFAULT_ENCODE_BATCH_SIZE,
+    encoder: Optional[Encoder] = None,
+) -> Dict[str, List[float]]:
+    """
+    Encodes the unique texts that are not cached yet and returns a
+    cache-key -> vector mapping for every requested text.
+    """
+    keys = {text: embedding_cache.cache_key(text, _EMBED_MODEL_NAME) for text in texts}
+    vectors = embedding_cache.get_many(keys.values(), _EMBED_MODEL_NAME)
+
+    to_encode = [text for text, key in keys.items() if key not in vectors]
+    if to_encode:
+        encoded = (encoder or encode_texts)(to_encode, batch_size)
+        fresh = {keys[text]: vec for text, vec in zip(to_encode, encoded)}
+        embedding_cache.set_many(fresh, _EMBED_MODEL_NAME)
+        vectors.update(fresh)
+    return vectors
 
 def generate_embedding(text: Optional[str]) -> Optional[List[float]]:
     cleaned = _clean_text(text)
     if not cleaned:
         return None
     try:
-        model = _get_embed_model()
-        vec = model.encode(
-            cleaned,
-            normalize_embeddings=True,
-            convert_to_numpy=True,
-            show_progress_bar=False,
-        )
-        return vec.tolist()
+        vectors = _encode_texts([cleaned])
     except Exception:
         return None
+    return vectors.get(embedding_cache.cache_key(cleaned, _EMBED_MODEL_NAME))
 
-def generate_embeddings_batch(texts: Iterable[Optional[str]]) -> List[Optional[List[float]]]:
+def generate_embeddings_batch(
+    texts: Iterable[Optional[str]],
+    batch_size: int = DEFAULT_ENCODE_BATCH_SIZE,
+    encoder: Optional[Encoder] = None,
+) -> List[Optional[List[float]]]:
     items = list(texts)
     cleaned = [_clean_text(t) for t in items]
     valid_indices = [i for i, t in enumerate(cleaned) if t]
     if not valid_indices:
         return [None] * len(items)
 
-    valid_texts = [cleaned[i] for i in valid_indices]
+    unique_texts = list(dict.fromkeys(cleaned[i] for i in valid_indices))
     try:
-        model = _get_embed_model()
-        vectors = model.encode(
-            valid_texts,
-            batch_size=16,
-            normalize_embeddings=True,
-            convert_to_numpy=True,
-            show_progress_bar=False,
-        )
+        vectors = _encode_texts(unique_texts, batch_size=batch_size, encoder=encoder)
     except Exception:
         return [None] * len(items)
 
     out: List[Optional[List[float]]] = [None] * len(items)
-    for i, vec in zip(valid_indices, vectors):
-        out[i] = vec.tolist()
+    for i in valid_indices:
+        out[i] = vectors.get(embedding_cache.cache_key(cleaned[i], _EMBED_MODEL_NAME))
+    return out
+
+# (start, end, vector) of one passage of a long text.
+ChunkEmbedding = Tuple[int, int, List[float]]
+
+def generate_chunked_embeddings_batch(
+    texts: Iterable[Optional[str]],
+    batch_size: int = DEFAULT_ENCODE_BATCH_SIZE,
+    encoder: Optional[Encoder] = None,
+) -> List[Optional[Tuple[List[float], List[ChunkEmbedding]]]]:
+    """
+    Embeds long texts passage by passage instead of letting the model
+    truncate them. Returns, per text, the mean-pooled parent vector and the
+    passage embeddings (empty when the text fits in a single passage).
+    All passages of the batch go through one encoding call.
+    """
+    items = list(texts)
+    spans_per_text = [chunk_spans(text) if text else [] for text in items]
+    passages = [
+        items[i][start:end]
+        for i, spans in enumerate(spans_per_text)
+        for start, end in spans
+    ]
+    vectors = iter(generate_embeddings_batch(passages, batch_size=batch_size, encoder=encoder))
+
+    out: List[Optional[Tuple[List[float], List[ChunkEmbedding]]]] = []
+    for spans in spans_per_text:
+        chunk_vectors = [next(vectors) for _ in spans]
+        chunks = [
+            (start, end, vector)
+            for (start, end), vector in zip(spans, chunk_vectors)
+            if vector is not None
+        ]
+        if not chunks:
+            out.append(None)
+        elif len(spans) == 1:
+            out.append((chunks[0][2], []))
+        else:
+            out.append((mean_pool([vector for _, _, vector in chunks]), chunks))
     return out
@@ -1,3 +1,51 @@
-from django.test import TestCase
+from django.test import SimpleTestCase
 
-# Create your tests here.
+from ai_services.chunking import chunk_spans, mean_pool
+from ai_services.embedding_cache import EmbeddingLRU, cache_key, normalize_text
+
+
+class EmbeddingCacheKeyTests(SimpleTestCase):
+    def test_whitespace_variants_share_a_key(self):
+        first = normalize_text("  Garde   partagée\n des enfants ")
+        second = normalize_text("Garde partagée des enfants")
+        self.assertEqual(cache_key(first, "all-mpnet-base-v2"), cache_key(second, "all-mpnet-base-v2"))
+
+    def test_model_name_is_part_of_the_key(self):
+        self.assertNotEqual(cache_key("texte", "model-a"), cache_key("texte", "model-b"))
+
+    def test_blank_text_normalizes_to_none(self):
+        self.assertIsNone(normalize_text(" \n\t "))
+
+
+class EmbeddingLRUTests(SimpleTestCase):
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = EmbeddingLRU(maxsize=2)
+        cache.set("a", [1.0])
+        cache.set("b", [2.0])
+        cache.get("a")
+        cache.set("c", [3.0])
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), [1.0])
+        self.assertEqual(len(cache), 2)
+
+
+class ChunkSpanTests(SimpleTestCase):
+    def test_short_text_is_a_single_span(self):
+        self.assertEqual(chunk_spans("Courriel court."), [(0, 15)])
+
+    def test_long_text_is_covered_by_overlapping_spans(self):
+        text = ("Le père était présent à la rencontre. " * 30 + "\n\n") * 5
+        spans = chunk_spans(text, max_chars=400, overlap=80)
+        self.assertGreater(len(spans), 1)
+        self.assertEqual(spans[0][0], 0)
+        self.assertEqual(spans[-1][1], len(text))
+        for (_, previous_end), (next_start, _) in zip(spans, spans[1:]):
+            self.assertLess(next_start, previous_end)
+        self.assertTrue(all(end - start <= 400 for start, end in spans))
+
+    def test_blank_text_has_no_spans(self):
+        self.assertEqual(chunk_spans("  \n "), [])
+
+    def test_mean_pool_is_normalized(self):
+        pooled = mean_pool([[1.0, 0.0], [0.0, 1.0]])
+        self.assertAlmostEqual(sum(value * value for value in pooled), 1.0)
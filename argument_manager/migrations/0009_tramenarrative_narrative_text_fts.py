@@ -0,0 +1,25 @@
+# Generated by Django 5.2.4 on 2026-10-17 01:15
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('argument_manager', '0008_tramenarrative_ai_analysis_json_and_more'),
+        ('document_manager', '0017_statement_statement_text_fts'),
+        ('email_manager', '0007_quote_email_quote_text_fts'),
+        ('events', '0005_event_embedding_source_hash'),
+        ('googlechat_manager', '0003_alter_chatsequence_options_and_more'),
+        ('pdf_manager', '0007_quote_pdf_quote_text_fts'),
+        ('photos', '0005_photodocument_embedding_source_hash'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tramenarrative',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.SearchVector('titre', 'resume', config='french'), name='narrative_text_fts'),
+        ),
+    ]
@@ -1,4 +1,6 @@
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
 from document_manager.models import Statement, LibraryNode, Document, DocumentSource
 from events.models import Event
 from email_manager.models import Quote as EmailQuote
@@ -294,6 +296,9 @@ class TrameNarrative(models.Model):
     class Meta:
         verbose_name = "Trame Narrative"
         verbose_name_plural = "Trames Narratives"
+        indexes = [
+            GinIndex(SearchVector('titre', 'resume', config='french'), name='narrative_text_fts'),
+        ]
 
 class PerjuryArgument(models.Model):
     trame = models.OneToOneField(
@@ -23,6 +23,7 @@ from datetime import date, datetime
 from django.http import JsonResponse
 from django.views.decorators.http import require_POST
 from django.shortcuts import get_object_or_404, render, redirect
+from django.db import transaction
 from django.db.models import Q, Prefetch
 from email_manager.models import Email, EmailThread, Quote as EmailQuote
 from events.models import Event
@@ -452,6 +453,7 @@ def ajax_get_statements_list(request):
 
 
 @require_POST
+@transaction.atomic
 def ajax_update_narrative_statements(request, narrative_pk):
     try:
         narrative = get_object_or_404(TrameNarrative, pk=narrative_pk)
@@ -492,6 +494,7 @@ def ajax_get_events_list(request):
 
 
 @require_POST
+@transaction.atomic
 def ajax_update_narrative_events(request, narrative_pk):
     try:
         narrative = get_object_or_404(TrameNarrative, pk=narrative_pk)
@@ -508,6 +511,7 @@ def ajax_get_email_quotes_list(request):
 
 
 @require_POST
+@transaction.atomic
 def ajax_update_narrative_email_quotes(request, narrative_pk):
     try:
         narrative = get_object_or_404(TrameNarrative, pk=narrative_pk)
@@ -524,6 +528,7 @@ def ajax_get_pdf_quotes_list(request):
 
 
 @require_POST
+@transaction.atomic
 def ajax_update_narrative_pdf_quotes(request, narrative_pk):
     try:
         narrative = get_object_or_404(TrameNarrative, pk=narrative_pk)
@@ -565,6 +570,7 @@ def ajax_get_photo_documents(request, narrative_pk):
 
 
 @require_POST
+@transaction.atomic
 def ajax_associate_photo_documents(request, narrative_pk):
     try:
         narrative = get_object_or_404(TrameNarrative, pk=narrative_pk)
@@ -585,6 +591,7 @@ def ajax_get_chat_sequences_list(request, narrative_pk):
     return render(request, 'argument_manager/_chat_sequence_selection_list.html', context)
 
 @require_POST
+@transaction.atomic
 def ajax_update_narrative_chat_sequences(request, narrative_pk):
     try:
         narrative = get_object_or_404(TrameNarrative, pk=narrative_pk)
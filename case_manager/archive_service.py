@@ -1,12 +1,19 @@
 # case_manager/archive_service.py
 
+import heapq
+
+from django.conf import settings
 from django.db import transaction
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Count, DateTimeField, Func, Max, Min, Value
+from django.db.models.functions import Coalesce
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from collections import defaultdict
-from datetime import datetime
+from datetime import datetime, timedelta
 
-from .models import LegalCase, ProducedExhibit
-from document_manager.models import LibraryNode, Document, DocumentSource
+from .models import GlobalArchiveState, LegalCase, ProducedExhibit
+from document_manager.models import LibraryNode, Document, DocumentSource, Statement
 from email_manager.models import Email, Quote as EmailQuote
 from events.models import Event
 from photos.models import PhotoDocument
@@ -14,110 +21,317 @@ from pdf_manager.models import PDFDocument, Quote as PDFQuote
 from googlechat_manager.models import ChatSequence
 from core.mixins import ExhibitableMixin
 
-def rebuild_global_exhibits(target_case_id):
+# Rows per server-side cursor fetch and per bulk_create.
+ARCHIVE_CHUNK_SIZE = 500
+
+
+class LocalMidnight(Func):
     """
-    Populates the Master Archive case with ALL evidence, maintaining
-    Parent-Child relationships (Email -> Quotes, Document -> Statements).
+    date -> timestamptz at midnight in the project timezone, i.e. the SQL
+    twin of timezone.make_aware(datetime.combine(d, datetime.min.time())).
     """
-    try:
-        with transaction.atomic():
-            case = LegalCase.objects.get(pk=target_case_id)
-            ProducedExhibit.objects.filter(case=case).delete()
-
-            # A. Email Quotes
-            email_quotes_map = defaultdict(list)
-            all_email_quotes = EmailQuote.objects.select_related('email').all()
-            for q in all_email_quotes:
-                if q.email_id:
-                    email_quotes_map[q.email_id].append(q)
-
-            # B. PDF Quotes
-            pdf_quotes_map = defaultdict(list)
-            all_pdf_quotes = PDFQuote.objects.select_related('pdf_document').all()
-            for q in all_pdf_quotes:
-                if q.pdf_document_id:
-                    pdf_quotes_map[q.pdf_document_id].append(q)
-
-            # C. Statements
-            statement_map = defaultdict(list)
-            linked_nodes = LibraryNode.objects.filter(
-                content_type__model='statement',
-                document__source_type=DocumentSource.REPRODUCED
-            ).prefetch_related('content_object')
-            
-            for node in linked_nodes:
-                if node.document_id and node.content_object:
-                    statement_map[node.document_id].append(node.content_object)
-
-            parent_items = []
-            for obj in Email.objects.select_related('sender_protagonist').prefetch_related('recipient_protagonists').all():
-                parent_items.append({'obj': obj, 'sort_date': get_sort_date(obj)})
-            for obj in PDFDocument.objects.select_related('author').all():
-                parent_items.append({'obj': obj, 'sort_date': get_sort_date(obj)})
-            for obj in Document.objects.select_related('author').all():
-                parent_items.append({'obj': obj, 'sort_date': get_sort_date(obj)})
-            for obj in Event.objects.all():
-                parent_items.append({'obj': obj, 'sort_date': get_sort_date(obj)})
-            for obj in PhotoDocument.objects.select_related('author').all():
-                parent_items.append({'obj': obj, 'sort_date': get_sort_date(obj)})
-            for obj in ChatSequence.objects.all():
-                parent_items.append({'obj': obj, 'sort_date': get_sort_date(obj)})
-
-            parent_items.sort(key=lambda x: x['sort_date'])
-
-            new_rows = []
-            global_counter = 1
-
-            for item in parent_items:
-                parent_obj = item['obj']
-                sort_date = item['sort_date']
-                model_name = parent_obj._meta.model_name
-                main_label = f"G-{global_counter}"
-                exhibit_type, description, parties = get_item_metadata(parent_obj)
-                date_display = sort_date.strftime('%Y-%m-%d')
+    template = "(%(expressions)s)"
+    arg_joiner = "::timestamp AT TIME ZONE "
+    output_field = DateTimeField()
 
-                new_rows.append(ProducedExhibit(
-                    case=case, sort_order=len(new_rows) + 1, label=main_label, exhibit_type=exhibit_type,
-                    date_display=date_display, description=description, parties=parties,
-                    content_object=parent_obj, public_url=parent_obj.get_exhibit_public_url() if isinstance(parent_obj, ExhibitableMixin) else None
-                ))
+    def __init__(self, expression, **extra):
+        super().__init__(expression, Value(settings.TIME_ZONE), **extra)
+
+
+def _archive_sources():
+    """
+    One queryset per parent model, ordered in SQL by the same instant that
+    get_sort_date() computes in Python (annotated as ``archive_sort_at``).
+    """
+    sources = [
+        Email.objects.select_related('sender_protagonist').prefetch_related('recipient_protagonists')
+            .annotate(archive_sort_at=Coalesce('date_sent', 'saved_at')),
+        PDFDocument.objects.select_related('author')
+            .annotate(archive_sort_at=Coalesce(LocalMidnight('document_date'), 'uploaded_at')),
+        Document.objects.select_related('author')
+            .annotate(archive_sort_at=Coalesce(LocalMidnight('document_original_date'), 'created_at')),
+        Event.objects.annotate(archive_sort_at=LocalMidnight('date')),
+        PhotoDocument.objects.select_related('author')
+            .annotate(first_photo_date=Min('photos__datetime_original'))
+            .annotate(archive_sort_at=Coalesce('first_photo_date', 'created_at')),
+        ChatSequence.objects.annotate(message_count=Count('messages'))
+            .annotate(archive_sort_at=Coalesce('start_date', 'created_at')),
+    ]
+    # Embedding vectors are never read here and dominate the row size.
+    return [
+        (qs.defer('embedding') if hasattr(qs.model, 'embedding') else qs).order_by('archive_sort_at', 'pk')
+        for qs in sources
+    ]
+
+
+def _iter_parents_by_date(chunk_size, since=None):
+    """k-way merge of the per-model date-ordered cursors; memory stays O(k * chunk_size)."""
+    sources = _archive_sources()
+    if since is not None:
+        sources = [qs.filter(archive_sort_at__gte=since) for qs in sources]
+    streams = [
+        ((obj.archive_sort_at, index, obj.pk, obj) for obj in qs.iterator(chunk_size=chunk_size))
+        for index, qs in enumerate(sources)
+    ]
+    for _, _, _, obj in heapq.merge(*streams, key=lambda item: item[:3]):
+        yield obj
+
+
+def _children_for(parents):
+    """Quotes and statements of a batch of parents, keyed by (model_name, parent id)."""
+    ids_by_model = defaultdict(list)
+    for obj in parents:
+        ids_by_model[obj._meta.model_name].append(obj.pk)
+
+    children = defaultdict(list)
+    if ids_by_model['email']:
+        for q in EmailQuote.objects.filter(email_id__in=ids_by_model['email']).order_by('created_at'):
+            children[('email', q.email_id)].append(q)
+    if ids_by_model['pdfdocument']:
+        for q in PDFQuote.objects.filter(pdf_document_id__in=ids_by_model['pdfdocument']).order_by('page_number', 'created_at'):
+            children[('pdfdocument', q.pdf_document_id)].append(q)
+    if ids_by_model['document']:
+        linked_nodes = LibraryNode.objects.filter(
+            content_type__model='statement',
+            document__source_type=DocumentSource.REPRODUCED,
+            document_id__in=ids_by_model['document'],
+        ).prefetch_related('content_object')
+        for node in linked_nodes:
+            if node.document_id and node.content_object:
+                children[('document', node.document_id)].append(node.content_object)
+    return children
 
+
+def _batched(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _write_archive(case, chunk_size, since=None):
+    """
+    (Re)writes the archive rows of parents sorted at or after ``since``
+    (everything if None), continuing the numbering of the rows before it.
+    Returns the number of rows written.
+    """
+    rows = ProducedExhibit.objects.filter(case=case)
+    if since is None:
+        rows.delete()
+        sort_order, global_counter = 0, 1
+    else:
+        rows.filter(sort_at__gte=since).delete()
+        sort_order = rows.aggregate(last=Max('sort_order'))['last'] or 0
+        global_counter = rows.filter(content_type__in=_parent_content_types()).count() + 1
+
+    written = 0
+    for parents in _batched(_iter_parents_by_date(chunk_size, since), chunk_size):
+        children_map = _children_for(parents)
+        new_rows = []
+
+        for parent_obj in parents:
+            model_name = parent_obj._meta.model_name
+            main_label = f"G-{global_counter}"
+            exhibit_type, description, parties = get_item_metadata(parent_obj)
+            date_display = get_sort_date(parent_obj).strftime('%Y-%m-%d')
+            sort_at = parent_obj.archive_sort_at
+
+            sort_order += 1
+            new_rows.append(ProducedExhibit(
+                case=case, sort_order=sort_order, label=main_label, exhibit_type=exhibit_type,
+                date_display=date_display, description=description, parties=parties, sort_at=sort_at,
+                content_object=parent_obj, public_url=parent_obj.get_exhibit_public_url() if isinstance(parent_obj, ExhibitableMixin) else None
+            ))
+
+            children = children_map.get((model_name, parent_obj.pk), [])
+            for idx, child in enumerate(children, 1):
+                sort_order += 1
                 if model_name == 'email':
-                    children = email_quotes_map.get(parent_obj.id, [])
-                    children.sort(key=lambda x: x.created_at)
-                    for idx, child in enumerate(children, 1):
-                        short_desc = (child.quote_text[:200] + '..') if len(child.quote_text) > 200 else child.quote_text
-                        new_rows.append(ProducedExhibit(
-                            case=case, sort_order=len(new_rows) + 1, label=f"{main_label}-{idx}",
-                            exhibit_type="Citation Courriel", date_display="",
-                            description=f"« {short_desc} »", parties=f"Source: {main_label}", content_object=child
-                        ))
+                    short_desc = (child.quote_text[:200] + '..') if len(child.quote_text) > 200 else child.quote_text
+                    row = dict(exhibit_type="Citation Courriel", description=f"« {short_desc} »")
                 elif model_name == 'pdfdocument':
-                    children = pdf_quotes_map.get(parent_obj.id, [])
-                    children.sort(key=lambda x: (x.page_number, x.created_at))
-                    for idx, child in enumerate(children, 1):
-                        desc = f"« {child.quote_text} » (p. {child.page_number})"
-                        new_rows.append(ProducedExhibit(
-                            case=case, sort_order=len(new_rows) + 1, label=f"{main_label}-{idx}",
-                            exhibit_type="Citation PDF", date_display="", description=desc,
-                            parties=f"Source: {main_label}", content_object=child
-                        ))
-                elif model_name == 'document':
-                    children = statement_map.get(parent_obj.id, [])
-                    for idx, stmt in enumerate(children, 1):
-                        new_rows.append(ProducedExhibit(
-                            case=case, sort_order=len(new_rows) + 1, label=f"{main_label}-{idx}",
-                            exhibit_type="Déclaration", date_display="", description=stmt.text,
-                            parties=f"Source: {main_label}", content_object=stmt
-                        ))
-
-                global_counter += 1
-
-            ProducedExhibit.objects.bulk_create(new_rows)
-            return len(new_rows)
-
-    except Exception as e:
-        raise e
+                    row = dict(exhibit_type="Citation PDF", description=f"« {child.quote_text} » (p. {child.page_number})")
+                else:
+                    row = dict(exhibit_type="Déclaration", description=child.text)
+                new_rows.append(ProducedExhibit(
+                    case=case, sort_order=sort_order, label=f"{main_label}-{idx}", sort_at=sort_at,
+                    date_display="", parties=f"Source: {main_label}", content_object=child, **row
+                ))
+
+            global_counter += 1
+
+        ProducedExhibit.objects.bulk_create(new_rows)
+        written += len(new_rows)
+    return written
+
+
+def rebuild_global_exhibits(target_case_id, chunk_size=ARCHIVE_CHUNK_SIZE):
+    """
+    Populates the Master Archive case with ALL evidence, maintaining
+    Parent-Child relationships (Email -> Quotes, Document -> Statements).
+
+    Parents are streamed from date-ordered server-side cursors and merged,
+    and rows are written batch by batch, so memory does not grow with the
+    size of the archive.
+    """
+    with transaction.atomic():
+        case = LegalCase.objects.get(pk=target_case_id)
+        watermarks = _current_watermarks()
+        count = _write_archive(case, chunk_size)
+        GlobalArchiveState.objects.update_or_create(case=case, defaults={'watermarks': watermarks})
+        return count
+
+
+# --- Incremental maintenance -------------------------------------------------
+
+# Field whose maximum is the high-water mark of each evidence model: rows
+# added or edited since the last run have a later updated_at.
+ARCHIVE_WATERMARK_FIELDS = {
+    Email: 'updated_at',
+    PDFDocument: 'updated_at',
+    Document: 'updated_at',
+    Event: 'updated_at',
+    PhotoDocument: 'updated_at',
+    ChatSequence: 'updated_at',
+    EmailQuote: 'updated_at',
+    PDFQuote: 'updated_at',
+    Statement: 'updated_at',
+    LibraryNode: 'updated_at',
+}
+
+# updated_at is stamped at save time but the row may commit after a run has
+# read a later maximum: rows stamped this long before a mark are checked again
+# (rewriting a parent twice is harmless).
+ARCHIVE_WATERMARK_OVERLAP = timedelta(minutes=5)
+
+# Links and removals no timestamp shows: photos of a photo document, email
+# recipients, messages of a chat sequence, deleted library nodes. Primary keys
+# are never reused, so (row count, max pk) changes on any insert or delete;
+# a change triggers a full rebuild. Protagonist names and photo EXIF dates are
+# not tracked either: rebuild with ?full=1 after editing them.
+ARCHIVE_LINK_MODELS = (
+    PhotoDocument.photos.through,
+    Email.recipient_protagonists.through,
+    ChatSequence.messages.through,
+    LibraryNode,
+)
+
+# Child model -> (parent model, lookup from the child to its parent's id)
+_ARCHIVE_CHILDREN = {
+    EmailQuote: (Email, 'email_id'),
+    PDFQuote: (PDFDocument, 'pdf_document_id'),
+}
+
+_PARENT_MODELS = (Email, PDFDocument, Document, Event, PhotoDocument, ChatSequence)
+
+
+def _parent_content_types():
+    return list(ContentType.objects.get_for_models(*_PARENT_MODELS).values())
+
+
+def _current_watermarks():
+    marks = {}
+    for model, field in ARCHIVE_WATERMARK_FIELDS.items():
+        value = model.objects.aggregate(mark=Max(field))['mark']
+        marks[model._meta.label] = value.isoformat() if value is not None else None
+    marks['links'] = {
+        model._meta.label: list(model.objects.aggregate(count=Count('pk'), last=Max('pk')).values())
+        for model in ARCHIVE_LINK_MODELS
+    }
+    return marks
+
+
+def _changed_since(model, mark):
+    """Primary keys of ``model`` rows added or updated after the watermark (minus the overlap)."""
+    field = ARCHIVE_WATERMARK_FIELDS[model]
+    qs = model.objects.all()
+    if mark is not None:
+        qs = qs.filter(**{f'{field}__gt': parse_datetime(mark) - ARCHIVE_WATERMARK_OVERLAP})
+    return qs.values('pk')
+
+
+def _affected_parents(watermarks):
+    """Parent model -> queryset of pks whose archive rows are out of date."""
+    def mark(model):
+        return watermarks.get(model._meta.label)
+
+    affected = {model: [_changed_since(model, mark(model))] for model in _PARENT_MODELS}
+    for child, (parent, parent_lookup) in _ARCHIVE_CHILDREN.items():
+        affected[parent].append(
+            child.objects.filter(pk__in=_changed_since(child, mark(child))).values(parent_lookup)
+        )
+    # Statements reach the archive through the library nodes of their document.
+    statement_ct = ContentType.objects.get_for_model(Statement)
+    affected[Document].append(
+        LibraryNode.objects.filter(content_type=statement_ct, object_id__in=_changed_since(Statement, mark(Statement)))
+        .values('document_id')
+    )
+    affected[Document].append(
+        LibraryNode.objects.filter(pk__in=_changed_since(LibraryNode, mark(LibraryNode))).values('document_id')
+    )
+    return affected
+
+
+def _earliest_affected_instant(case, watermarks):
+    """
+    Earliest sort instant touched since the watermarks: the new position of
+    added/changed parents, the old position of changed ones, and the position
+    of rows whose object has been deleted. None when nothing changed.
+    """
+    rows = ProducedExhibit.objects.filter(case=case)
+    candidates = []
+    sources = {qs.model: qs for qs in _archive_sources()}
+
+    for model, pk_querysets in _affected_parents(watermarks).items():
+        ct = ContentType.objects.get_for_model(model)
+        for pks in pk_querysets:
+            # Sources are ordered by archive_sort_at (which may itself be an aggregate).
+            candidates.append(
+                sources[model].filter(pk__in=pks).values_list('archive_sort_at', flat=True).first()
+            )
+            candidates.append(
+                rows.filter(content_type=ct, object_id__in=pks).aggregate(first=Min('sort_at'))['first']
+            )
+
+    for model in (*_PARENT_MODELS, EmailQuote, PDFQuote, Statement):
+        ct = ContentType.objects.get_for_model(model)
+        orphans = rows.filter(content_type=ct).exclude(object_id__in=model.objects.values('pk'))
+        candidates.append(orphans.aggregate(first=Min('sort_at'))['first'])
+
+    candidates = [value for value in candidates if value is not None]
+    return min(candidates) if candidates else None
+
+
+def sync_global_exhibits(target_case_id, chunk_size=ARCHIVE_CHUNK_SIZE):
+    """
+    Incremental counterpart of rebuild_global_exhibits: only the suffix of the
+    timeline starting at the earliest change since the last run is rewritten
+    (labels and sort orders before it are left untouched).
+    Falls back to a full rebuild when no watermark is known yet or when a
+    link table (ARCHIVE_LINK_MODELS) changed.
+    Returns the number of rows written.
+    """
+    with transaction.atomic():
+        case = LegalCase.objects.select_for_update().get(pk=target_case_id)
+        state = GlobalArchiveState.objects.filter(case=case).first()
+        # Read the new marks first: anything saved while we work is seen next time.
+        watermarks = _current_watermarks()
+        if (
+            state is None
+            or state.watermarks.get('links') != watermarks['links']
+            or ProducedExhibit.objects.filter(case=case, sort_at__isnull=True).exists()
+        ):
+            return rebuild_global_exhibits(target_case_id, chunk_size)
+
+        since = _earliest_affected_instant(case, state.watermarks)
+        count = _write_archive(case, chunk_size, since=since) if since is not None else 0
+        state.watermarks = watermarks
+        state.save(update_fields=['watermarks', 'updated_at'])
+        return count
 
 def get_item_metadata(obj):
     """Helper to keep the main loop clean, using Exhibitable interface if available."""
@@ -133,7 +347,8 @@ def get_item_metadata(obj):
     if model_name == 'chatsequence':
         exhibit_type = "Extrait Chat"
         description = obj.title
-        parties = f"{obj.messages.count()} messages"
+        count = obj.message_count if hasattr(obj, 'message_count') else obj.messages.count()
+        parties = f"{count} messages"
 
     return exhibit_type, description, parties
 
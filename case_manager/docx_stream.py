@@ -0,0 +1,291 @@
+# case_manager/docx_stream.py
+
+import os
+import re
+import tempfile
+import time
+import zipfile
+from io import BytesIO
+from xml.sax.saxutils import escape, quoteattr
+
+import docx
+from docx.shared import Inches
+from PIL import Image
+
+# python-docx's default template supplies styles, numbering (List Bullet /
+# List Number), theme and document properties; only the body, its
+# relationships and the content types are generated.
+TEMPLATE_PATH = os.path.join(os.path.dirname(docx.__file__), 'templates', 'default.docx')
+GENERATED_PARTS = {'[Content_Types].xml', 'word/document.xml', 'word/_rels/document.xml.rels'}
+
+# Bytes buffered before a chunk is handed to the response.
+STREAM_CHUNK_SIZE = 64 * 1024
+
+NAMESPACES = (
+    'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships" '
+    'xmlns:wp="http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing" '
+    'xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" '
+    'xmlns:pic="http://schemas.openxmlformats.org/drawingml/2006/picture"'
+)
+IMAGE_RELATIONSHIP = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/image'
+
+# PIL format -> (extension, content type) of the picture formats Word reads.
+# MPO (multi-frame smartphone JPEG: depth or HDR gain map) is a JPEG whose
+# first frame is what Word displays.
+IMAGE_FORMATS = {
+    'JPEG': ('jpeg', 'image/jpeg'),
+    'MPO': ('jpeg', 'image/jpeg'),
+    'PNG': ('png', 'image/png'),
+    'GIF': ('gif', 'image/gif'),
+    'BMP': ('bmp', 'image/bmp'),
+    'TIFF': ('tiff', 'image/tiff'),
+}
+
+LINK_COLOR = '0563C1'
+
+# Characters XML 1.0 cannot carry (control characters of pasted emails).
+_INVALID_XML = re.compile('[^\t\n\r\x20-\ud7ff\ue000-\ufffd\U00010000-\U0010ffff]')
+_RUN_BREAKS = re.compile(r'([\t\r\n])')
+
+
+def _text(value):
+    return escape(_INVALID_XML.sub('', str(value)))
+
+
+def _attr(value):
+    return quoteattr(_INVALID_XML.sub('', str(value)))
+
+
+def run(text, bold=False, italic=False):
+    """<w:r> of text; tabs and line breaks become <w:tab/> and <w:br/> as in python-docx."""
+    props = ('<w:b/>' if bold else '') + ('<w:i/>' if italic else '')
+    parts = ['<w:r>']
+    if props:
+        parts.append(f'<w:rPr>{props}</w:rPr>')
+    for piece in _RUN_BREAKS.split(str(text)):
+        if piece == '\t':
+            parts.append('<w:tab/>')
+        elif piece in ('\r', '\n'):
+            parts.append('<w:br/>')
+        elif piece:
+            parts.append(f'<w:t xml:space="preserve">{_text(piece)}</w:t>')
+    parts.append('</w:r>')
+    return ''.join(parts)
+
+
+def anchor_link(text, anchor):
+    """Internal hyperlink to the bookmark ``anchor``."""
+    return (
+        f'<w:hyperlink w:anchor={_attr(anchor)}><w:r><w:rPr>'
+        f'<w:color w:val="{LINK_COLOR}"/><w:u w:val="single"/>'
+        f'</w:rPr><w:t xml:space="preserve">{_text(text)}</w:t></w:r></w:hyperlink>'
+    )
+
+
+def paragraph(*runs, style=None, alignment=None, bookmark=None):
+    """
+    <w:p> holding the given run fragments. alignment is a w:jc value
+    ('both', 'center'...); bookmark is an (id, name) pair spanning the paragraph.
+    """
+    props = ''
+    if style:
+        props += f'<w:pStyle w:val={_attr(style)}/>'
+    if alignment:
+        props += f'<w:jc w:val="{alignment}"/>'
+    parts = ['<w:p>']
+    if props:
+        parts.append(f'<w:pPr>{props}</w:pPr>')
+    if bookmark:
+        parts.append(f'<w:bookmarkStart w:id="{bookmark[0]}" w:name={_attr(bookmark[1])}/>')
+    parts.extend(runs)
+    if bookmark:
+        parts.append(f'<w:bookmarkEnd w:id="{bookmark[0]}"/>')
+    parts.append('</w:p>')
+    return ''.join(parts)
+
+
+def heading(text, level=1, bookmark=None):
+    """Same styles as Document.add_heading: level 0 is the title."""
+    return paragraph(run(text), style='Title' if level == 0 else f'Heading{level}', bookmark=bookmark)
+
+
+def page_break():
+    return '<w:p><w:r><w:br w:type="page"/></w:r></w:p>'
+
+
+def table(rows, widths, style=None, fixed=False):
+    """
+    Yields a <w:tbl> row by row. rows is an iterable of cells, each cell a
+    list of paragraph fragments; widths are column widths (Length).
+    """
+    props = f'<w:tblStyle w:val={_attr(style)}/>' if style else ''
+    props += '<w:tblW w:type="auto" w:w="0"/>'
+    if fixed:
+        props += '<w:tblLayout w:type="fixed"/>'
+    grid = ''.join(f'<w:gridCol w:w="{width.twips}"/>' for width in widths)
+    yield f'<w:tbl><w:tblPr>{props}<w:tblLook w:val="04A0"/></w:tblPr><w:tblGrid>{grid}</w:tblGrid>'
+    for cells in rows:
+        parts = ['<w:tr>']
+        for width, content in zip(widths, cells):
+            parts.append(f'<w:tc><w:tcPr><w:tcW w:type="dxa" w:w="{width.twips}"/></w:tcPr>')
+            # A cell must hold at least one paragraph.
+            parts.extend(content or [paragraph()])
+            parts.append('</w:tc>')
+        parts.append('</w:tr>')
+        yield ''.join(parts)
+    yield '</w:tbl>'
+
+
+def _zip_info(name, compress_type):
+    info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+    info.compress_type = compress_type
+    return info
+
+
+class _ChunkSink:
+    """Unseekable file for ZipFile: written bytes wait here until drained."""
+
+    def __init__(self):
+        self._chunks = []
+        self.size = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        self.size = 0
+        return data
+
+
+class StreamingDocx:
+    """
+    Word document written part by part into a zip stream.
+
+    The body is an iterable of WordprocessingML fragments (see paragraph,
+    heading, table...), consumed lazily while word/document.xml is being
+    compressed: the response starts before the last exhibit is read and the
+    document is never held in memory. Pictures are spooled to one temporary
+    file and stored once word/document.xml is complete.
+    """
+
+    def __init__(self, left_margin=Inches(1.25), right_margin=Inches(1.25)):
+        self.left_margin = left_margin
+        self.right_margin = right_margin
+        self._images = {}
+        self._spool = None
+        self._drawing_count = 0
+
+    def picture(self, name, data, width):
+        """
+        Inline picture run for the image bytes of ``name`` at ``width``; the
+        height keeps the aspect ratio. Raises if the image cannot be read.
+        """
+        with Image.open(BytesIO(data)) as image:
+            image_format = image.format
+            pixel_width, pixel_height = image.size
+        if image_format not in IMAGE_FORMATS:
+            raise ValueError(f"Format d'image non pris en charge : {image_format}")
+
+        if name not in self._images:
+            if self._spool is None:
+                self._spool = tempfile.TemporaryFile()
+            extension, _ = IMAGE_FORMATS[image_format]
+            number = len(self._images) + 1
+            self._images[name] = {
+                'rid': f'rIdImage{number}',
+                'part': f'word/media/image{number}.{extension}',
+                'offset': self._spool.seek(0, os.SEEK_END),
+                'length': len(data),
+            }
+            self._spool.write(data)
+
+        self._drawing_count += 1
+        cx = int(width)
+        cy = int(width * pixel_height / pixel_width)
+        drawing_id = self._drawing_count
+        return (
+            '<w:r><w:drawing><wp:inline distT="0" distB="0" distL="0" distR="0">'
+            f'<wp:extent cx="{cx}" cy="{cy}"/>'
+            f'<wp:docPr id="{drawing_id}" name="Picture {drawing_id}"/>'
+            '<wp:cNvGraphicFramePr><a:graphicFrameLocks noChangeAspect="1"/></wp:cNvGraphicFramePr>'
+            '<a:graphic><a:graphicData uri="http://schemas.openxmlformats.org/drawingml/2006/picture">'
+            f'<pic:pic><pic:nvPicPr><pic:cNvPr id="0" name={_attr(os.path.basename(name))}/><pic:cNvPicPr/></pic:nvPicPr>'
+            f'<pic:blipFill><a:blip r:embed="{self._images[name]["rid"]}"/><a:stretch><a:fillRect/></a:stretch></pic:blipFill>'
+            f'<pic:spPr><a:xfrm><a:off x="0" y="0"/><a:ext cx="{cx}" cy="{cy}"/></a:xfrm>'
+            '<a:prstGeom prst="rect"><a:avLst/></a:prstGeom></pic:spPr></pic:pic>'
+            '</a:graphicData></a:graphic></wp:inline></w:drawing></w:r>'
+        )
+
+    def _section_properties(self):
+        return (
+            '<w:sectPr><w:pgSz w:w="12240" w:h="15840"/>'
+            f'<w:pgMar w:top="1440" w:right="{self.right_margin.twips}" w:bottom="1440" '
+            f'w:left="{self.left_margin.twips}" w:header="720" w:footer="720" w:gutter="0"/>'
+            '<w:cols w:space="720"/><w:docGrid w:linePitch="360"/></w:sectPr>'
+        )
+
+    def _relationships(self, template_relationships):
+        images = ''.join(
+            f'<Relationship Id="{image["rid"]}" Type="{IMAGE_RELATIONSHIP}" '
+            f'Target="{image["part"][len("word/"):]}"/>'
+            for image in self._images.values()
+        )
+        return template_relationships.replace(b'</Relationships>', images.encode() + b'</Relationships>')
+
+    def _content_types(self, template_content_types):
+        known = template_content_types.decode()
+        defaults = ''.join(
+            f'<Default Extension="{extension}" ContentType="{content_type}"/>'
+            for extension, content_type in IMAGE_FORMATS.values()
+            if f'Extension="{extension}"' not in known
+        )
+        return template_content_types.replace(b'<Override ', defaults.encode() + b'<Override ', 1)
+
+    def stream(self, body):
+        """Yields the .docx bytes while the body fragments are produced."""
+        sink = _ChunkSink()
+        try:
+            with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED) as archive:
+                with zipfile.ZipFile(TEMPLATE_PATH) as template:
+                    for name in template.namelist():
+                        if name not in GENERATED_PARTS:
+                            archive.writestr(name, template.read(name))
+                    template_relationships = template.read('word/_rels/document.xml.rels')
+                    template_content_types = template.read('[Content_Types].xml')
+                yield sink.drain()
+
+                with archive.open(_zip_info('word/document.xml', zipfile.ZIP_DEFLATED), 'w') as part:
+                    part.write(f"<?xml version='1.0' encoding='UTF-8' standalone='yes'?>\n<w:document {NAMESPACES}><w:body>".encode())
+                    for fragment in body:
+                        part.write(fragment.encode('utf-8'))
+                        if sink.size >= STREAM_CHUNK_SIZE:
+                            yield sink.drain()
+                    part.write(f'{self._section_properties()}</w:body></w:document>'.encode())
+
+                archive.writestr('word/_rels/document.xml.rels', self._relationships(template_relationships))
+                archive.writestr('[Content_Types].xml', self._content_types(template_content_types))
+                yield sink.drain()
+
+                # Pictures are already compressed: store them as is.
+                for image in self._images.values():
+                    self._spool.seek(image['offset'])
+                    remaining = image['length']
+                    with archive.open(_zip_info(image['part'], zipfile.ZIP_STORED), 'w') as part:
+                        while remaining:
+                            block = self._spool.read(min(remaining, STREAM_CHUNK_SIZE))
+                            part.write(block)
+                            remaining -= len(block)
+                            if sink.size >= STREAM_CHUNK_SIZE:
+                                yield sink.drain()
+            yield sink.drain()
+        finally:
+            if self._spool is not None:
+                self._spool.close()
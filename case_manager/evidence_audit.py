@@ -15,11 +15,16 @@ from __future__ import annotations
 import csv
 import hashlib
 import json
+import multiprocessing
 import os
 import re
+import unicodedata
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import asdict, dataclass
 from datetime import date, datetime
+from functools import lru_cache
+from itertools import repeat
 from pathlib import Path
 from typing import Iterable, Iterator
 
@@ -32,6 +37,8 @@ from googlechat_manager.models import ChatMessage, ChatSequence
 from pdf_manager.models import PDFDocument
 from photos.models import Photo, PhotoDocument
 
+from case_manager.table_readers import find_header, iter_csv_rows, iter_xlsx_rows
+
 
 MODEL_CLASSES: dict[str, type[Model]] = {
     "PDFDocument": PDFDocument,
@@ -96,6 +103,29 @@ DIRECT_REFERENCE_PATTERN = re.compile(
     re.I,
 )
 
+# Every reference pattern starts either at ``piece_`` or at a model name.
+# One sweep of this anchor pattern finds each position where a reference can
+# start; the specific patterns are then only tried there.
+REFERENCE_ANCHOR_PATTERN = re.compile(
+    r"(?<![\w])(?=[pdec])(?:(?P<piece>piece_)|(?=pdfdocument|document|email|event|photo|chat))",
+    re.I,
+)
+
+# Claim order for overlapping matches: a span taken by an earlier pattern
+# excludes any overlapping match of a later one.
+PIECE_SCAN_ORDER: tuple[tuple[re.Pattern[str], str, str | None], ...] = (
+    (THREAD_EMAIL_PATTERN, "thread_email", "Email"),
+    *((pattern, "piece", model_name) for pattern, model_name in PIECE_PATTERNS),
+    (THREAD_PATTERN, "piece", "EmailThread"),
+)
+DIRECT_SCAN_RANK = len(PIECE_SCAN_ORDER)
+GENERIC_SCAN_RANK = DIRECT_SCAN_RANK + 1
+
+SCANNED_SUFFIXES = {".md", ".csv", ".xlsx"}
+
+# Storage lookups dominate the original-file checks; they run concurrently.
+STORAGE_CHECK_THREADS = 8
+
 ANALYTICAL_MARKERS = (
     "référence analytique exclue",
     "références analytiques exclues",
@@ -133,7 +163,8 @@ class ReferenceOccurrence:
 
 
 def _normalize_space(value: object) -> str:
-    return re.sub(r"\s+", " ", str(value or "")).strip()
+    # str.split() splits on the same Unicode whitespace as ``\s``.
+    return " ".join(str(value or "").split())
 
 
 def _classification(context: str) -> str:
@@ -190,6 +221,94 @@ def _make_occurrence(
     )
 
 
+def _scan_references(text: str) -> list[tuple[int, re.Match[str]]]:
+    """Return the claimed reference matches as ``(rank, match)`` pairs.
+
+    The text is swept once for anchors; each pattern is then matched only at
+    the anchors it can start on.  Claims follow ``PIECE_SCAN_ORDER``, then
+    direct tuples, then generic ``piece_`` names, exactly as successive
+    ``finditer`` passes would: a pattern resumes after its own previous match
+    and skips matches overlapping an earlier claim.  Pairs are ordered by rank
+    then position.
+    """
+    candidates: list[tuple[int, re.Match[str]]] = []
+    for anchor in REFERENCE_ANCHOR_PATTERN.finditer(text):
+        position = anchor.start()
+        if anchor.group("piece"):
+            for rank, (pattern, _, _) in enumerate(PIECE_SCAN_ORDER):
+                match = pattern.match(text, position)
+                if match:
+                    candidates.append((rank, match))
+            match = GENERIC_PIECE_PATTERN.match(text, position)
+            if match:
+                candidates.append((GENERIC_SCAN_RANK, match))
+        else:
+            match = DIRECT_REFERENCE_PATTERN.match(text, position)
+            if match:
+                candidates.append((DIRECT_SCAN_RANK, match))
+    if not candidates:
+        return []
+
+    candidates.sort(key=lambda item: (item[0], item[1].start()))
+    claimed: list[tuple[int, re.Match[str]]] = []
+    occupied_spans: list[tuple[int, int]] = []
+    resume_at: dict[int, int] = {}
+    for rank, match in candidates:
+        start, end = match.span()
+        if start < resume_at.get(rank, 0):
+            continue
+        resume_at[rank] = end
+        if any(start < taken_end and end > taken_start for taken_start, taken_end in occupied_spans):
+            continue
+        claimed.append((rank, match))
+        occupied_spans.append((start, end))
+    return claimed
+
+
+def _direct_occurrences(
+    match: re.Match[str],
+    *,
+    source_file: str,
+    source_format: str,
+    source_location: str,
+    section: str,
+    context: str,
+) -> list[ReferenceOccurrence]:
+    model_name = DIRECT_MODEL_NAMES[match.group("model").casefold()]
+    raw_ids = match.group("ids")
+    # Ranges and slash-separated identifiers are deliberately retained as
+    # unresolved collectives; expanding them would violate the source's
+    # own caution about ambiguous or collective references.
+    if re.search(r"\d\s*(?:à|au|–|-|/)\s*\d", raw_ids, re.I):
+        return [
+            _make_occurrence(
+                source_file=source_file,
+                source_format=source_format,
+                source_location=source_location,
+                section=section,
+                raw_reference=match.group(0),
+                reference_form="collective_or_ambiguous",
+                model=None,
+                pk=None,
+                context=context,
+            )
+        ]
+    return [
+        _make_occurrence(
+            source_file=source_file,
+            source_format=source_format,
+            source_location=source_location,
+            section=section,
+            raw_reference=f"{match.group('model')} id={pk_text}",
+            reference_form="direct_tuple",
+            model=model_name,
+            pk=int(pk_text),
+            context=context,
+        )
+        for pk_text in re.findall(r"\d+", raw_ids)
+    ]
+
+
 def extract_references_from_text(
     text: object,
     *,
@@ -208,33 +327,9 @@ def extract_references_from_text(
     matchable = value.replace("*", " ").replace("`", " ")
 
     occurrences: list[ReferenceOccurrence] = []
-    occupied_spans: list[tuple[int, int]] = []
-
-    def overlaps(span: tuple[int, int]) -> bool:
-        return any(span[0] < end and span[1] > start for start, end in occupied_spans)
-
-    for match in THREAD_EMAIL_PATTERN.finditer(matchable):
-        occurrences.append(
-            _make_occurrence(
-                source_file=source_file,
-                source_format=source_format,
-                source_location=source_location,
-                section=section,
-                raw_reference=match.group(0),
-                reference_form="piece_markdown",
-                model="Email",
-                pk=int(match.group("pk")),
-                context_model="EmailThread",
-                context_pk=int(match.group("thread_pk")),
-                context=context,
-            )
-        )
-        occupied_spans.append(match.span())
-
-    for pattern, model_name in PIECE_PATTERNS:
-        for match in pattern.finditer(matchable):
-            if overlaps(match.span()):
-                continue
+    for rank, match in _scan_references(matchable):
+        if rank < DIRECT_SCAN_RANK:
+            _, form, model_name = PIECE_SCAN_ORDER[rank]
             occurrences.append(
                 _make_occurrence(
                     source_file=source_file,
@@ -245,38 +340,23 @@ def extract_references_from_text(
                     reference_form="piece_markdown",
                     model=model_name,
                     pk=int(match.group("pk")),
+                    context_model="EmailThread" if form == "thread_email" else None,
+                    context_pk=int(match.group("thread_pk")) if form == "thread_email" else None,
                     context=context,
                 )
             )
-            occupied_spans.append(match.span())
-
-    for match in THREAD_PATTERN.finditer(matchable):
-        if overlaps(match.span()):
-            continue
-        occurrences.append(
-            _make_occurrence(
-                source_file=source_file,
-                source_format=source_format,
-                source_location=source_location,
-                section=section,
-                raw_reference=match.group(0),
-                reference_form="piece_markdown",
-                model="EmailThread",
-                pk=int(match.group("pk")),
-                context=context,
+        elif rank == DIRECT_SCAN_RANK:
+            occurrences.extend(
+                _direct_occurrences(
+                    match,
+                    source_file=source_file,
+                    source_format=source_format,
+                    source_location=source_location,
+                    section=section,
+                    context=context,
+                )
             )
-        )
-        occupied_spans.append(match.span())
-
-    for match in DIRECT_REFERENCE_PATTERN.finditer(matchable):
-        if overlaps(match.span()):
-            continue
-        model_name = DIRECT_MODEL_NAMES[match.group("model").casefold()]
-        raw_ids = match.group("ids")
-        # Ranges and slash-separated identifiers are deliberately retained as
-        # unresolved collectives; expanding them would violate the source's
-        # own caution about ambiguous or collective references.
-        if re.search(r"\d\s*(?:à|au|–|-|/)\s*\d", raw_ids, re.I):
+        else:
             occurrences.append(
                 _make_occurrence(
                     source_file=source_file,
@@ -284,45 +364,12 @@ def extract_references_from_text(
                     source_location=source_location,
                     section=section,
                     raw_reference=match.group(0),
-                    reference_form="collective_or_ambiguous",
+                    reference_form="unparsed_piece_reference",
                     model=None,
                     pk=None,
                     context=context,
                 )
             )
-        else:
-            for pk_text in re.findall(r"\d+", raw_ids):
-                occurrences.append(
-                    _make_occurrence(
-                        source_file=source_file,
-                        source_format=source_format,
-                        source_location=source_location,
-                        section=section,
-                        raw_reference=f"{match.group('model')} id={pk_text}",
-                        reference_form="direct_tuple",
-                        model=model_name,
-                        pk=int(pk_text),
-                        context=context,
-                    )
-                )
-        occupied_spans.append(match.span())
-
-    for match in GENERIC_PIECE_PATTERN.finditer(matchable):
-        if overlaps(match.span()):
-            continue
-        occurrences.append(
-            _make_occurrence(
-                source_file=source_file,
-                source_format=source_format,
-                source_location=source_location,
-                section=section,
-                raw_reference=match.group(0),
-                reference_form="unparsed_piece_reference",
-                model=None,
-                pk=None,
-                context=context,
-            )
-        )
 
     # A cell whose entire value is an old procedural cote represents a real,
     # unresolved union member.  Cotes merely mentioned as aliases elsewhere
@@ -405,14 +452,19 @@ def _iter_markdown(path: Path, root: Path) -> Iterator[ReferenceOccurrence]:
         )
 
 
+REFERENCE_COLUMN_HEADER = "référence interne exacte"
+
+
+def _header_key(value: str) -> str:
+    return _normalize_space(value).casefold()
+
+
 def _iter_csv(path: Path, root: Path) -> Iterator[ReferenceOccurrence]:
-    with path.open("r", encoding="utf-8-sig", newline="") as handle:
-        rows = list(csv.reader(handle))
     reference_column: int | None = None
-    for row_number, row in enumerate(rows, 1):
-        normalized = [_normalize_space(cell).casefold() for cell in row]
-        if "référence interne exacte" in normalized:
-            reference_column = normalized.index("référence interne exacte")
+    for row_number, row in iter_csv_rows(path):
+        header = find_header(row, REFERENCE_COLUMN_HEADER, _header_key)
+        if header is not None:
+            reference_column = header.index(REFERENCE_COLUMN_HEADER)
             continue
         if reference_column is None or reference_column >= len(row):
             continue
@@ -427,51 +479,146 @@ def _iter_csv(path: Path, root: Path) -> Iterator[ReferenceOccurrence]:
 
 
 def _iter_xlsx(path: Path, root: Path) -> Iterator[ReferenceOccurrence]:
-    try:
-        from openpyxl import load_workbook
-    except ImportError as exc:  # pragma: no cover - environment guard
-        raise RuntimeError("openpyxl is required to audit XLSX annexes") from exc
+    sheet_title: str | None = None
+    reference_column: int | None = None
+    for title, row_number, cells in iter_xlsx_rows(path):
+        if title != sheet_title:
+            sheet_title, reference_column = title, None
+        header = find_header(cells, REFERENCE_COLUMN_HEADER, _header_key)
+        if header is not None:
+            reference_column = header.index(REFERENCE_COLUMN_HEADER)
+            continue
+        if reference_column is None or reference_column >= len(cells):
+            continue
+        # Only the reference cell is needed to skip a row; the others are
+        # normalized for the context of rows that cite something.
+        reference = _normalize_space(cells[reference_column])
+        if not reference:
+            continue
+        row_context = " | ".join(_normalize_space(cell) for cell in cells)
+        yield from extract_references_from_text(
+            reference,
+            source_file=str(path.relative_to(root)),
+            source_format="xlsx",
+            source_location=f"sheet:{title};row:{row_number}",
+            section=title,
+            context=row_context,
+        )
+
+
+def _scan_file(path: Path, root: Path) -> list[ReferenceOccurrence]:
+    suffix = path.suffix.casefold()
+    if suffix == ".md":
+        return list(_iter_markdown(path, root))
+    if suffix == ".csv":
+        return list(_iter_csv(path, root))
+    return list(_iter_xlsx(path, root))
+
+
+def _scan_files(paths: list[Path], root: Path, jobs: int) -> Iterator[list[ReferenceOccurrence]]:
+    if jobs <= 1 or len(paths) <= 1:
+        return map(_scan_file, paths, repeat(root))
+
+    from case_manager.exhibit_renderers.worker import init_worker
+
+    # "spawn" workers import this module, hence Django, from scratch.
+    with ProcessPoolExecutor(
+        max_workers=min(jobs, len(paths)),
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_worker,
+    ) as pool:
+        return list(pool.map(_scan_file, paths, repeat(root)))
+
+
+@lru_cache(maxsize=1)
+def _scanner_fingerprint() -> str:
+    """Digest of the extraction code: any change invalidates cached scans."""
+    digest = hashlib.sha256(Path(__file__).read_bytes())
+    digest.update(Path(__file__).with_name("table_readers.py").read_bytes())
+    return digest.hexdigest()
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for block in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
 
-    workbook = load_workbook(path, read_only=True, data_only=True)
+def _load_scan_cache(cache_path: Path, root: Path) -> dict:
     try:
-        for worksheet in workbook.worksheets:
-            reference_column: int | None = None
-            for row_number, row in enumerate(worksheet.iter_rows(values_only=True), 1):
-                values = [_normalize_space(cell) for cell in row]
-                normalized = [value.casefold() for value in values]
-                if "référence interne exacte" in normalized:
-                    reference_column = normalized.index("référence interne exacte")
-                    continue
-                if reference_column is None or reference_column >= len(values):
-                    continue
-                reference = values[reference_column]
-                if not reference:
-                    continue
-                row_context = " | ".join(values)
-                yield from extract_references_from_text(
-                    reference,
-                    source_file=str(path.relative_to(root)),
-                    source_format="xlsx",
-                    source_location=f"sheet:{worksheet.title};row:{row_number}",
-                    section=worksheet.title,
-                    context=row_context,
-                )
-    finally:
-        workbook.close()
+        data = json.loads(cache_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    # Entries are keyed relative to the scanned directory.
+    if data.get("scanner") != _scanner_fingerprint() or data.get("root") != str(root):
+        return {}
+    return data.get("files", {})
+
+
+def _write_scan_cache(cache_path: Path, root: Path, entries: dict) -> None:
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    partial = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.part")
+    partial.write_text(
+        json.dumps({"scanner": _scanner_fingerprint(), "root": str(root), "files": entries}, ensure_ascii=False),
+        encoding="utf-8",
+    )
+    os.replace(partial, cache_path)
 
 
-def collect_occurrences(input_dir: Path) -> list[ReferenceOccurrence]:
+def collect_occurrences(
+    input_dir: Path,
+    *,
+    cache_path: Path | None = None,
+    jobs: int = 1,
+    stats: dict | None = None,
+) -> list[ReferenceOccurrence]:
+    """Extract the references of every Markdown, CSV and XLSX input file.
+
+    With ``cache_path``, each file's occurrences are cached under its
+    (size, mtime, sha256) and only new or modified files are scanned again,
+    in ``jobs`` processes when more than one needs it.  The cache holds one
+    input directory: scanning another one starts it afresh.  ``stats`` receives
+    the file and rescan counts.
+    """
     root = input_dir.resolve()
-    occurrences: list[ReferenceOccurrence] = []
+    previous = _load_scan_cache(cache_path, root) if cache_path else {}
+    entries: dict[str, dict] = {}
+    stale: list[Path] = []
+    touched = False
     for path in sorted(root.iterdir()):
         if path.name.startswith("audit_") or not path.is_file():
             continue
-        if path.suffix.casefold() == ".md":
-            occurrences.extend(_iter_markdown(path, root))
-        elif path.suffix.casefold() == ".csv":
-            occurrences.extend(_iter_csv(path, root))
-        elif path.suffix.casefold() == ".xlsx":
-            occurrences.extend(_iter_xlsx(path, root))
+        if path.suffix.casefold() not in SCANNED_SUFFIXES:
+            continue
+        name = str(path.relative_to(root))
+        stat = path.stat()
+        entry = previous.get(name)
+        if entry and (entry["size"], entry["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+            entries[name] = entry
+            continue
+        digest = _file_sha256(path) if cache_path else ""
+        if entry and entry["sha256"] == digest:
+            entries[name] = {**entry, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+            touched = True
+            continue
+        entries[name] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest}
+        stale.append(path)
+
+    for path, found in zip(stale, _scan_files(stale, root, jobs)):
+        entries[str(path.relative_to(root))]["occurrences"] = [asdict(item) for item in found]
+
+    if cache_path and (stale or touched or entries.keys() != previous.keys()):
+        _write_scan_cache(cache_path, root, entries)
+    if stats is not None:
+        stats.update(file_count=len(entries), rescanned_file_count=len(stale))
+
+    occurrences = [
+        ReferenceOccurrence(**item)
+        for entry in entries.values()
+        for item in entry["occurrences"]
+    ]
 
     unique: dict[tuple, ReferenceOccurrence] = {}
     for occurrence in occurrences:
@@ -524,50 +671,55 @@ def _media_path_candidates(text: str) -> set[str]:
     return candidates
 
 
-def _objects_for_media_path(media_path: str) -> list[tuple[str, int]]:
-    matches: list[tuple[str, int]] = []
-    for pk in PDFDocument.objects.filter(file=media_path).values_list("pk", flat=True):
-        matches.append(("PDFDocument", pk))
-    for pk in Document.objects.filter(file_source=media_path).values_list("pk", flat=True):
-        matches.append(("Document", pk))
-    for pk in Photo.objects.filter(file=media_path).values_list("pk", flat=True):
-        matches.append(("Photo", pk))
-    return matches
+# Media paths cited by descriptive piece files, with the field storing them.
+MEDIA_PATH_FIELDS: tuple[tuple[str, type[Model], str], ...] = (
+    ("PDFDocument", PDFDocument, "file"),
+    ("Document", Document, "file_source"),
+    ("Photo", Photo, "file"),
+)
 
 
-def resolve_descriptive_piece_occurrences(
-    occurrences: list[ReferenceOccurrence],
-    legal_dir: Path,
-) -> list[ReferenceOccurrence]:
-    """Resolve descriptive ``piece_*.md`` aliases from their source blocks.
+def _collation_key(value: str) -> str:
+    """``value`` as compared by a case- and accent-insensitive collation (MySQL default)."""
+    decomposed = unicodedata.normalize("NFD", value)
+    return "".join(char for char in decomposed if unicodedata.category(char) != "Mn").casefold()
 
-    A descriptive file can resolve to one source or to several components.  In
-    the latter case one canonical occurrence is emitted for every explicitly
-    identified component, while the alias spelling is preserved.
+
+def _descriptive_piece_path(occurrence: ReferenceOccurrence, legal_dir: Path) -> Path | None:
+    if occurrence.reference_form != "unparsed_piece_reference":
+        return None
+    basename = occurrence.raw_reference
+    if basename == "piece_….md":
+        return None
+    if not basename.casefold().endswith(".md"):
+        basename += ".md"
+    piece_path = legal_dir / basename
+    return piece_path if piece_path.is_file() else None
+
+
+class DescriptivePieceIndex:
+    """Identities of descriptive ``piece_*.md`` files, resolved in batches.
+
+    Each source block is read once.  The media paths cited by a batch of new
+    blocks are resolved together, with one ``__in`` query per model of
+    ``MEDIA_PATH_FIELDS``, into a path -> (model, pk) map kept for the life of
+    the index.  Share one index across calls to keep the query count constant.
     """
-    cache: dict[str, list[tuple[str, int]]] = {}
-    resolved: list[ReferenceOccurrence] = []
-    for occurrence in occurrences:
-        if occurrence.reference_form != "unparsed_piece_reference":
-            resolved.append(occurrence)
-            continue
 
-        basename = occurrence.raw_reference
-        if basename == "piece_….md":
-            resolved.append(occurrence)
-            continue
-        if not basename.casefold().endswith(".md"):
-            basename += ".md"
-        piece_path = legal_dir / basename
-        if not piece_path.is_file():
-            resolved.append(occurrence)
-            continue
+    def __init__(self) -> None:
+        self._identities: dict[Path, list[tuple[str, int]]] = {}
+        self._media_paths: dict[str, list[tuple[str, int]]] = {}
 
-        if basename not in cache:
+    def prepare(self, occurrences: Iterable[ReferenceOccurrence], legal_dir: Path) -> None:
+        pending: dict[Path, tuple[set[tuple[str, int]], set[str]]] = {}
+        for occurrence in occurrences:
+            piece_path = _descriptive_piece_path(occurrence, legal_dir)
+            if piece_path is None or piece_path in self._identities or piece_path in pending:
+                continue
             source_block = _piece_source_block(piece_path)
             source_occurrences = extract_references_from_text(
                 source_block,
-                source_file=basename,
+                source_file=piece_path.name,
                 source_format="piece_source_block",
                 source_location="source_block",
                 context=source_block,
@@ -577,11 +729,59 @@ def resolve_descriptive_piece_occurrences(
                 for item in source_occurrences
                 if item.model and item.pk is not None
             }
-            for media_path in _media_path_candidates(source_block):
-                identities.update(_objects_for_media_path(media_path))
-            cache[basename] = sorted(identities, key=lambda item: (item[0], item[1]))
+            pending[piece_path] = (identities, _media_path_candidates(source_block))
+
+        self._load_media_paths({path for _, paths in pending.values() for path in paths})
+        for piece_path, (identities, media_paths) in pending.items():
+            for media_path in media_paths:
+                identities.update(self._media_paths[media_path])
+            self._identities[piece_path] = sorted(identities, key=lambda item: (item[0], item[1]))
+
+    def _load_media_paths(self, media_paths: set[str]) -> None:
+        missing = sorted(media_paths - self._media_paths.keys())
+        if not missing:
+            return
+        # Under a case- or accent-insensitive collation the database returns the
+        # stored spelling, which may differ from the cited one: a match goes to
+        # the identical requested path, else to the paths collating equal to it.
+        requested: dict[str, list[str]] = defaultdict(list)
+        for media_path in missing:
+            self._media_paths[media_path] = []
+            requested[_collation_key(media_path)].append(media_path)
+        for model_name, model_class, field in MEDIA_PATH_FIELDS:
+            matches = model_class.objects.filter(**{f"{field}__in": missing}).values_list("pk", field)
+            for pk, stored_path in matches:
+                cited_paths = requested.get(_collation_key(stored_path), [])
+                if stored_path in cited_paths:
+                    cited_paths = [stored_path]
+                for media_path in cited_paths:
+                    self._media_paths[media_path].append((model_name, pk))
+
+    def identities(self, piece_path: Path) -> list[tuple[str, int]]:
+        return self._identities[piece_path]
+
+
+def resolve_descriptive_piece_occurrences(
+    occurrences: list[ReferenceOccurrence],
+    legal_dir: Path,
+    index: DescriptivePieceIndex | None = None,
+) -> list[ReferenceOccurrence]:
+    """Resolve descriptive ``piece_*.md`` aliases from their source blocks.
+
+    A descriptive file can resolve to one source or to several components.  In
+    the latter case one canonical occurrence is emitted for every explicitly
+    identified component, while the alias spelling is preserved.
+    """
+    index = index or DescriptivePieceIndex()
+    index.prepare(occurrences, legal_dir)
+    resolved: list[ReferenceOccurrence] = []
+    for occurrence in occurrences:
+        piece_path = _descriptive_piece_path(occurrence, legal_dir)
+        if piece_path is None:
+            resolved.append(occurrence)
+            continue
 
-        identities = cache[basename]
+        identities = index.identities(piece_path)
         if not identities:
             resolved.append(
                 ReferenceOccurrence(
@@ -607,23 +807,35 @@ def resolve_descriptive_piece_occurrences(
     return resolved
 
 
-def _field_file_status(field_file) -> tuple[bool, str]:
+def _field_file_status(field_file, known: dict | None = None) -> tuple[bool, str]:
     if not field_file or not getattr(field_file, "name", ""):
         return False, ""
     name = str(field_file.name)
+    key = (id(field_file.storage), name)
+    if known is not None and key in known:
+        return known[key], name
     try:
-        return bool(field_file.storage.exists(name)), name
+        exists = bool(field_file.storage.exists(name))
     except Exception:
         try:
-            return os.path.exists(field_file.path), name
+            exists = os.path.exists(field_file.path)
         except Exception:
-            return False, name
+            exists = False
+    if known is not None:
+        known[key] = exists
+    return exists, name
 
 
-def _legacy_file_status(path_value: str | None) -> tuple[bool, str]:
+def _legacy_file_status(path_value: str | None, known: dict | None = None) -> tuple[bool, str]:
     if not path_value:
         return False, ""
-    return os.path.exists(path_value), os.path.basename(path_value)
+    if known is None:
+        exists = os.path.exists(path_value)
+    elif path_value in known:
+        exists = known[path_value]
+    else:
+        exists = known[path_value] = os.path.exists(path_value)
+    return exists, os.path.basename(path_value)
 
 
 def _aggregate_status(results: Iterable[tuple[bool, str]]) -> tuple[str, str]:
@@ -639,54 +851,75 @@ def _aggregate_status(results: Iterable[tuple[bool, str]]) -> tuple[str, str]:
     return "none_available", references
 
 
-def object_original_status(obj: Model) -> tuple[str, str]:
+def _component_statuses(objects: Iterable[Model], known: dict | None) -> Iterator[tuple[bool, str]]:
+    for obj in objects:
+        status, reference = object_original_status(obj, known)
+        yield status == "available", reference
+
+
+def object_original_status(obj: Model, known: dict | None = None) -> tuple[str, str]:
+    """Availability of the object's original file(s).
+
+    ``known`` memoizes existence checks across calls, so that files shared by
+    several objects are looked up once.
+    """
     if isinstance(obj, PDFDocument):
-        exists, reference = _field_file_status(obj.file)
+        exists, reference = _field_file_status(obj.file, known)
         return ("available" if exists else "missing", reference)
     if isinstance(obj, Document):
-        exists, reference = _field_file_status(obj.file_source)
+        exists, reference = _field_file_status(obj.file_source, known)
         return ("available" if exists else "missing", reference)
     if isinstance(obj, Email):
-        file_exists, file_reference = _field_file_status(obj.eml_file)
+        file_exists, file_reference = _field_file_status(obj.eml_file, known)
         if file_exists:
             return "available", file_reference
-        legacy_exists, legacy_reference = _legacy_file_status(obj.eml_file_path)
+        legacy_exists, legacy_reference = _legacy_file_status(obj.eml_file_path, known)
         return ("available" if legacy_exists else "missing", legacy_reference or file_reference)
     if isinstance(obj, Photo):
-        file_exists, file_reference = _field_file_status(obj.file)
+        file_exists, file_reference = _field_file_status(obj.file, known)
         if file_exists:
             return "available", file_reference
-        legacy_exists, legacy_reference = _legacy_file_status(obj.file_path)
+        legacy_exists, legacy_reference = _legacy_file_status(obj.file_path, known)
         return ("available" if legacy_exists else "missing", legacy_reference or file_reference)
     if isinstance(obj, PhotoDocument):
-        return _aggregate_status(object_original_status(photo)[0] == "available" and (True, str(photo.file.name or photo.file_path)) or (False, str(photo.file.name or photo.file_path)) for photo in obj.photos.all())
+        return _aggregate_status(
+            (
+                object_original_status(photo, known)[0] == "available",
+                str(photo.file.name or photo.file_path),
+            )
+            for photo in obj.photos.all()
+        )
     if isinstance(obj, Event):
         photos = list(obj.linked_photos.all())
         if photos:
-            return _aggregate_status(
-                (
-                    object_original_status(photo)[0] == "available",
-                    object_original_status(photo)[1],
-                )
-                for photo in photos
-            )
+            return _aggregate_status(_component_statuses(photos, known))
         if obj.linked_email_id:
-            status, reference = object_original_status(obj.linked_email)
+            status, reference = object_original_status(obj.linked_email, known)
             return ("available" if status == "available" else "missing", reference)
         return "no_attached_original", ""
     if isinstance(obj, EmailThread):
-        return _aggregate_status(
-            (
-                object_original_status(email)[0] == "available",
-                object_original_status(email)[1],
-            )
-            for email in obj.emails.all()
-        )
+        return _aggregate_status(_component_statuses(obj.emails.all(), known))
     if isinstance(obj, (ChatMessage, ChatSequence)):
         return "render_required", "database content"
     return "not_supported", ""
 
 
+def original_statuses(objects_by_key: dict, threads: int = STORAGE_CHECK_THREADS) -> dict:
+    """Check the originals of many prefetched objects in one batch.
+
+    Lookups run in a thread pool and share one existence memo; the objects
+    must already carry the relations read by ``object_original_status``.
+    """
+    known: dict = {}
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        statuses = pool.map(
+            object_original_status,
+            objects_by_key.values(),
+            repeat(known),
+        )
+        return dict(zip(objects_by_key, statuses))
+
+
 def _object_date(obj: Model) -> str:
     value = None
     if isinstance(obj, PDFDocument):
@@ -759,6 +992,7 @@ def audit_occurrences(occurrences: list[ReferenceOccurrence]) -> dict:
             queryset = queryset.prefetch_related("messages")
         for obj in queryset:
             objects_by_key[(model_name, obj.pk)] = obj
+    statuses_by_key = original_statuses(objects_by_key)
 
     canonical_rows: list[dict] = []
     alias_rows: list[dict] = []
@@ -770,7 +1004,7 @@ def audit_occurrences(occurrences: list[ReferenceOccurrence]) -> dict:
         raw_references = sorted({item.raw_reference for item in group}, key=str.casefold)
         source_files = sorted({item.source_file for item in group}, key=str.casefold)
         if obj:
-            original_status, original_reference = object_original_status(obj)
+            original_status, original_reference = statuses_by_key[key]
             db_status = "found"
             object_date = _object_date(obj)
             object_title = _object_title(obj)
@@ -0,0 +1,227 @@
+# case_manager/exhibit_renderers/cache.py
+
+"""
+Cache de rendu adressé par contenu pour sync_pieces_pdf.
+
+Chaque cote reçoit une empreinte calculée à partir de tout ce qui influence
+son PDF : la ligne du bordereau, les champs DB lus par le renderer, le
+contenu des fichiers sources et le code des renderers (constantes de mise
+en page de common.py incluses). Une cote dont l'empreinte est déjà en cache
+est liée (hard link) ou copiée au lieu d'être rendue à nouveau.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+from functools import lru_cache
+from pathlib import Path
+
+import fitz
+import PIL
+from django.conf import settings
+
+from .email import _read_eml_bytes
+from .manual import MANUAL_DIR
+from .sources import ordered_related
+
+
+RENDER_CACHE_DIR = (
+    Path(settings.BASE_DIR)
+    / ".pieces_pdf_cache"
+)
+
+_HASH_CHUNK = 1024 * 1024
+
+
+@lru_cache(maxsize=1)
+def renderer_code_fingerprint() -> str:
+    """
+    Empreinte du code de rendu : tout changement d'un renderer ou d'une
+    constante de mise en page invalide l'ensemble du cache.
+    """
+    digest = hashlib.sha256()
+
+    for path in sorted(Path(__file__).parent.glob("*.py")):
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+
+    digest.update(fitz.VersionBind.encode())
+    digest.update(PIL.__version__.encode())
+
+    return digest.hexdigest()
+
+
+def _file_digest(field_file) -> str:
+    if not field_file:
+        return "missing"
+
+    digest = hashlib.sha256()
+
+    try:
+        with field_file.open("rb") as handle:
+            for block in iter(lambda: handle.read(_HASH_CHUNK), b""):
+                digest.update(block)
+    except (FileNotFoundError, OSError):
+        return "unreadable"
+
+    return digest.hexdigest()
+
+
+def _email_parts(email) -> list:
+    eml = _read_eml_bytes(email)
+
+    return [
+        email.pk,
+        str(email.date_sent or ""),
+        email.sender,
+        email.recipients_to,
+        email.recipients_cc,
+        email.subject,
+        email.body_plain_text,
+        hashlib.sha256(eml).hexdigest() if eml else None,
+    ]
+
+
+def _photo_parts(photo) -> list:
+    return [photo.pk, _file_digest(photo.file)]
+
+
+def _manual_parts(source) -> list:
+    directory = (
+        MANUAL_DIR
+        / f"{source.__class__.__name__.lower()}-{source.pk}"
+    )
+
+    if not directory.exists():
+        return [directory.name, None]
+
+    return [
+        directory.name,
+        [
+            (p.name, hashlib.sha256(p.read_bytes()).hexdigest())
+            for p in sorted(directory.iterdir())
+            if p.is_file()
+        ],
+    ]
+
+
+# Parties de l'empreinte par type de cote : exactement ce que lit le
+# renderer correspondant (mêmes champs, même ordre des sous-objets).
+SOURCE_PARTS = {
+    "pdf": lambda pdf: [
+        pdf.pk,
+        pdf.title,
+        _file_digest(pdf.file),
+    ],
+    "photo": _photo_parts,
+    "photodoc": lambda photodoc: [
+        photodoc.pk,
+        photodoc.title,
+        photodoc.description,
+        [
+            _photo_parts(p)
+            for p in ordered_related(photodoc, "photos", "pk")
+        ],
+    ],
+    "event": lambda event: [
+        event.pk,
+        str(event.date),
+        event.explanation,
+        [
+            _photo_parts(p)
+            for p in ordered_related(
+                event, "linked_photos", "datetime_original", "pk"
+            )
+        ],
+    ],
+    "email": _email_parts,
+    "thread": lambda thread: [
+        thread.pk,
+        [
+            _email_parts(e)
+            for e in ordered_related(thread, "emails", "date_sent", "pk")
+        ],
+    ],
+    "document": _manual_parts,
+    "chatsequence": _manual_parts,
+}
+
+
+def source_fingerprint(row, ref, sources) -> str | None:
+    """
+    Empreinte d'une cote, ou None si son type n'est pas couvert par le
+    cache (la cote est alors toujours rendue).
+    """
+    parts = SOURCE_PARTS.get(ref.kind)
+
+    if parts is None:
+        return None
+
+    digest = hashlib.sha256()
+
+    for value in (
+        renderer_code_fingerprint(),
+        ref.kind,
+        row.cote,
+        row.description,
+        row.date,
+        [parts(source) for source in sources],
+    ):
+        digest.update(repr(value).encode("utf-8"))
+        digest.update(b"\0")
+
+    return digest.hexdigest()
+
+
+def _cache_path(fingerprint: str, cache_dir: Path) -> Path:
+    return cache_dir / f"{fingerprint}.pdf"
+
+
+def _link_or_copy(source: Path, destination: Path) -> None:
+    destination.parent.mkdir(parents=True, exist_ok=True)
+
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copyfile(source, destination)
+
+
+def fetch(fingerprint: str, destination: Path, cache_dir: Path = RENDER_CACHE_DIR) -> bool:
+    """Place le PDF en cache à destination. Retourne False en cas d'absence."""
+    cached = _cache_path(fingerprint, cache_dir)
+
+    if not cached.is_file():
+        return False
+
+    _link_or_copy(cached, destination)
+
+    return True
+
+
+def store(fingerprint: str, output: Path, cache_dir: Path = RENDER_CACHE_DIR) -> None:
+    cached = _cache_path(fingerprint, cache_dir)
+
+    if cached.exists():
+        return
+
+    # Écriture atomique : un processus concurrent ne voit jamais un PDF partiel.
+    partial = cached.with_suffix(f".{os.getpid()}.part")
+    _link_or_copy(output, partial)
+    os.replace(partial, cached)
+
+
+def prune(keep: set[str], cache_dir: Path = RENDER_CACHE_DIR) -> int:
+    """Supprime les entrées qui ne correspondent à aucune cote courante."""
+    if not cache_dir.exists():
+        return 0
+
+    removed = 0
+
+    for path in cache_dir.glob("*.pdf"):
+        if path.stem not in keep:
+            path.unlink()
+            removed += 1
+
+    return removed
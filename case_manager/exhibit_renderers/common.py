@@ -2,7 +2,10 @@
 
 from __future__ import annotations
 
-import re
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
 from io import BytesIO
 from pathlib import Path
 
@@ -168,35 +171,141 @@ def add_section_page(
 # Images
 # ---------------------------------------------------------------------------
 
-def normalize_image_bytes(
+# Résolution cible sur la surface utile de la page : au-delà, les pixels
+# ne sont ni visibles à l'écran ni à l'impression, mais pèsent dans le PDF.
+IMAGE_TARGET_DPI = {
+    "jpeg": 200,
+    "png": 300,  # captures/documents : marge pour la lisibilité du texte
+}
+
+# Images préparées conservées en mémoire (une même photo peut figurer dans
+# plusieurs pièces : événement, liasse, photo seule).
+IMAGE_CACHE_SIZE = 32
+
+_EXIF_ORIENTATION = 0x0112
+
+
+@dataclass(frozen=True)
+class PreparedImage:
+    data: bytes
+    width: int
+    height: int
+    digest: str
+
+
+_prepared_images: OrderedDict[tuple, PreparedImage] = OrderedDict()
+
+
+def _target_pixels(image_format: str) -> tuple[int, int]:
+    dpi = IMAGE_TARGET_DPI[image_format]
+
+    return (
+        round((PAGE_WIDTH - MARGIN_LEFT - MARGIN_RIGHT) / 72 * dpi),
+        round((PAGE_HEIGHT - MARGIN_TOP - MARGIN_BOTTOM) / 72 * dpi),
+    )
+
+
+def prepare_image(
     raw: bytes,
     *,
     image_format: str = "jpeg",
     quality: int = 92,
-) -> bytes:
+) -> PreparedImage:
     """
-    Corrige l'orientation EXIF et réécrit l'image dans le format demandé.
+    Corrige l'orientation EXIF, réduit l'image à IMAGE_TARGET_DPI sur la
+    surface utile de la page et la réécrit dans le format demandé.
 
     image_format="png"  -> **sans perte** : pour les captures et documents
                            (fidélité du texte — P-8, P-101, documents scannés).
     image_format="jpeg" -> qualité `quality` : pour les photographies
                            (liasses d'événements — taille maîtrisée).
+
+    Une image déjà au bon format, droite et assez petite est conservée
+    telle quelle. Le résultat est déterministe : une même source donne
+    les mêmes octets, ce qui permet de la partager entre pièces.
     """
-    with Image.open(BytesIO(raw)) as image:
-        image = ImageOps.exif_transpose(image)
+    key = (
+        hashlib.sha256(raw).hexdigest(),
+        image_format,
+        quality,
+    )
+
+    cached = _prepared_images.get(key)
+
+    if cached is not None:
+        _prepared_images.move_to_end(key)
+        return cached
 
-        output = BytesIO()
+    max_width, max_height = _target_pixels(image_format)
+
+    with Image.open(BytesIO(raw)) as image:
+        orientation = image.getexif().get(_EXIF_ORIENTATION, 1)
 
         if image_format == "png":
-            if image.mode not in ("RGB", "RGBA", "L"):
-                image = image.convert("RGB")
-            image.save(output, format="PNG")
+            native, modes = "PNG", ("RGB", "RGBA", "L")
+        else:
+            native, modes = "JPEG", ("RGB", "L")
+
+        if (
+            image.format == native
+            and orientation == 1
+            and image.mode in modes
+            and image.width <= max_width
+            and image.height <= max_height
+        ):
+            data = raw
+            width, height = image.size
+
         else:
-            if image.mode not in ("RGB", "L"):
+            # Réduction avant redressement : thumbnail décode les JPEG
+            # directement à l'échelle réduite (draft).
+            if orientation in (5, 6, 7, 8):
+                image.thumbnail((max_height, max_width), Image.LANCZOS)
+            else:
+                image.thumbnail((max_width, max_height), Image.LANCZOS)
+
+            image = ImageOps.exif_transpose(image)
+
+            if image.mode not in modes:
                 image = image.convert("RGB")
-            image.save(output, format="JPEG", quality=quality)
 
-        return output.getvalue()
+            output = BytesIO()
+
+            if image_format == "png":
+                image.save(output, format="PNG")
+            else:
+                image.save(output, format="JPEG", quality=quality)
+
+            data = output.getvalue()
+            width, height = image.size
+
+    prepared = PreparedImage(
+        data=data,
+        width=width,
+        height=height,
+        digest=hashlib.sha256(data).hexdigest(),
+    )
+
+    _prepared_images[key] = prepared
+
+    while len(_prepared_images) > IMAGE_CACHE_SIZE:
+        _prepared_images.popitem(last=False)
+
+    return prepared
+
+
+def normalize_image_bytes(
+    raw: bytes,
+    *,
+    image_format: str = "jpeg",
+    quality: int = 92,
+) -> bytes:
+    """Octets de l'image préparée par prepare_image."""
+    return prepare_image(
+        raw,
+        image_format=image_format,
+        quality=quality,
+    ).data
 
 
 def add_image_page(
@@ -204,35 +313,33 @@ def add_image_page(
     image_bytes: bytes,
     *,
     image_format: str = "jpeg",
+    shared_xrefs: dict[str, int] | None = None,
 ) -> fitz.Page:
     """
     Une image par page, centrée et redimensionnée sans déformation.
     `image_format` : "png" (captures/documents) ou "jpeg" (photographies).
+
+    `shared_xrefs` (empreinte -> xref), tenu par le renderer propriétaire
+    de `doc` : une image identique déjà insérée est réutilisée (même xref)
+    au lieu d'être incorporée une seconde fois.
     """
-    normalized = normalize_image_bytes(
+    prepared = prepare_image(
         image_bytes,
         image_format=image_format,
     )
 
-    image_doc = fitz.open(
-        stream=normalized,
-        filetype=image_format,
-    )
-
-    pix = image_doc[0].get_pixmap()
-
     page = add_page(doc)
 
     available_width = PAGE_WIDTH - MARGIN_LEFT - MARGIN_RIGHT
     available_height = PAGE_HEIGHT - MARGIN_TOP - MARGIN_BOTTOM
 
     ratio = min(
-        available_width / pix.width,
-        available_height / pix.height,
+        available_width / prepared.width,
+        available_height / prepared.height,
     )
 
-    width = pix.width * ratio
-    height = pix.height * ratio
+    width = prepared.width * ratio
+    height = prepared.height * ratio
 
     x0 = (PAGE_WIDTH - width) / 2
     y0 = (PAGE_HEIGHT - height) / 2
@@ -244,13 +351,27 @@ def add_image_page(
         y0 + height,
     )
 
-    page.insert_image(
-        target,
-        stream=normalized,
-        keep_proportion=True,
+    xref = (
+        shared_xrefs.get(prepared.digest, 0)
+        if shared_xrefs is not None
+        else 0
     )
 
-    image_doc.close()
+    if xref:
+        page.insert_image(
+            target,
+            xref=xref,
+            keep_proportion=True,
+        )
+    else:
+        xref = page.insert_image(
+            target,
+            stream=prepared.data,
+            keep_proportion=True,
+        )
+
+        if shared_xrefs is not None:
+            shared_xrefs[prepared.digest] = xref
 
     return page
 
@@ -292,49 +413,111 @@ def save_document(
 # Pagination fiable du texte long (courriels)
 # ---------------------------------------------------------------------------
 
-def _text_fits(
-    text: str,
-    rect: fitz.Rect,
-    fontsize: float,
-    fontname: str,
-) -> bool:
+# Tolérance de débordement vertical d'insert_textbox (pymupdf.EPSILON).
+_FIT_EPSILON = 1e-5
+
+
+@lru_cache(maxsize=None)
+def _font_metrics(fontname: str) -> tuple[tuple[float, ...], float, float]:
     """
-    Teste, sur une page jetable, si `text` tient ENTIÈREMENT dans `rect`.
-    insert_textbox retourne la hauteur inutilisée (>= 0) ou un débordement
-    (< 0).
+    Largeurs unitaires des 256 codes (celles qu'utilise insert_textbox pour
+    une police simple), ascendante et descendante. Mesurées une seule fois
+    par police, sur un document jetable.
     """
     tmp = fitz.open()
     page = tmp.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
-    rc = page.insert_textbox(
-        rect,
-        text,
-        fontsize=fontsize,
-        fontname=fontname,
-        align=fitz.TEXT_ALIGN_LEFT,
-    )
+    xref = page.insert_font(fontname=fontname)
+    widths = tuple(w for _, w in tmp.get_char_widths(xref, 256))
     tmp.close()
-    return rc >= 0
+
+    font = fitz.Font(fontname)
+    return widths, font.ascender, font.descender
 
 
-def _largest_prefix(
-    tokens: list[str],
+def _wrap_lines(
+    text: str,
+    widths: tuple[float, ...],
+    fontsize: float,
+    maxwidth: float,
+):
+    """
+    Découpe `text` en lignes exactement comme Shape.insert_textbox (aligné
+    à gauche) : coupure gloutonne aux espaces, mot trop long coupé par
+    caractère, une ligne (éventuellement vide) par saut de ligne.
+
+    Générateur : la valeur envoyée par send() remplace la largeur utile à
+    partir de la ligne suivante (changement de rectangle entre deux pages).
+    """
+    def units(s: str) -> float:
+        # Même sommation que pixlen() dans insert_textbox (résultats identiques
+        # au bit près) ; les codes > 255 y sont remplacés par « ? ».
+        return sum([widths[ord(c)] if ord(c) < 256 else widths[63] for c in s])
+
+    blen = widths[32] * fontsize
+
+    for line in text.splitlines():
+        lbuff = ""
+        rest = maxwidth
+
+        for word in line.expandtabs(1).split(" "):
+            pl_w = units(word) * fontsize
+
+            if rest >= pl_w:
+                lbuff += word + " "
+                rest -= pl_w + blen
+                continue
+
+            if lbuff:
+                maxwidth = (yield lbuff.rstrip()) or maxwidth
+
+            lbuff = ""
+            rest = maxwidth
+
+            if pl_w <= maxwidth:
+                lbuff = word + " "
+                rest = maxwidth - pl_w - blen
+                continue
+
+            # Mot plus large qu'une ligne : coupé caractère par caractère,
+            # la largeur du tampon étant cumulée plutôt que remesurée.
+            used = 0.0
+            for c in word:
+                c_w = units(c)
+                if used * fontsize <= maxwidth - c_w * fontsize:
+                    lbuff += c
+                    used += c_w
+                else:
+                    maxwidth = (yield lbuff) or maxwidth
+                    lbuff, used = c, c_w
+
+            lbuff += " "
+            rest = maxwidth - (used + widths[32]) * fontsize
+
+        maxwidth = (yield lbuff.rstrip()) or maxwidth
+
+
+def _lines_per_rect(
     rect: fitz.Rect,
     fontsize: float,
-    fontname: str,
+    ascender: float,
+    descender: float,
 ) -> int:
     """
-    Nombre de tokens de tête dont la concaténation tient dans `rect`
-    (recherche par dichotomie ; monotone).
+    Nombre de lignes qu'insert_textbox accepte dans `rect` (même calcul de
+    hauteur et même tolérance que PyMuPDF).
     """
-    lo, hi, best = 0, len(tokens), 0
-    while lo <= hi:
-        mid = (lo + hi) // 2
-        candidate = "".join(tokens[:mid])
-        if mid == 0 or _text_fits(candidate, rect, fontsize, fontname):
-            best, lo = mid, mid + 1
-        else:
-            hi = mid - 1
-    return best
+    factor = ascender - descender if ascender - descender > 1 else 1.2
+    lheight = fontsize * factor
+
+    def fits(count: int) -> bool:
+        return lheight * count - descender * fontsize - rect.height <= _FIT_EPSILON
+
+    count = max(0, int((rect.height + descender * fontsize) / lheight))
+    while count > 0 and not fits(count):
+        count -= 1
+    while fits(count + 1):
+        count += 1
+    return count
 
 
 def add_paginated_text(
@@ -348,9 +531,10 @@ def add_paginated_text(
 ) -> None:
     """
     Insère `text` en le paginant sur autant de pages que nécessaire, sans
-    jamais perdre de contenu : pour chaque page, on cherche par dichotomie
-    le plus grand fragment (en tokens, espaces et sauts de ligne conservés)
-    qui tient réellement.
+    jamais perdre de contenu. La mise en page est calculée en une seule
+    passe (largeurs de glyphes mesurées une fois, coupure gloutonne des
+    lignes identique à insert_textbox) ; chaque page reçoit ensuite
+    exactement les lignes qui y tiennent, en un seul insert_textbox.
 
     `first_page` / `first_rect` permettent de commencer sous un en-tête
     (courriel) ; les pages suivantes utilisent toute la surface utile.
@@ -362,10 +546,11 @@ def add_paginated_text(
         PAGE_HEIGHT - MARGIN_BOTTOM,
     )
 
-    text = text or ""
-    tokens = re.split(r"(\s+)", text)  # conserve espaces et sauts de ligne
+    # Les lignes vides finales sont invisibles mais pourraient à elles
+    # seules ouvrir une page blanche.
+    text = (text or "").rstrip()
 
-    if not "".join(tokens).strip():
+    if not text:
         return
 
     if first_page is not None:
@@ -373,24 +558,37 @@ def add_paginated_text(
     else:
         page, rect = add_page(doc), full_rect
 
-    i = 0
-    while i < len(tokens):
-        n = _largest_prefix(tokens[i:], rect, fontsize, fontname)
+    widths, ascender, descender = _font_metrics(fontname)
 
-        if n == 0:
-            # Un token seul déborde même une page vide : on le force pour
-            # garantir la progression (cas extrême d'un « mot » gigantesque).
-            n = 1
+    if rect != full_rect and not _lines_per_rect(rect, fontsize, ascender, descender):
+        # Aucune ligne ne tient sous l'en-tête : on commence page suivante.
+        page, rect = add_page(doc), full_rect
+
+    lines = _wrap_lines(text, widths, fontsize, rect.width)
+    pending = next(lines, None)
+
+    while pending is not None:
+        # Au moins une ligne par page pour garantir la progression.
+        capacity = max(1, _lines_per_rect(rect, fontsize, ascender, descender))
+
+        chunk = []
+        while pending is not None and len(chunk) < capacity:
+            chunk.append(pending)
+            # La ligne suivante est découpée pour cette page tant qu'elle
+            # n'est pas pleine, sinon pour la page suivante (full_rect).
+            width = rect.width if len(chunk) < capacity else full_rect.width
+            try:
+                pending = lines.send(width)
+            except StopIteration:
+                pending = None
 
         page.insert_textbox(
             rect,
-            "".join(tokens[i:i + n]),
+            "\n".join(chunk),
             fontsize=fontsize,
             fontname=fontname,
             align=fitz.TEXT_ALIGN_LEFT,
         )
 
-        i += n
-
-        if i < len(tokens):
+        if pending is not None:
             page, rect = add_page(doc), full_rect
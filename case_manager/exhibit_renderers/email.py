@@ -125,13 +125,14 @@ IMAGE_SUFFIXES = (
 )
 
 
-def render_attachments_into_document(doc, *, email, label):
+def render_attachments_into_document(doc, *, email, label, image_xrefs=None):
     """
     Rend chaque pièce jointe après le corps du courriel :
       - PDF    -> pages fusionnées
       - image  -> une page image (PNG, fidélité — souvent un document scanné)
       - autre  -> page de note (ex. .docx : conversion à définir)
     Toute pièce jointe illisible produit une note, jamais un crash.
+    `image_xrefs` : index des images du document (voir add_image_page).
     """
     for filename, ctype, payload in extract_eml_attachments(email):
         low = filename.lower()
@@ -147,7 +148,7 @@ def render_attachments_into_document(doc, *, email, label):
 
             elif is_image:
                 add_section_page(doc, label=pj_label, title=filename)
-                add_image_page(doc, payload, image_format="png")
+                add_image_page(doc, payload, image_format="png", shared_xrefs=image_xrefs)
 
             else:
                 add_section_page(
@@ -180,6 +181,7 @@ def render_email_into_document(
     *,
     email,
     label: str,
+    image_xrefs: dict[str, int] | None = None,
 ):
     page = add_page(doc)
 
@@ -245,6 +247,7 @@ def render_email_into_document(
         doc,
         email=email,
         label=label,
+        image_xrefs=image_xrefs,
     )
 
 
@@ -261,6 +264,7 @@ class EmailRenderer(
     ) -> Path:
 
         doc = new_document()
+        image_xrefs: dict[str, int] = {}
 
         add_exhibit_cover(
             doc,
@@ -286,6 +290,7 @@ class EmailRenderer(
                 doc,
                 email=email,
                 label=label,
+                image_xrefs=image_xrefs,
             )
 
         return save_document(
@@ -12,6 +12,9 @@ from .common import (
 from .email import (
     render_email_into_document,
 )
+from .sources import (
+    ordered_related,
+)
 
 
 class EmailThreadRenderer(
@@ -35,6 +38,7 @@ class EmailThreadRenderer(
         thread = sources[0]
 
         doc = new_document()
+        image_xrefs: dict[str, int] = {}
 
         add_exhibit_cover(
             doc,
@@ -44,13 +48,11 @@ class EmailThreadRenderer(
             source_type="Fil de courriels",
         )
 
-        emails = list(
-            thread.emails
-            .all()
-            .order_by(
-                "date_sent",
-                "pk",
-            )
+        emails = ordered_related(
+            thread,
+            "emails",
+            "date_sent",
+            "pk",
         )
 
         if not emails:
@@ -70,6 +72,7 @@ class EmailThreadRenderer(
                     f"{row.cote} — "
                     f"courriel {index}/{len(emails)}"
                 ),
+                image_xrefs=image_xrefs,
             )
 
         return save_document(
@@ -10,6 +10,9 @@ from .common import (
     new_document,
     save_document,
 )
+from .sources import (
+    ordered_related,
+)
 
 
 class EventRenderer(BaseExhibitRenderer):
@@ -23,6 +26,7 @@ class EventRenderer(BaseExhibitRenderer):
     ) -> Path:
 
         doc = new_document()
+        image_xrefs: dict[str, int] = {}
 
         add_exhibit_cover(
             doc,
@@ -61,13 +65,11 @@ class EventRenderer(BaseExhibitRenderer):
                 description=explanation,
             )
 
-            photos = list(
-                event.linked_photos
-                .all()
-                .order_by(
-                    "datetime_original",
-                    "pk",
-                )
+            photos = ordered_related(
+                event,
+                "linked_photos",
+                "datetime_original",
+                "pk",
             )
 
             if not photos:
@@ -94,6 +96,7 @@ class EventRenderer(BaseExhibitRenderer):
                         doc,
                         handle.read(),
                         image_format="jpeg",
+                        shared_xrefs=image_xrefs,
                     )
 
         return save_document(
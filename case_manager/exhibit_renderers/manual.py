@@ -56,6 +56,7 @@ class ManualRenderer(
         )
 
         doc = new_document()
+        image_xrefs: dict[str, int] = {}
 
         add_exhibit_cover(
             doc,
@@ -110,6 +111,7 @@ class ManualRenderer(
                 add_image_page(
                     doc,
                     file_path.read_bytes(),
+                    shared_xrefs=image_xrefs,
                 )
 
         return save_document(
@@ -23,6 +23,7 @@ class PhotoRenderer(BaseExhibitRenderer):
     ) -> Path:
 
         doc = new_document()
+        image_xrefs: dict[str, int] = {}
 
         add_exhibit_cover(
             doc,
@@ -56,6 +57,7 @@ class PhotoRenderer(BaseExhibitRenderer):
                     doc,
                     handle.read(),
                     image_format="png",
+                    shared_xrefs=image_xrefs,
                 )
 
         return save_document(
@@ -10,6 +10,9 @@ from .common import (
     new_document,
     save_document,
 )
+from .sources import (
+    ordered_related,
+)
 
 
 class PhotoDocumentRenderer(
@@ -25,6 +28,7 @@ class PhotoDocumentRenderer(
     ) -> Path:
 
         doc = new_document()
+        image_xrefs: dict[str, int] = {}
 
         add_exhibit_cover(
             doc,
@@ -59,10 +63,10 @@ class PhotoDocumentRenderer(
 
             # Ordre = pk uniquement : préserve l'ordre des pages d'un
             # document papier multipage (ne pas réordonner par date EXIF).
-            photos = list(
-                photodoc.photos
-                .all()
-                .order_by("pk")
+            photos = ordered_related(
+                photodoc,
+                "photos",
+                "pk",
             )
 
             if not photos:
@@ -86,6 +90,7 @@ class PhotoDocumentRenderer(
                         doc,
                         handle.read(),
                         image_format="png",
+                        shared_xrefs=image_xrefs,
                     )
 
         return save_document(
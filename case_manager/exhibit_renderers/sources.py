@@ -0,0 +1,199 @@
+# case_manager/exhibit_renderers/sources.py
+
+"""
+Résolution groupée des sources du bordereau.
+
+Les références de toutes les cotes sont regroupées par modèle : une requête
+par modèle (deux pour les threads : par pk et par thread_id) et une par
+relation préchargée, quel que soit le nombre de cotes ou la longueur des
+plages. Les sous-objets (photos, courriels) sont préchargés dans l'ordre où
+le consommateur les lit ; ordered_related les retourne alors sans nouvelle
+requête.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+
+from django.db.models import Prefetch
+
+from document_manager.models import Document
+from email_manager.models import (
+    Email,
+    EmailThread,
+)
+from events.models import Event
+from googlechat_manager.models import (
+    ChatSequence,
+)
+from pdf_manager.models import PDFDocument
+from photos.models import (
+    Photo,
+    PhotoDocument,
+)
+
+
+KIND_MODELS = {
+    "pdf": PDFDocument,
+    "photo": Photo,
+    "photodoc": PhotoDocument,
+    "event": Event,
+    "email": Email,
+    "thread": EmailThread,
+    "document": Document,
+    "chatsequence": ChatSequence,
+}
+
+# Types dont seul le premier identifiant est lu.
+SINGLE_ID_KINDS = {"document", "chatsequence"}
+
+# Relations lues par les renderers PDF, dans leur ordre de rendu (voir aussi
+# cache.SOURCE_PARTS). Forme : type -> ((relation, ordre), ...).
+RENDER_RELATIONS = {
+    "photodoc": (("photos", ("pk",)),),
+    "event": (("linked_photos", ("datetime_original", "pk")),),
+    "thread": (("emails", ("date_sent", "pk")),),
+}
+
+
+def _prefetch_attr(relation: str, ordering) -> str:
+    # Pas de « __ » : Prefetch lirait to_attr comme un chemin de relation.
+    suffix = "_".join(ordering).replace("__", "_").replace("-", "desc_")
+    return f"_exhibit_{relation}_by_{suffix}"
+
+
+def ordered_related(instance, relation: str, *ordering) -> list:
+    """
+    Objets liés de instance dans l'ordre demandé : la liste préchargée par
+    SourceIndex si elle existe, sinon une requête.
+    """
+    prefetched = getattr(
+        instance, _prefetch_attr(relation, ordering), None
+    )
+
+    if prefetched is not None:
+        return prefetched
+
+    return list(
+        getattr(instance, relation).all().order_by(*ordering)
+    )
+
+
+def _key(raw_id: str):
+    return int(raw_id) if raw_id.isdigit() else raw_id
+
+
+class SourceIndex:
+    """
+    Objets Django de toutes les références d'un bordereau, chargés en bloc.
+    """
+
+    def __init__(self, objects: dict):
+        self._objects = objects
+
+    @classmethod
+    def load(
+        cls,
+        refs,
+        *,
+        relations: dict | None = None,
+        select: dict | None = None,
+    ) -> "SourceIndex":
+        """
+        relations : type -> ((relation, ordre), ...) à précharger ;
+        select : type -> clés étrangères à joindre (select_related).
+        Les types sans modèle (ex. path) sont ignorés.
+        """
+        relations = relations or {}
+        select = select or {}
+        wanted = defaultdict(set)
+
+        for ref in refs:
+            if ref is None or ref.kind not in KIND_MODELS:
+                continue
+
+            ids = (
+                ref.ids[:1]
+                if ref.kind in SINGLE_ID_KINDS
+                else ref.ids
+            )
+            wanted[ref.kind].update(ids)
+
+        objects = {}
+
+        for kind, raw_ids in wanted.items():
+            model = KIND_MODELS[kind]
+            queryset = model.objects.select_related(
+                *select.get(kind, ())
+            ).prefetch_related(
+                *(
+                    Prefetch(
+                        relation,
+                        queryset=(
+                            model._meta.get_field(relation)
+                            .related_model.objects
+                            .order_by(*ordering)
+                        ),
+                        to_attr=_prefetch_attr(relation, ordering),
+                    )
+                    for relation, ordering in relations.get(kind, ())
+                )
+            )
+
+            pks = {int(i) for i in raw_ids if i.isdigit()}
+
+            if pks:
+                for obj in queryset.filter(pk__in=pks):
+                    objects[kind, obj.pk] = obj
+
+            names = {i for i in raw_ids if not i.isdigit()}
+
+            if kind == "thread" and names:
+                for obj in queryset.filter(thread_id__in=names):
+                    objects[kind, obj.thread_id] = obj
+
+        return cls(objects)
+
+    def get(self, kind: str, raw_id: str):
+        """
+        Objet d'une référence ; lève model.DoesNotExist comme un .get().
+        """
+        model = KIND_MODELS.get(kind)
+
+        if model is None:
+            raise ValueError(
+                f"Type non supporté : {kind}"
+            )
+
+        key = _key(raw_id)
+
+        if not isinstance(key, int) and kind != "thread":
+            raise ValueError(
+                f"Identifiant invalide pour {kind} : {raw_id}"
+            )
+
+        try:
+            return self._objects[kind, key]
+        except KeyError:
+            raise model.DoesNotExist(
+                f"{model._meta.object_name} matching query "
+                f"does not exist. ({kind}:{raw_id})"
+            ) from None
+
+    def resolve(self, ref) -> list:
+        """
+        Objets Django d'une SourceRef, dans l'ordre de ses identifiants.
+        """
+        if ref.kind == "thread" and len(ref.ids) != 1:
+            raise ValueError(
+                "Une cote thread doit "
+                "référencer un seul thread."
+            )
+
+        ids = (
+            ref.ids[:1]
+            if ref.kind in SINGLE_ID_KINDS
+            else ref.ids
+        )
+
+        return [self.get(ref.kind, raw_id) for raw_id in ids]
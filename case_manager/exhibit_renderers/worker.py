@@ -0,0 +1,15 @@
+# case_manager/exhibit_renderers/worker.py
+
+"""
+Initialisation des processus du pool de rendu (sync_pieces_pdf --jobs).
+
+Ce module doit rester importable AVANT la configuration de Django : un
+processus « spawn » l'importe pour exécuter init_worker, qui configure
+Django avant que les tâches de rendu ne soient reçues.
+"""
+
+
+def init_worker():
+    import django
+
+    django.setup()
@@ -2,7 +2,7 @@
 
 from django.contrib.contenttypes.models import ContentType
 from django.db import models, transaction
-from django.db.models import Min
+from django.db.models import Min, Prefetch
 from django.utils import timezone
 from collections import defaultdict
 from datetime import datetime
@@ -13,88 +13,193 @@ from email_manager.models import Email, Quote as EmailQuote
 from events.models import Event
 from photos.models import PhotoDocument
 from pdf_manager.models import PDFDocument, Quote as PDFQuote
-from googlechat_manager.models import ChatSequence
+from googlechat_manager.models import ChatSequence, ChatMessage
 from core.mixins import ExhibitableMixin
+from argument_manager.models import TrameNarrative
+
+# Narrative evidence fields whose linked object is a quote: the registry
+# numbers the quoted parent (Email / PDFDocument), not the quote itself.
+_QUOTE_PARENT_FIELDS = {
+    'citations_courriel': 'email',
+    'citations_pdf': 'pdf_document',
+}
+
+EVIDENCE_FIELDS = (
+    'evenements',
+    'citations_courriel',
+    'citations_pdf',
+    'photo_documents',
+    'source_statements',
+    'citations_chat',
+)
+
+
+def _exhibited_model(field_name):
+    """Model numbered in the registry for objects linked through ``field_name``."""
+    if field_name == 'source_statements':
+        # Statements are exhibited through the Document holding their node.
+        return Document
+    linked_model = TrameNarrative._meta.get_field(field_name).related_model
+    if field_name in _QUOTE_PARENT_FIELDS:
+        return linked_model._meta.get_field(_QUOTE_PARENT_FIELDS[field_name]).related_model
+    return linked_model
+
+
+def _exhibit_keys(field_name, linked, restrict_ids=None):
+    """
+    Registry keys (content_type_id, object_id) for a queryset of objects linked
+    to narratives through ``field_name``. ``restrict_ids`` limits the result to
+    the given exhibited object ids.
+    """
+    if field_name == 'source_statements':
+        ids = LibraryNode.objects.filter(
+            content_type=ContentType.objects.get_for_model(Statement),
+            object_id__in=linked.values('pk'),
+        )
+        attr = 'document_id'
+    else:
+        ids = linked
+        attr = f'{_QUOTE_PARENT_FIELDS[field_name]}_id' if field_name in _QUOTE_PARENT_FIELDS else 'pk'
+
+    if restrict_ids is not None:
+        ids = ids.filter(**{f'{attr}__in': restrict_ids})
+    ct_id = ContentType.objects.get_for_model(_exhibited_model(field_name)).id
+    return {
+        (ct_id, object_id)
+        for object_id in ids.values_list(attr, flat=True).distinct()
+        if object_id is not None
+    }
+
+
+def _linked_queryset(field_name, **narrative_lookup):
+    """Objects linked through a narrative field, filtered on the narrative side."""
+    field = TrameNarrative._meta.get_field(field_name)
+    lookup = {
+        f'{field.related_query_name()}__{key}': value
+        for key, value in narrative_lookup.items()
+    }
+    return field.related_model.objects.filter(**lookup)
+
+
+def evidence_keys_for_linked(field_name, pks):
+    """Registry keys implied by linking ``pks`` through a narrative field."""
+    if not pks:
+        return set()
+    model = TrameNarrative._meta.get_field(field_name).related_model
+    return _exhibit_keys(field_name, model.objects.filter(pk__in=pks))
+
+
+def evidence_keys_for_narratives(narrative_ids):
+    """Registry keys for all evidence attached to the given narratives."""
+    keys = set()
+    if not narrative_ids:
+        return keys
+    for field_name in EVIDENCE_FIELDS:
+        keys |= _exhibit_keys(field_name, _linked_queryset(field_name, pk__in=narrative_ids))
+    return keys
+
+
+def case_evidence_keys(case_id, restrict_to=None):
+    """
+    Registry keys for the evidence currently used by a case. ``restrict_to``
+    (a set of keys) turns this into a membership check for those keys only.
+    """
+    restrict_ids = None
+    if restrict_to is not None:
+        restrict_ids = defaultdict(set)
+        for ct_id, object_id in restrict_to:
+            restrict_ids[ct_id].add(object_id)
+
+    keys = set()
+    for field_name in EVIDENCE_FIELDS:
+        linked = _linked_queryset(field_name, supported_contestations__case_id=case_id).distinct()
+        if restrict_ids is None:
+            keys |= _exhibit_keys(field_name, linked)
+            continue
+        ids = restrict_ids.get(ContentType.objects.get_for_model(_exhibited_model(field_name)).id)
+        if ids:
+            keys |= _exhibit_keys(field_name, linked, restrict_ids=ids)
+    return keys
+
+
+def _delete_registry_keys(case_id, keys):
+    ids_by_type = defaultdict(list)
+    for ct_id, object_id in keys:
+        ids_by_type[ct_id].append(object_id)
+    deleted = 0
+    for ct_id, object_ids in ids_by_type.items():
+        deleted += ExhibitRegistry.objects.filter(
+            case_id=case_id, content_type_id=ct_id, object_id__in=object_ids
+        ).delete()[0]
+    return deleted
+
+
+def _create_registry_keys(case_id, keys):
+    """
+    Numbers keys not yet in the registry after the current maximum.
+    Returns (created, highest exhibit number).
+    """
+    ids_by_type = defaultdict(list)
+    for ct_id, object_id in keys:
+        ids_by_type[ct_id].append(object_id)
+    existing = set()
+    for ct_id, object_ids in ids_by_type.items():
+        existing.update(
+            ExhibitRegistry.objects.filter(
+                case_id=case_id, content_type_id=ct_id, object_id__in=object_ids
+            ).values_list('content_type_id', 'object_id')
+        )
+
+    current_max = ExhibitRegistry.objects.filter(case_id=case_id).aggregate(
+        max_num=models.Max('exhibit_number')
+    )['max_num'] or 0
+    new_rows = [
+        ExhibitRegistry(case_id=case_id, content_type_id=ct_id, object_id=object_id,
+                        exhibit_number=current_max + index)
+        for index, (ct_id, object_id) in enumerate(sorted(set(keys) - existing), 1)
+    ]
+    ExhibitRegistry.objects.bulk_create(new_rows)
+    return len(new_rows), current_max + len(new_rows)
+
+
+def reconcile_exhibit_keys(case_id, keys):
+    """
+    Brings only ``keys`` of a case registry in line with its narratives,
+    without a full recompute. Keys still in use get the next exhibit numbers
+    if missing; keys no longer referenced by any narrative of the case are
+    dropped. Returns (created, deleted).
+    """
+    keys = set(keys)
+    if not keys:
+        return 0, 0
+    with transaction.atomic():
+        # Lock the case row so concurrent updates do not hand out the same number.
+        if not LegalCase.objects.select_for_update().filter(pk=case_id).exists():
+            return 0, 0
+        still_used = case_evidence_keys(case_id, restrict_to=keys)
+        deleted = _delete_registry_keys(case_id, keys - still_used)
+        created, _ = _create_registry_keys(case_id, still_used)
+    return created, deleted
+
 
 def refresh_case_exhibits(case_id):
     """
-    Analyzes all contestations within a case, finds all unique pieces of evidence,
-    assigns numbers to new ones, AND REMOVES orphans that are no longer used.
+    Full reconcile: recomputes all evidence used by the case, assigns numbers
+    to new items and removes orphans that are no longer used.
+    Signals keep the registry in sync through reconcile_exhibit_keys; this is the
+    explicit (and more expensive) fallback.
     """
-    try:
-        case = LegalCase.objects.get(pk=case_id)
-    except LegalCase.DoesNotExist:
-        return 0
-
-    # 1. Gather ALL unique evidence objects currently in use
-    all_evidence_objects = set()
-    prefetch_args = [
-        'supporting_narratives__evenements',
-        'supporting_narratives__citations_courriel__email',
-        'supporting_narratives__citations_pdf__pdf_document',
-        'supporting_narratives__photo_documents',
-        'supporting_narratives__citations_chat',
-        'supporting_narratives__source_statements'
-    ]
-    for contestation in case.contestations.prefetch_related(*prefetch_args).all():
-        for narrative in contestation.supporting_narratives.all():
-            for event in narrative.evenements.all():
-                all_evidence_objects.add(event)
-            for email_quote in narrative.citations_courriel.all():
-                if email_quote.email:
-                    all_evidence_objects.add(email_quote.email)
-            for pdf_quote in narrative.citations_pdf.all():
-                if pdf_quote.pdf_document:
-                    all_evidence_objects.add(pdf_quote.pdf_document)
-            for photo_doc in narrative.photo_documents.all():
-                all_evidence_objects.add(photo_doc)
-            
-            for chat_seq in narrative.citations_chat.all():
-                all_evidence_objects.add(chat_seq)
-            
-            # Handle statements / library nodes
-            statement_ids = narrative.source_statements.values_list('id', flat=True)
-            if statement_ids:
-                stmt_content_type = ContentType.objects.get_for_model(Statement)
-                nodes = LibraryNode.objects.filter(
-                    content_type=stmt_content_type,
-                    object_id__in=statement_ids
-                ).select_related('document')
-                for node in nodes:
-                    if node.document:
-                        all_evidence_objects.add(node.document)
-
-    # 2. Identify "Valid" Keys (ContentType ID + Object ID)
-    valid_keys = set()
-    for item in all_evidence_objects:
-        if item is None: continue
-        ct = ContentType.objects.get_for_model(item)
-        valid_keys.add((ct.id, item.pk))
-
-    # 3. DELETE Orphans: Remove registry entries that are no longer in valid_keys
-    existing_exhibits = ExhibitRegistry.objects.filter(case=case)
-    for exhibit in existing_exhibits:
-        if (exhibit.content_type_id, exhibit.object_id) not in valid_keys:
-            exhibit.delete()
-
-    # 4. ADD New Items
-    current_max = case.exhibits.aggregate(max_num=models.Max('exhibit_number'))['max_num'] or 0
-    
-    for item in all_evidence_objects:
-        if item is None: continue
-        ct = ContentType.objects.get_for_model(item)
-        
-        obj, created = ExhibitRegistry.objects.get_or_create(
-            case=case,
-            content_type=ct,
-            object_id=item.pk,
-            defaults={'exhibit_number': current_max + 1}
-        )
-        
-        if created:
-            current_max += 1
+    with transaction.atomic():
+        if not LegalCase.objects.select_for_update().filter(pk=case_id).exists():
+            return 0
 
-    return current_max
+        valid_keys = case_evidence_keys(case_id)
+        existing_keys = set(
+            ExhibitRegistry.objects.filter(case_id=case_id).values_list('content_type_id', 'object_id')
+        )
+        _delete_registry_keys(case_id, existing_keys - valid_keys)
+        _, current_max = _create_registry_keys(case_id, valid_keys - existing_keys)
+        return current_max
 
 def get_datetime_for_sorting(exhibit, exhibit_objects):
     """
@@ -116,6 +221,9 @@ def get_datetime_for_sorting(exhibit, exhibit_objects):
     if model_name == 'chatsequence':
         if obj.start_date:
             dt = obj.start_date
+        elif hasattr(obj, 'first_message_at'):
+            # Annotated by _load_exhibit_objects
+            dt = obj.first_message_at
         elif obj.messages.exists():
             dt = obj.messages.order_by('timestamp').first().timestamp
 
@@ -127,265 +235,269 @@ def get_datetime_for_sorting(exhibit, exhibit_objects):
     
     return dt or timezone.now()
 
+def _chat_messages_prefetch():
+    return Prefetch(
+        'messages',
+        queryset=ChatMessage.objects.select_related('sender', 'sender__protagonist').order_by('timestamp'),
+    )
+
+
+# Everything the row builders read must come from these querysets: one query
+# per exhibited model (plus its prefetches), never one per object.
+_EXHIBIT_QUERYSET_HINTS = {
+    LibraryNode: lambda qs: qs.select_related('document', 'document__author', 'content_type').prefetch_related('content_object'),
+    Document: lambda qs: qs.select_related('author'),
+    Email: lambda qs: qs.select_related('sender_protagonist').prefetch_related('recipient_protagonists'),
+    PhotoDocument: lambda qs: qs.select_related('author').annotate(first_photo_date=Min('photos__datetime_original')),
+    PDFDocument: lambda qs: qs.select_related('author'),
+    PDFQuote: lambda qs: qs.select_related('pdf_document', 'pdf_document__author'),
+    ChatSequence: lambda qs: qs.annotate(first_message_at=Min('messages__timestamp')).prefetch_related(_chat_messages_prefetch()),
+}
+
+
+def _load_exhibit_objects(exhibits):
+    """Fetches the exhibited objects, keyed by (content_type_id, object_id)."""
+    ids_by_type = defaultdict(list)
+    for ex in exhibits:
+        ids_by_type[ex.content_type_id].append(ex.object_id)
+
+    content_types = ContentType.objects.in_bulk(ids_by_type.keys())
+    exhibit_objects = {}
+    for ct_id, obj_ids in ids_by_type.items():
+        ct = content_types.get(ct_id)
+        model_class = ct.model_class() if ct else None
+        if model_class is None:
+            continue
+        queryset = model_class.objects.filter(pk__in=obj_ids)
+        hint = _EXHIBIT_QUERYSET_HINTS.get(model_class)
+        if hint:
+            queryset = hint(queryset)
+        for obj in queryset:
+            exhibit_objects[(ct_id, obj.pk)] = obj
+    return exhibit_objects
+
+
+def _quotes_by_parent(case, quote_model, parent_field, *related):
+    """Quotes of the case used as evidence, grouped by parent id and sorted by creation."""
+    quotes_map = defaultdict(list)
+    quotes = (
+        quote_model.objects
+        .filter(trames_narratives__supported_contestations__case=case)
+        .select_related(*related)
+        .distinct()
+        .order_by('created_at', 'pk')
+    )
+    if quote_model is EmailQuote:
+        quotes = quotes.prefetch_related('email__recipient_protagonists')
+    for quote in quotes:
+        parent_id = getattr(quote, f'{parent_field}_id')
+        if parent_id:
+            quotes_map[parent_id].append(quote)
+    return quotes_map
+
+
 def rebuild_produced_exhibits(case_id):
     """
-    Wipes and repopulates the ProducedExhibit table for a case atomically
-    and with optimized database queries.
+    Wipes and repopulates the ProducedExhibit table for a case atomically.
+    All data is gathered with a fixed number of queries (independent of the
+    number of exhibits) and written with a single bulk_create.
     """
-    try:
-        with transaction.atomic():
-            case = LegalCase.objects.get(pk=case_id)
-            ProducedExhibit.objects.filter(case=case).delete()
-            
-            email_quotes_map = defaultdict(list)
-            all_email_quotes = EmailQuote.objects.filter(
-                trames_narratives__supported_contestations__case=case
-            ).select_related('email', 'email__sender_protagonist').prefetch_related('email__recipient_protagonists').distinct()
-            for quote in all_email_quotes:
-                if quote.email_id:
-                    email_quotes_map[quote.email_id].append(quote)
-
-            pdf_quotes_map = defaultdict(list)
-            all_pdf_quotes = PDFQuote.objects.filter(
-                trames_narratives__supported_contestations__case=case
-            ).select_related('pdf_document', 'pdf_document__author').distinct()
-            for quote in all_pdf_quotes:
-                if quote.pdf_document_id:
-                    pdf_quotes_map[quote.pdf_document_id].append(quote)
-
-            refresh_case_exhibits(case_id) 
-            initial_exhibits = list(case.exhibits.all().select_related('content_type'))
-
-            library_node_ct = ContentType.objects.get_for_model(LibraryNode)
-            ln_exhibit_ids_to_check = [
-                ex.object_id for ex in initial_exhibits if ex.content_type_id == library_node_ct.id
-            ]
-
-            valid_ln_ids = set()
-            if ln_exhibit_ids_to_check:
-                valid_ln_ids = set(
-                    LibraryNode.objects.filter(
-                        pk__in=ln_exhibit_ids_to_check,
-                        document__source_type=DocumentSource.REPRODUCED
-                    ).values_list('pk', flat=True)
-                )
-
-            all_exhibits = []
-            for ex in initial_exhibits:
-                if ex.content_type_id == library_node_ct.id:
-                    if ex.object_id in valid_ln_ids:
-                        all_exhibits.append(ex)
-                else:
-                    all_exhibits.append(ex)
-            
-            exhibits_by_type = defaultdict(list)
-            for ex in all_exhibits:
-                exhibits_by_type[ex.content_type_id].append(ex.object_id)
-
-            content_types = ContentType.objects.in_bulk(exhibits_by_type.keys())
-
-            exhibit_objects = {}
-            for ct_id, obj_ids in exhibits_by_type.items():
-                ct = content_types.get(ct_id)
-                if not ct: continue
-                
-                model_class = ct.model_class()
-                queryset = model_class.objects.filter(pk__in=obj_ids)
-                
-                if model_class == LibraryNode:
-                    queryset = queryset.select_related('document', 'document__author', 'content_type').prefetch_related('content_object')
-                elif model_class == Email:
-                    queryset = queryset.select_related('sender_protagonist').prefetch_related('recipient_protagonists')
-                elif model_class == PhotoDocument:
-                    queryset = queryset.select_related('author') # Date handled via Mixin
-                elif model_class == PDFDocument:
-                    queryset = queryset.select_related('author')
-                elif model_class == PDFQuote:
-                    queryset = queryset.select_related('pdf_document', 'pdf_document__author')
-                elif model_class == ChatSequence:
-                    queryset = queryset.prefetch_related(
-                        'messages', 
-                        'messages__sender', 
-                        'messages__sender__protagonist'
-                    )
-
-                for obj in queryset:
-                    exhibit_objects[(ct_id, obj.id)] = obj
-            
-            exhibits_with_sort_date = []
-            
-            for ex in all_exhibits:
-                obj = exhibit_objects.get((ex.content_type_id, ex.object_id))
-                if not obj: continue
-                
-                model_name = ex.content_type.model
-                
-                if model_name == 'chatsequence':
-                    if not obj.messages.exists():
-                        continue
-                    msgs = obj.messages.all().order_by('timestamp')
-                    sessions_map = defaultdict(list)
-                    for m in msgs:
-                        date_key = m.timestamp.date()
-                        sessions_map[date_key].append(m)
-                    
-                    for date_key, session_msgs in sessions_map.items():
-                        sort_dt = session_msgs[0].timestamp
-                        exhibits_with_sort_date.append({
-                            'exhibit': ex,
-                            'sort_date': sort_dt,
-                            'virtual_msgs': session_msgs,
-                            'is_virtual': True
-                        })
-                else:
-                    sort_date = get_datetime_for_sorting(ex, exhibit_objects)
-                    exhibits_with_sort_date.append({
-                        'exhibit': ex,
-                        'sort_date': sort_date,
-                        'virtual_msgs': None,
-                        'is_virtual': False
-                    })
+    with transaction.atomic():
+        case = LegalCase.objects.get(pk=case_id)
+        ProducedExhibit.objects.filter(case=case).delete()
 
-            exhibits_with_sort_date.sort(key=lambda x: x['sort_date'])
-
-            new_rows = []
-            global_counter = 1
-            processed_parent_docs = set()
-
-            for item in exhibits_with_sort_date:
-                exhibit = item['exhibit']
-                virtual_msgs = item.get('virtual_msgs')
-                obj = exhibit_objects.get((exhibit.content_type_id, exhibit.object_id))
-                if not obj: continue
-
-                model_name = exhibit.content_type.model
-                sort_date = item['sort_date']
-
-                if model_name == 'chatsequence':
-                    main_label = f"P-{global_counter}"
-                    exhibit_type_str = "Extrait Clavardage"
-                    first_msg = virtual_msgs[0]
-                    last_msg = virtual_msgs[-1]
-                    date_str = first_msg.timestamp.strftime('%Y-%m-%d')
-                    start_time = first_msg.timestamp.strftime('%H:%M')
-                    end_time = last_msg.timestamp.strftime('%H:%M')
-                    date_text = f"Le {date_str} de {start_time} à {end_time}"
-                    header = f"SÉQUENCE : {obj.title} (Suite...)" if item.get('is_virtual') and len(virtual_msgs) < obj.messages.count() else obj.title
-                    transcript_lines = [header, ""]
-                    
-                    last_sender = None
-                    last_time = None
-                    for msg in virtual_msgs:
-                        sender_name = msg.sender.name if msg.sender else "Inconnu"
-                        msg_time = msg.timestamp
-                        minutes_diff = (msg_time - last_time).total_seconds() / 60 if last_time else 0
-                        if sender_name != last_sender or minutes_diff > 20:
-                            if last_sender is not None:
-                                transcript_lines.append("") 
-                            header_time = msg_time.strftime('%H:%M')
-                            transcript_lines.append(f"[{sender_name} à {header_time}] :")
-                            last_sender = sender_name
-                        transcript_lines.append(f"- {msg.text_content}")
-                        last_time = msg_time
-                    desc_text = "\n".join(transcript_lines)
-                    
-                    participants = set()
-                    for m in virtual_msgs:
-                        if m.sender:
-                            participants.add(m.sender)
-                    parties_lines = []
-                    for p in participants:
-                        name = p.name or p.email or "Inconnu"
-                        role = f" [{p.protagonist.role}]" if p.protagonist else ""
-                        parties_lines.append(f"{name}{role}")
-                    parties_str = "Entre:\n" + "\nEt:\n".join(parties_lines)
+        email_quotes_map = _quotes_by_parent(case, EmailQuote, 'email', 'email', 'email__sender_protagonist')
+        pdf_quotes_map = _quotes_by_parent(case, PDFQuote, 'pdf_document', 'pdf_document', 'pdf_document__author')
 
-                    new_rows.append(ProducedExhibit(
-                        case=case, sort_order=len(new_rows) + 1, label=main_label, exhibit_type=exhibit_type_str,
-                        date_display=date_text, description=desc_text, parties=parties_str, content_object=obj
-                    ))
-                    global_counter += 1
-                    continue
+        refresh_case_exhibits(case_id)
+        initial_exhibits = list(case.exhibits.all().select_related('content_type'))
 
-                if model_name == 'librarynode':
-                    parent_doc = obj.document
-                    if parent_doc.id in processed_parent_docs:
-                        continue
-                    main_label = f"P-{global_counter}"
-                    
-                    # Use Exhibitable interface for the parent document
-                    date_text = parent_doc.get_exhibit_date().strftime('%Y-%m-%d')
-                    desc_text = parent_doc.get_exhibit_title()
-                    parties_str = parent_doc.get_exhibit_parties()
-                    
-                    new_rows.append(ProducedExhibit(
-                        case=case, sort_order=len(new_rows) + 1, label=main_label, exhibit_type=parent_doc.get_exhibit_type(),
-                        date_display=date_text, description=desc_text, parties=parties_str, content_object=parent_doc
-                    ))
-                    statement_nodes_for_this_doc = []
-                    for other_item in exhibits_with_sort_date:
-                        other_exhibit = other_item['exhibit']
-                        if other_exhibit.content_type.model == 'librarynode':
-                            other_node = exhibit_objects.get((other_exhibit.content_type_id, other_exhibit.object_id))
-                            if other_node and other_node.document_id == parent_doc.id:
-                                if other_node.content_object and isinstance(other_node.content_object, Statement):
-                                    statement_nodes_for_this_doc.append(other_node.content_object)
-                    for idx, statement_obj in enumerate(statement_nodes_for_this_doc, 1):
-                        new_rows.append(ProducedExhibit(
-                            case=case, sort_order=len(new_rows) + 1, label=f"{main_label}-{idx}", exhibit_type="Déclaration",
-                            date_display="", description=statement_obj.text, parties="", content_object=statement_obj
-                        ))
-                    processed_parent_docs.add(parent_doc.id)
-                    global_counter += 1
+        library_node_ct = ContentType.objects.get_for_model(LibraryNode)
+        ln_exhibit_ids_to_check = [
+            ex.object_id for ex in initial_exhibits if ex.content_type_id == library_node_ct.id
+        ]
+
+        valid_ln_ids = set()
+        if ln_exhibit_ids_to_check:
+            valid_ln_ids = set(
+                LibraryNode.objects.filter(
+                    pk__in=ln_exhibit_ids_to_check,
+                    document__source_type=DocumentSource.REPRODUCED
+                ).values_list('pk', flat=True)
+            )
+
+        all_exhibits = [
+            ex for ex in initial_exhibits
+            if ex.content_type_id != library_node_ct.id or ex.object_id in valid_ln_ids
+        ]
+
+        exhibit_objects = _load_exhibit_objects(all_exhibits)
+
+        # Statement nodes per parent document, in exhibit order (the P-x-y children).
+        statements_by_document = defaultdict(list)
+
+        exhibits_with_sort_date = []
+        for ex in all_exhibits:
+            obj = exhibit_objects.get((ex.content_type_id, ex.object_id))
+            if not obj: continue
+
+            model_name = ex.content_type.model
+
+            if model_name == 'chatsequence':
+                msgs = list(obj.messages.all())  # prefetched, ordered by timestamp
+                if not msgs:
                     continue
+                sessions_map = defaultdict(list)
+                for m in msgs:
+                    sessions_map[m.timestamp.date()].append(m)
 
-                # FOR ALL OTHER MODELS USING THE MIXIN
-                if isinstance(obj, ExhibitableMixin):
-                    main_label = f"P-{global_counter}"
-                    new_rows.append(ProducedExhibit(
-                        case=case, 
-                        sort_order=len(new_rows) + 1, 
-                        label=main_label, 
-                        exhibit_type=obj.get_exhibit_type(),
-                        date_display=obj.get_exhibit_date().strftime('%Y-%m-%d %H:%M') if 'email' in model_name else obj.get_exhibit_date().strftime('%Y-%m-%d'), 
-                        description=obj.get_exhibit_description(), 
-                        parties=obj.get_exhibit_parties(), 
-                        content_object=obj,
-                        public_url=obj.get_exhibit_public_url()
-                    ))
-                else:
-                    # Generic Fallback
-                    main_label = f"P-{global_counter}"
+                for date_key, session_msgs in sessions_map.items():
+                    exhibits_with_sort_date.append({
+                        'exhibit': ex,
+                        'sort_date': session_msgs[0].timestamp,
+                        'virtual_msgs': session_msgs,
+                        'is_virtual': True
+                    })
+            else:
+                exhibits_with_sort_date.append({
+                    'exhibit': ex,
+                    'sort_date': get_datetime_for_sorting(ex, exhibit_objects),
+                    'virtual_msgs': None,
+                    'is_virtual': False
+                })
+
+        exhibits_with_sort_date.sort(key=lambda x: x['sort_date'])
+
+        for item in exhibits_with_sort_date:
+            exhibit = item['exhibit']
+            if exhibit.content_type.model == 'librarynode':
+                node = exhibit_objects[(exhibit.content_type_id, exhibit.object_id)]
+                if node.content_object and isinstance(node.content_object, Statement):
+                    statements_by_document[node.document_id].append(node.content_object)
+
+        new_rows = []
+        global_counter = 1
+        processed_parent_docs = set()
+
+        for item in exhibits_with_sort_date:
+            exhibit = item['exhibit']
+            virtual_msgs = item.get('virtual_msgs')
+            obj = exhibit_objects.get((exhibit.content_type_id, exhibit.object_id))
+            if not obj: continue
+
+            model_name = exhibit.content_type.model
+            sort_date = item['sort_date']
+
+            if model_name == 'chatsequence':
+                main_label = f"P-{global_counter}"
+                exhibit_type_str = "Extrait Clavardage"
+                first_msg = virtual_msgs[0]
+                last_msg = virtual_msgs[-1]
+                date_str = first_msg.timestamp.strftime('%Y-%m-%d')
+                start_time = first_msg.timestamp.strftime('%H:%M')
+                end_time = last_msg.timestamp.strftime('%H:%M')
+                date_text = f"Le {date_str} de {start_time} à {end_time}"
+                header = f"SÉQUENCE : {obj.title} (Suite...)" if item.get('is_virtual') and len(virtual_msgs) < len(obj.messages.all()) else obj.title
+                transcript_lines = [header, ""]
+
+                last_sender = None
+                last_time = None
+                for msg in virtual_msgs:
+                    sender_name = msg.sender.name if msg.sender else "Inconnu"
+                    msg_time = msg.timestamp
+                    minutes_diff = (msg_time - last_time).total_seconds() / 60 if last_time else 0
+                    if sender_name != last_sender or minutes_diff > 20:
+                        if last_sender is not None:
+                            transcript_lines.append("")
+                        header_time = msg_time.strftime('%H:%M')
+                        transcript_lines.append(f"[{sender_name} à {header_time}] :")
+                        last_sender = sender_name
+                    transcript_lines.append(f"- {msg.text_content}")
+                    last_time = msg_time
+                desc_text = "\n".join(transcript_lines)
+
+                participants = set()
+                for m in virtual_msgs:
+                    if m.sender:
+                        participants.add(m.sender)
+                parties_lines = []
+                for p in participants:
+                    name = p.name or p.email or "Inconnu"
+                    role = f" [{p.protagonist.role}]" if p.protagonist else ""
+                    parties_lines.append(f"{name}{role}")
+                parties_str = "Entre:\n" + "\nEt:\n".join(parties_lines)
+
+                new_rows.append(ProducedExhibit(
+                    case=case, sort_order=len(new_rows) + 1, label=main_label, exhibit_type=exhibit_type_str,
+                    date_display=date_text, description=desc_text, parties=parties_str, content_object=obj
+                ))
+                global_counter += 1
+                continue
+
+            if model_name == 'librarynode':
+                parent_doc = obj.document
+                if parent_doc.id in processed_parent_docs:
+                    continue
+                main_label = f"P-{global_counter}"
+
+                # Use Exhibitable interface for the parent document
+                date_text = parent_doc.get_exhibit_date().strftime('%Y-%m-%d')
+                desc_text = parent_doc.get_exhibit_title()
+                parties_str = parent_doc.get_exhibit_parties()
+
+                new_rows.append(ProducedExhibit(
+                    case=case, sort_order=len(new_rows) + 1, label=main_label, exhibit_type=parent_doc.get_exhibit_type(),
+                    date_display=date_text, description=desc_text, parties=parties_str, content_object=parent_doc
+                ))
+                for idx, statement_obj in enumerate(statements_by_document[parent_doc.id], 1):
                     new_rows.append(ProducedExhibit(
-                        case=case, sort_order=len(new_rows) + 1, label=main_label, exhibit_type="Autre", 
-                        date_display=sort_date.strftime('%Y-%m-%d'), description=str(obj), parties="", content_object=obj
+                        case=case, sort_order=len(new_rows) + 1, label=f"{main_label}-{idx}", exhibit_type="Déclaration",
+                        date_display="", description=statement_obj.text, parties="", content_object=statement_obj
                     ))
-                
-                # Handle children (Quotes) - these still have custom logic for now
-                if model_name == 'email':
-                    quotes = sorted(email_quotes_map.get(obj.id, []), key=lambda q: q.created_at)
-                    for idx, quote_obj in enumerate(quotes, 1):
-                        quote_email = quote_obj.email
-                        quote_date_text = quote_email.date_sent.strftime('%Y-%m-%d %H:%M') if quote_email.date_sent else ""
-                        sender = quote_email.sender_protagonist.get_full_name_with_role() if quote_email.sender_protagonist else quote_email.sender
-                        recipients = ", ".join([p.get_full_name_with_role() for p in quote_email.recipient_protagonists.all()])
-                        quote_parties_str = f"De: {sender}\nÀ: {recipients}"
-                        short_q = (quote_obj.quote_text[:200] + '..') if len(quote_obj.quote_text) > 20000 else quote_obj.quote_text
-                        new_rows.append(ProducedExhibit(case=case, sort_order=len(new_rows) + 1, label=f"{main_label}-{idx}", exhibit_type="Citation Courriel", date_display=quote_date_text, description=f"« {short_q} »", parties=quote_parties_str, content_object=quote_obj))
-                
-                if model_name == 'pdfdocument':
-                    quotes = sorted(pdf_quotes_map.get(obj.id, []), key=lambda q: q.created_at)
-                    for idx, quote_obj in enumerate(quotes, 1):
-                        quote_doc = quote_obj.pdf_document
-                        quote_date_text = quote_doc.document_date.strftime('%Y-%m-%d') if quote_doc.document_date else ""
-                        quote_parties_str = f"Auteur: {quote_doc.author.get_full_name_with_role()}" if quote_doc.author else ""
-                        desc = f"« {quote_obj.quote_text} » (p. {quote_obj.page_number})"
-                        new_rows.append(ProducedExhibit(case=case, sort_order=len(new_rows) + 1, label=f"{main_label}-{idx}", exhibit_type="Citation PDF", date_display=quote_date_text, description=desc, parties=quote_parties_str, content_object=quote_obj))
-
+                processed_parent_docs.add(parent_doc.id)
                 global_counter += 1
-
-            ProducedExhibit.objects.bulk_create(new_rows)
-            return len(new_rows)
-
-    except Exception as e:
-        raise e
+                continue
+
+            # FOR ALL OTHER MODELS USING THE MIXIN
+            if isinstance(obj, ExhibitableMixin):
+                main_label = f"P-{global_counter}"
+                new_rows.append(ProducedExhibit(
+                    case=case,
+                    sort_order=len(new_rows) + 1,
+                    label=main_label,
+                    exhibit_type=obj.get_exhibit_type(),
+                    date_display=obj.get_exhibit_date().strftime('%Y-%m-%d %H:%M') if 'email' in model_name else obj.get_exhibit_date().strftime('%Y-%m-%d'),
+                    description=obj.get_exhibit_description(),
+                    parties=obj.get_exhibit_parties(),
+                    content_object=obj,
+                    public_url=obj.get_exhibit_public_url()
+                ))
+            else:
+                # Generic Fallback
+                main_label = f"P-{global_counter}"
+                new_rows.append(ProducedExhibit(
+                    case=case, sort_order=len(new_rows) + 1, label=main_label, exhibit_type="Autre",
+                    date_display=sort_date.strftime('%Y-%m-%d'), description=str(obj), parties="", content_object=obj
+                ))
+
+            # Handle children (Quotes) - these still have custom logic for now
+            if model_name == 'email':
+                for idx, quote_obj in enumerate(email_quotes_map.get(obj.id, []), 1):
+                    quote_email = quote_obj.email
+                    quote_date_text = quote_email.date_sent.strftime('%Y-%m-%d %H:%M') if quote_email.date_sent else ""
+                    quote_parties_str = quote_email.get_exhibit_parties()
+                    short_q = (quote_obj.quote_text[:200] + '..') if len(quote_obj.quote_text) > 20000 else quote_obj.quote_text
+                    new_rows.append(ProducedExhibit(case=case, sort_order=len(new_rows) + 1, label=f"{main_label}-{idx}", exhibit_type="Citation Courriel", date_display=quote_date_text, description=f"« {short_q} »", parties=quote_parties_str, content_object=quote_obj))
+
+            if model_name == 'pdfdocument':
+                for idx, quote_obj in enumerate(pdf_quotes_map.get(obj.id, []), 1):
+                    quote_doc = quote_obj.pdf_document
+                    quote_date_text = quote_doc.document_date.strftime('%Y-%m-%d') if quote_doc.document_date else ""
+                    quote_parties_str = f"Auteur: {quote_doc.author.get_full_name_with_role()}" if quote_doc.author else ""
+                    desc = f"« {quote_obj.quote_text} » (p. {quote_obj.page_number})"
+                    new_rows.append(ProducedExhibit(case=case, sort_order=len(new_rows) + 1, label=f"{main_label}-{idx}", exhibit_type="Citation PDF", date_display=quote_date_text, description=desc, parties=quote_parties_str, content_object=quote_obj))
+
+            global_counter += 1
+
+        ProducedExhibit.objects.bulk_create(new_rows)
+        return len(new_rows)
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import json
 import tempfile
+import time
 from pathlib import Path
 
 from django.conf import settings
@@ -16,6 +17,11 @@ from case_manager.evidence_audit import (
 )
 
 
+# Occurrences extraites par fichier d'entrée, réutilisées tant que le fichier
+# (taille, date, contenu) et le code d'extraction sont inchangés.
+SCAN_CACHE_PATH = Path(settings.BASE_DIR) / ".evidence_audit_cache.json"
+
+
 class Command(BaseCommand):
     help = (
         "Audite en lecture seule les références de legal/organisation_preuve, "
@@ -38,6 +44,20 @@ class Command(BaseCommand):
             action="store_true",
             help="Vérifie que les rapports existants sont reproductibles sans les modifier.",
         )
+        parser.add_argument(
+            "--no-cache",
+            action="store_true",
+            help="Ignore le cache d'extraction et relit tous les fichiers d'entrée.",
+        )
+        parser.add_argument(
+            "--jobs",
+            type=int,
+            default=1,
+            help=(
+                "Nombre de processus pour relire les fichiers modifiés "
+                "(utile pour de gros classeurs XLSX). Défaut : 1."
+            ),
+        )
 
     def handle(self, *args, **options):
         input_dir: Path = options["input_dir"].resolve()
@@ -45,9 +65,24 @@ class Command(BaseCommand):
         if not input_dir.is_dir():
             raise CommandError(f"Répertoire introuvable : {input_dir}")
 
-        occurrences = collect_occurrences(input_dir)
+        timings: dict[str, float] = {}
+        scan_stats: dict[str, int] = {}
+        started = time.perf_counter()
+        occurrences = collect_occurrences(
+            input_dir,
+            cache_path=None if options["no_cache"] else SCAN_CACHE_PATH,
+            jobs=max(1, options["jobs"]),
+            stats=scan_stats,
+        )
+        timings["extraction"] = time.perf_counter() - started
+
+        started = time.perf_counter()
         occurrences = resolve_descriptive_piece_occurrences(occurrences, input_dir.parent)
+        timings["pièces descriptives"] = time.perf_counter() - started
+
+        started = time.perf_counter()
         audit = audit_occurrences(occurrences)
+        timings["base et originaux"] = time.perf_counter() - started
         supported_inputs = [
             path for path in input_dir.iterdir()
             if path.is_file() and path.suffix.casefold() in {".md", ".csv", ".xlsx"}
@@ -55,6 +90,7 @@ class Command(BaseCommand):
         audit["summary"]["input_file_count"] = len(supported_inputs)
         audit["summary"]["source_files_with_references"] = audit["summary"].pop("source_file_count")
 
+        started = time.perf_counter()
         if options["check"]:
             if not output_dir.is_dir():
                 raise CommandError(f"Rapports absents : {output_dir}")
@@ -71,5 +107,12 @@ class Command(BaseCommand):
             paths = write_audit_reports(output_dir, audit)
             self.stdout.write(self.style.SUCCESS(f"Audit écrit dans {output_dir}"))
             self.stdout.write(f"Empreinte des rapports : {reports_digest(paths)}")
+        timings["rapports"] = time.perf_counter() - started
+
+        self.stdout.write(
+            "Durées : "
+            + ", ".join(f"{label} {seconds:.2f} s" for label, seconds in timings.items())
+            + f" ({scan_stats['rescanned_file_count']}/{scan_stats['file_count']} fichier(s) relu(s))"
+        )
 
         self.stdout.write(json.dumps(audit["summary"], ensure_ascii=False, indent=2, sort_keys=True))
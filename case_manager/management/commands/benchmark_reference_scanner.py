@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import hashlib
+import time
+from dataclasses import astuple
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from case_manager.evidence_audit import extract_references_from_text
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure extract_references_from_text sur chaque ligne des fichiers "
+        "Markdown du corpus legal/ (micro-benchmark de l'extraction)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--root",
+            type=Path,
+            default=Path(settings.BASE_DIR) / "legal",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Nombre de mesures ; la meilleure est retenue. Défaut : 5.",
+        )
+
+    def handle(self, *args, **options):
+        root: Path = options["root"].resolve()
+        if not root.is_dir():
+            raise CommandError(f"Répertoire introuvable : {root}")
+
+        lines = [
+            line
+            for path in sorted(root.rglob("*.md"))
+            for line in path.read_text(encoding="utf-8", errors="replace").splitlines()
+        ]
+
+        timings = []
+        for _ in range(max(1, options["repeat"])):
+            started = time.perf_counter()
+            results = [
+                extract_references_from_text(
+                    line,
+                    source_file="benchmark",
+                    source_format="markdown",
+                    source_location="line",
+                    context=line,
+                )
+                for line in lines
+            ]
+            timings.append(time.perf_counter() - started)
+
+        # Empreinte des occurrences : deux versions de l'extracteur doivent
+        # produire la même sur le même corpus.
+        digest = hashlib.sha256()
+        occurrence_count = 0
+        for occurrences in results:
+            for occurrence in occurrences:
+                digest.update(repr(astuple(occurrence)).encode("utf-8"))
+                occurrence_count += 1
+
+        best = min(timings)
+        self.stdout.write(
+            f"{len(lines)} lignes, {occurrence_count} occurrences : "
+            f"{best:.3f} s ({best / max(1, len(lines)) * 1e6:.1f} µs/ligne, "
+            f"meilleure de {len(timings)})"
+        )
+        self.stdout.write(f"Empreinte des occurrences : {digest.hexdigest()}")
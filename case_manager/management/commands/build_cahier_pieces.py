@@ -2,9 +2,13 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
+import os
 import re
+import resource
 import shutil
+import sys
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -43,6 +47,24 @@ BACKUP_DIR = BASE_DIR / ".cahier_pieces_backup"
 CAHIER_FILENAME = "cahier_pieces.pdf"
 INDEX_FILENAME = "index_pieces.pdf"
 MANIFEST_FILENAME = "manifest_cahier.json"
+BUILD_STATE_FILENAME = "build_state.json"
+BUILD_STATE_KEYS = {
+    "front_page_count",
+    "total_pages",
+    "page_numbers",
+    "compact_size",
+    "pieces",
+}
+
+# Une construction incrémentale ajoute des objets à la fin du PDF sans
+# jamais en retirer : au-delà de ce facteur de croissance par rapport à la
+# dernière sauvegarde compacte, le cahier est reconstruit en entier.
+COMPACT_GROWTH_RATIO = 2.0
+
+# Écriture par segments (--streaming) : volume de PDF sources inséré entre
+# deux sauvegardes incrémentales, par défaut ou en part de --max-memory.
+SEGMENT_BYTES = 64 * 1024 * 1024
+SEGMENT_MEMORY_SHARE = 0.25
 
 
 # ---------------------------------------------------------------------------
@@ -70,6 +92,9 @@ DESCRIPTION_X = 105
 DESCRIPTION_RIGHT = 490
 PAGE_NUMBER_RIGHT = 555
 
+INDEX_HEADER_Y = MARGIN_TOP + 55
+INDEX_FIRST_ROW_Y = INDEX_HEADER_Y + 28
+
 
 # ---------------------------------------------------------------------------
 # Informations du dossier
@@ -431,7 +456,7 @@ def add_index_page_header(
         fontname=FONT_NORMAL,
     )
 
-    header_y = MARGIN_TOP + 55
+    header_y = INDEX_HEADER_Y
 
     page.insert_text(
         (COTE_X, header_y),
@@ -482,45 +507,35 @@ def add_index_page_header(
 
     return (
         page,
-        header_y + 28,
+        INDEX_FIRST_ROW_Y,
     )
 
 
-def render_index_document(
+@dataclass
+class IndexRow:
+    entry: ExhibitEntry
+    lines: list[str]
+    row_height: float
+    page_number: int
+    y: float
+
+
+def layout_index(
     entries: list[ExhibitEntry],
     *,
     mark_placeholders: bool,
-) -> tuple[
-    fitz.Document,
-    list[tuple[int, fitz.Rect, int]],
-]:
+) -> list[IndexRow]:
     """
-    Génère l'index.
+    Calcule la position de chaque entrée de l'index sans rien dessiner.
 
-    Retourne :
-        - le document PDF de l'index;
-        - la liste des zones cliquables :
-          (
-              page_index_dans_index,
-              rectangle,
-              page_cible_du_cahier
-          )
-
-    Les liens seront ajoutés après la fusion finale.
+    La hauteur d'une ligne ne dépend que de la description : le nombre de
+    pages d'index est donc connu avant d'attribuer les pages de départ.
     """
 
-    doc = fitz.open()
-
-    link_specs: list[
-        tuple[int, fitz.Rect, int]
-    ] = []
+    rows: list[IndexRow] = []
 
     page_number = 1
-
-    page, y = add_index_page_header(
-        doc,
-        page_number,
-    )
+    y = INDEX_FIRST_ROW_Y
 
     description_width = (
         DESCRIPTION_RIGHT
@@ -556,11 +571,75 @@ def render_index_document(
             > PAGE_HEIGHT - MARGIN_BOTTOM
         ):
             page_number += 1
+            y = INDEX_FIRST_ROW_Y
+
+        rows.append(
+            IndexRow(
+                entry=entry,
+                lines=lines,
+                row_height=row_height,
+                page_number=page_number,
+                y=y,
+            )
+        )
+
+        y += row_height
+
+    return rows
+
+
+def count_index_pages(
+    rows: list[IndexRow],
+) -> int:
+    return (
+        rows[-1].page_number
+        if rows
+        else 1
+    )
+
+
+def render_index_document(
+    rows: list[IndexRow],
+) -> tuple[
+    fitz.Document,
+    list[tuple[int, fitz.Rect, int]],
+]:
+    """
+    Génère l'index à partir de la mise en page calculée par layout_index.
+
+    Retourne :
+        - le document PDF de l'index;
+        - la liste des zones cliquables :
+          (
+              page_index_dans_index,
+              rectangle,
+              page_cible_du_cahier
+          )
+
+    Les liens seront ajoutés après la fusion finale.
+    """
+
+    doc = fitz.open()
 
-            page, y = (
+    link_specs: list[
+        tuple[int, fitz.Rect, int]
+    ] = []
+
+    page, _ = add_index_page_header(
+        doc,
+        1,
+    )
+
+    for row in rows:
+        entry = row.entry
+        y = row.y
+        row_height = row.row_height
+
+        if row.page_number > doc.page_count:
+            page, _ = (
                 add_index_page_header(
                     doc,
-                    page_number,
+                    row.page_number,
                 )
             )
 
@@ -577,7 +656,7 @@ def render_index_document(
         )
 
         for line_index, line in enumerate(
-            lines
+            row.lines
         ):
             page.insert_text(
                 (
@@ -644,8 +723,6 @@ def render_index_document(
                 )
             )
 
-        y += row_height
-
     return doc, link_specs
 
 
@@ -762,44 +839,122 @@ def add_cahier_cover(
 # Pagination continue
 # ---------------------------------------------------------------------------
 
+def page_number_label(
+    index: int,
+    total: int,
+) -> str:
+    return f"Page {index + 1} de {total}"
+
+
+def stamp_page_number(
+    page: fitz.Page,
+    *,
+    total: int,
+) -> None:
+    """
+    Ajoute le numéro de page au pied de `page`.
+
+    insert_text ajoute toujours un nouveau flux de contenu en dernière
+    position de /Contents : ce flux est la « couche » de pagination que
+    remove_page_number retire lors d'une construction incrémentale.
+    """
+
+    label = page_number_label(
+        page.number,
+        total,
+    )
+
+    width = text_width(
+        label,
+        fontsize=8,
+    )
+
+    page.insert_text(
+        (
+            (
+                PAGE_WIDTH
+                - width
+            )
+            / 2,
+            PAGE_HEIGHT - 18,
+        ),
+        label,
+        fontsize=8,
+        fontname=FONT_NORMAL,
+    )
+
+
 def stamp_page_numbers(
     doc: fitz.Document,
+    pages=None,
+    *,
+    total: int | None = None,
 ) -> None:
     """
-    Ajoute une pagination continue au cahier complet.
+    Ajoute une pagination continue au cahier complet, ou seulement aux
+    pages d'indices `pages` (0-based). `total` est le nombre de pages du
+    cahier final, s'il n'est pas encore entièrement assemblé.
 
     Les PDF individuels dans pieces_pdf/ ne sont jamais modifiés.
     """
 
-    total = doc.page_count
+    if total is None:
+        total = doc.page_count
 
-    for index in range(
-        total
-    ):
-        page = doc[index]
+    if pages is None:
+        pages = range(
+            doc.page_count
+        )
 
-        label = (
-            f"Page {index + 1} de {total}"
+    for index in pages:
+        stamp_page_number(
+            doc[index],
+            total=total,
         )
 
-        width = text_width(
-            label,
-            fontsize=8,
+
+def remove_page_number(
+    page: fitz.Page,
+    *,
+    old_index: int,
+    old_total: int,
+) -> None:
+    """
+    Retire la couche de pagination posée par stamp_page_number lors de la
+    construction précédente (la page occupait alors l'indice `old_index`).
+    """
+
+    doc = page.parent
+    contents = page.get_contents()
+
+    label = page_number_label(
+        old_index,
+        old_total,
+    )
+
+    if (
+        len(contents) < 2
+        or label.encode().hex().encode()
+        not in doc.xref_stream(
+            contents[-1]
+        ).lower()
+    ):
+        raise CommandError(
+            "Pagination précédente introuvable "
+            f"sur la page {old_index + 1} "
+            "du cahier. Relancez sans --incremental."
         )
 
-        page.insert_text(
-            (
-                (
-                    PAGE_WIDTH
-                    - width
-                )
-                / 2,
-                PAGE_HEIGHT - 18,
-            ),
-            label,
-            fontsize=8,
-            fontname=FONT_NORMAL,
+    doc.xref_set_key(
+        page.xref,
+        "Contents",
+        "["
+        + " ".join(
+            f"{xref} 0 R"
+            for xref in contents[:-1]
         )
+        + "]",
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -946,6 +1101,600 @@ def build_cahier_manifest(
     return manifest
 
 
+# ---------------------------------------------------------------------------
+# Construction incrémentale
+#
+# build_state.json (dans cahier_pieces/) mémorise, pour la construction
+# précédente, le nombre de pages liminaires (couverture + index), le total
+# de pages et, pour chaque pièce dans l'ordre, son nombre de pages et
+# l'empreinte de son PDF source. Une pièce dont l'empreinte n'a pas changé
+# garde ses pages dans le cahier ; seules les autres sont réinsérées.
+# ---------------------------------------------------------------------------
+
+def source_signature(
+    path: Path,
+    previous: dict | None = None,
+) -> dict:
+    """
+    Empreinte d'un PDF source. Le sha256 précédent est réutilisé tant que
+    la taille et la date de modification n'ont pas changé.
+    """
+
+    stat = path.stat()
+
+    if (
+        previous
+        and previous.get("size") == stat.st_size
+        and previous.get("mtime_ns") == stat.st_mtime_ns
+    ):
+        sha256 = previous["sha256"]
+    else:
+        digest = hashlib.sha256()
+
+        with path.open("rb") as handle:
+            for block in iter(
+                lambda: handle.read(1024 * 1024),
+                b"",
+            ):
+                digest.update(block)
+
+        sha256 = digest.hexdigest()
+
+    return {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": sha256,
+    }
+
+
+def load_build_state() -> dict | None:
+    state_path = (
+        OUTPUT_DIR
+        / BUILD_STATE_FILENAME
+    )
+
+    if (
+        not state_path.exists()
+        or not (OUTPUT_DIR / CAHIER_FILENAME).exists()
+    ):
+        return None
+
+    # Un état illisible (écriture interrompue, édition manuelle) impose
+    # simplement une reconstruction complète.
+    try:
+        state = json.loads(
+            state_path.read_text(
+                encoding="utf-8"
+            )
+        )
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(
+        state,
+        dict,
+    ) or not BUILD_STATE_KEYS <= state.keys():
+        return None
+
+    return state
+
+
+def build_state(
+    entries: list[ExhibitEntry],
+    signatures: dict[str, dict],
+    *,
+    front_page_count: int,
+    total_pages: int,
+    page_numbers: bool,
+    compact_size: int,
+) -> dict:
+    return {
+        "front_page_count": front_page_count,
+        "total_pages": total_pages,
+        "page_numbers": page_numbers,
+        "compact_size": compact_size,
+        "pieces": [
+            {
+                "cote": entry.cote,
+                "page_count": entry.page_count,
+                **signatures[entry.cote],
+            }
+            for entry in entries
+        ],
+    }
+
+
+def plan_incremental_build(
+    state: dict | None,
+    entries: list[ExhibitEntry],
+    signatures: dict[str, dict],
+    *,
+    page_numbers: bool,
+) -> tuple[set[str] | None, str]:
+    """
+    Retourne les cotes dont les pages peuvent être conservées, ou None
+    avec la raison pour laquelle une reconstruction complète s'impose.
+    """
+
+    if state is None:
+        return None, "aucune construction précédente"
+
+    if state["page_numbers"] != page_numbers:
+        return None, "option de pagination modifiée"
+
+    cahier_size = (
+        OUTPUT_DIR
+        / CAHIER_FILENAME
+    ).stat().st_size
+
+    if (
+        cahier_size
+        > COMPACT_GROWTH_RATIO
+        * state["compact_size"]
+    ):
+        return None, "compactage du cahier"
+
+    previous = {
+        piece["cote"]: piece
+        for piece in state["pieces"]
+    }
+
+    reused = {
+        entry.cote
+        for entry in entries
+        if entry.cote in previous
+        and previous[entry.cote]["sha256"]
+        == signatures[entry.cote]["sha256"]
+        and previous[entry.cote]["page_count"]
+        == entry.page_count
+    }
+
+    # Les pages conservées ne sont jamais réordonnées.
+    if [
+        piece["cote"]
+        for piece in state["pieces"]
+        if piece["cote"] in reused
+    ] != [
+        entry.cote
+        for entry in entries
+        if entry.cote in reused
+    ]:
+        return None, "ordre des pièces modifié"
+
+    return reused, ""
+
+
+def splice_cahier(
+    cahier: fitz.Document,
+    state: dict,
+    entries: list[ExhibitEntry],
+    reused: set[str],
+    front: fitz.Document,
+    *,
+    page_numbers: bool,
+) -> tuple[int, int]:
+    """
+    Met à jour le cahier précédent (ouvert dans `cahier`) :
+
+        - retire les pages liminaires et les pièces modifiées ou retirées;
+        - insère les nouvelles pages liminaires (`front`) et les pièces
+          modifiées ou ajoutées;
+        - repagine uniquement les pages insérées et les pages conservées
+          dont le numéro ou le total a changé.
+
+    Retourne (pages insérées, pages conservées repaginées).
+    """
+
+    old_front = state["front_page_count"]
+    old_total = state["total_pages"]
+
+    old_starts: dict[str, int] = {}
+    old_page = old_front
+
+    for piece in state["pieces"]:
+        old_starts[piece["cote"]] = old_page
+        old_page += piece["page_count"]
+
+    # Suppression en partant de la fin : les indices restants ne bougent pas.
+    for piece in reversed(
+        state["pieces"]
+    ):
+        if piece["cote"] in reused:
+            continue
+
+        start = old_starts[piece["cote"]]
+
+        cahier.delete_pages(
+            from_page=start,
+            to_page=start + piece["page_count"] - 1,
+        )
+
+    cahier.delete_pages(
+        from_page=0,
+        to_page=old_front - 1,
+    )
+
+    cahier.insert_pdf(
+        front,
+        start_at=0,
+    )
+
+    fresh_pages = list(
+        range(
+            front.page_count
+        )
+    )
+
+    kept: list[tuple[int, int]] = []
+
+    for entry in entries:
+        start = entry.start_page - 1
+
+        if entry.cote in reused:
+            old_start = old_starts[entry.cote]
+
+            kept.extend(
+                (start + offset, old_start + offset)
+                for offset in range(
+                    entry.page_count
+                )
+            )
+            continue
+
+        source = fitz.open(
+            str(
+                entry.pdf_path
+            )
+        )
+
+        try:
+            cahier.insert_pdf(
+                source,
+                start_at=start,
+            )
+        finally:
+            source.close()
+
+        fresh_pages.extend(
+            range(
+                start,
+                start + entry.page_count,
+            )
+        )
+
+    if not page_numbers:
+        return len(fresh_pages), 0
+
+    total = cahier.page_count
+
+    restamped = [
+        (index, old_index)
+        for index, old_index in kept
+        if index != old_index
+        or total != old_total
+    ]
+
+    for index, old_index in restamped:
+        remove_page_number(
+            cahier[index],
+            old_index=old_index,
+            old_total=old_total,
+        )
+
+    stamp_page_numbers(
+        cahier,
+        pages=fresh_pages
+        + [
+            index
+            for index, _ in restamped
+        ],
+    )
+
+    return len(fresh_pages), len(restamped)
+
+
+# ---------------------------------------------------------------------------
+# Écriture par segments
+#
+# Le cahier complet n'est jamais résident en mémoire : les pièces sont
+# ajoutées au fichier par sauvegardes incrémentales successives, le
+# document étant refermé puis rouvert entre deux segments.
+# ---------------------------------------------------------------------------
+
+def current_rss_mb() -> float:
+    """
+    Mémoire résidente actuelle du processus, en Mo (0 si indisponible).
+    """
+
+    try:
+        with open("/proc/self/statm") as handle:
+            resident_pages = int(
+                handle.read().split()[1]
+            )
+    except (OSError, IndexError, ValueError):
+        return 0.0
+
+    return (
+        resident_pages
+        * os.sysconf("SC_PAGE_SIZE")
+        / (1024 * 1024)
+    )
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(
+        resource.RUSAGE_SELF
+    ).ru_maxrss
+
+    # Linux : kilo-octets ; macOS : octets.
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+
+    return peak / 1024
+
+
+def _resolve_dict(
+    doc: fitz.Document,
+    xref: int,
+    path: str,
+) -> tuple[int, str]:
+    """
+    Suit `path` (ex. "Resources/XObject") depuis l'objet `xref` à travers
+    les références indirectes. Retourne (xref, clé relative) à utiliser
+    avec xref_set_key.
+    """
+
+    prefix = ""
+
+    for key in path.split("/"):
+        kind, value = doc.xref_get_key(
+            xref,
+            prefix + key,
+        )
+
+        if kind == "xref":
+            xref = int(
+                value.split()[0]
+            )
+            prefix = ""
+        else:
+            prefix += key + "/"
+
+    return xref, prefix
+
+
+def share_duplicate_images(
+    doc: fitz.Document,
+    pages,
+    seen: dict[tuple, int],
+    replaced: dict[int, int],
+) -> int:
+    """
+    Fait pointer les images des pages `pages` vers une image identique
+    déjà présente dans le cahier (même contenu, même masque) et vide le
+    doublon. `seen` associe l'empreinte d'une image à son xref conservé ;
+    `replaced` associe chaque doublon déjà vidé à ce xref.
+
+    Un même xref peut être référencé par plusieurs pages d'une pièce
+    (add_image_page partage les images identiques) : une fois vidé, il
+    n'est plus jamais haché — son flux vide donnerait une autre
+    empreinte — et chaque référence suivante est redirigée via
+    `replaced`.
+
+    Indispensable en écriture par segments : sans sauvegarde compacte
+    (garbage=4), une même photo incorporée dans plusieurs pièces serait
+    écrite autant de fois.
+
+    Retourne le nombre d'images vidées.
+    """
+
+    shared = 0
+
+    for index in pages:
+        page = doc[index]
+
+        for (
+            xref,
+            smask,
+            width,
+            height,
+            bpc,
+            colorspace,
+            _alt,
+            name,
+            image_filter,
+            referencer,
+        ) in page.get_images(full=True):
+            kept = replaced.get(xref)
+
+            if kept is None:
+                key = (
+                    hashlib.sha256(
+                        doc.xref_stream_raw(xref)
+                    ).hexdigest(),
+                    hashlib.sha256(
+                        doc.xref_stream_raw(smask)
+                    ).hexdigest()
+                    if smask
+                    else "",
+                    width,
+                    height,
+                    bpc,
+                    colorspace,
+                    image_filter,
+                )
+
+                kept = seen.setdefault(
+                    key,
+                    xref,
+                )
+
+                if kept == xref:
+                    continue
+
+                replaced[xref] = kept
+
+                doc.update_stream(
+                    xref,
+                    b"",
+                )
+
+                shared += 1
+
+            holder, prefix = _resolve_dict(
+                doc,
+                referencer or page.xref,
+                "Resources/XObject",
+            )
+
+            doc.xref_set_key(
+                holder,
+                prefix + name,
+                f"{kept} 0 R",
+            )
+
+    return shared
+
+
+def write_cahier_segments(
+    cahier_path: Path,
+    front: fitz.Document,
+    entries: list[ExhibitEntry],
+    *,
+    total_pages: int,
+    page_numbers: bool,
+    segment_bytes: int,
+    max_memory_mb: float | None = None,
+) -> tuple[fitz.Document, int, int]:
+    """
+    Écrit les pages liminaires puis les pièces dans `cahier_path`, par
+    segments d'au plus `segment_bytes` de PDF sources.
+
+    La pagination est apposée au fil de l'eau (le total final est connu).
+    Un segment est aussi vidé dès que la mémoire résidente dépasse
+    --max-memory ; si elle le dépasse encore après, la construction est
+    interrompue.
+
+    Les images identiques d'une pièce à l'autre ne sont incorporées
+    qu'une fois (share_duplicate_images).
+
+    Retourne le cahier rouvert (pour les liens et signets), le nombre de
+    segments écrits et le nombre d'images partagées.
+    """
+
+    cahier = fitz.open()
+
+    cahier.insert_pdf(
+        front
+    )
+
+    if page_numbers:
+        stamp_page_numbers(
+            cahier,
+            total=total_pages,
+        )
+
+    cahier.save(
+        str(cahier_path),
+        garbage=4,
+        deflate=True,
+    )
+
+    cahier.close()
+
+    cahier = fitz.open(
+        str(cahier_path)
+    )
+
+    segments = 1
+    pending_bytes = 0
+
+    seen_images: dict[tuple, int] = {}
+    replaced_images: dict[int, int] = {}
+    shared_images = 0
+
+    for entry in entries:
+        start = cahier.page_count
+
+        source = fitz.open(
+            str(
+                entry.pdf_path
+            )
+        )
+
+        try:
+            cahier.insert_pdf(
+                source
+            )
+        finally:
+            source.close()
+
+        shared_images += share_duplicate_images(
+            cahier,
+            range(
+                start,
+                cahier.page_count,
+            ),
+            seen_images,
+            replaced_images,
+        )
+
+        if page_numbers:
+            stamp_page_numbers(
+                cahier,
+                range(
+                    start,
+                    cahier.page_count,
+                ),
+                total=total_pages,
+            )
+
+        pending_bytes += (
+            entry.pdf_path.stat().st_size
+        )
+
+        over_memory = (
+            max_memory_mb is not None
+            and current_rss_mb() > max_memory_mb
+        )
+
+        if (
+            pending_bytes < segment_bytes
+            and not over_memory
+        ):
+            continue
+
+        cahier.save(
+            str(cahier_path),
+            incremental=True,
+            encryption=fitz.PDF_ENCRYPT_KEEP,
+            deflate=True,
+        )
+
+        cahier.close()
+
+        rss = current_rss_mb()
+
+        if (
+            max_memory_mb is not None
+            and rss > max_memory_mb
+        ):
+            raise CommandError(
+                f"Mémoire résidente de {rss:.0f} Mo après l'écriture "
+                f"du segment se terminant par {entry.cote}, au-delà de "
+                f"--max-memory ({max_memory_mb:.0f} Mo)."
+            )
+
+        cahier = fitz.open(
+            str(cahier_path)
+        )
+
+        segments += 1
+        pending_bytes = 0
+
+    return cahier, segments, shared_images
+
+
 # ---------------------------------------------------------------------------
 # Validation finale
 # ---------------------------------------------------------------------------
@@ -1035,6 +1784,39 @@ class Command(
             ),
         )
 
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help=(
+                "Met à jour le cahier précédent : seules les pièces "
+                "modifiées sont réinsérées et seules les pages déplacées "
+                "sont repaginées. Reconstruction complète si le cahier "
+                "précédent n'est pas réutilisable."
+            ),
+        )
+
+        parser.add_argument(
+            "--streaming",
+            action="store_true",
+            help=(
+                "Écrit le cahier par segments (sauvegardes "
+                "incrémentales) au lieu de l'assembler entièrement "
+                "en mémoire."
+            ),
+        )
+
+        parser.add_argument(
+            "--max-memory",
+            type=float,
+            default=None,
+            metavar="MO",
+            help=(
+                "Plafond de mémoire résidente en Mo (implique "
+                "--streaming) : les segments sont vidés avant de le "
+                "dépasser et la construction échoue s'il l'est encore."
+            ),
+        )
+
     def handle(
         self,
         *args,
@@ -1052,6 +1834,29 @@ class Command(
             "no_page_numbers"
         ]
 
+        incremental = options[
+            "incremental"
+        ]
+
+        max_memory_mb = options[
+            "max_memory"
+        ]
+
+        streaming = (
+            options["streaming"]
+            or max_memory_mb is not None
+        )
+
+        segment_bytes = (
+            int(
+                max_memory_mb
+                * 1024 * 1024
+                * SEGMENT_MEMORY_SHARE
+            )
+            if max_memory_mb is not None
+            else SEGMENT_BYTES
+        )
+
         # ---------------------------------------------------------------
         # 1. Charger et valider les pièces
         # ---------------------------------------------------------------
@@ -1081,28 +1886,24 @@ class Command(
             )
 
         # ---------------------------------------------------------------
-        # 2. Première passe :
-        #    déterminer combien de pages occupe l'index.
+        # 2. Mise en page de l'index :
+        #    déterminer combien de pages il occupe.
         #
-        # Les pages de départ sont temporairement à zéro.
-        # Leur valeur ne change pas la hauteur des lignes de l'index.
+        # La hauteur des lignes ne dépend pas des pages de départ :
+        # l'index n'est dessiné qu'une fois, à l'étape 5.
         # ---------------------------------------------------------------
 
-        probe_index, _ = (
-            render_index_document(
-                entries,
-                mark_placeholders=(
-                    mark_placeholders
-                ),
-            )
+        index_rows = layout_index(
+            entries,
+            mark_placeholders=(
+                mark_placeholders
+            ),
         )
 
-        index_page_count = (
-            probe_index.page_count
+        index_page_count = count_index_pages(
+            index_rows
         )
 
-        probe_index.close()
-
         # ---------------------------------------------------------------
         # 3. Calculer les pages finales.
         #
@@ -1174,9 +1975,51 @@ class Command(
             return
 
         # ---------------------------------------------------------------
-        # 4. Préparer staging.
+        # 4. Mode de construction et préparation du staging.
+        #
+        # Les empreintes sont toujours calculées : une construction
+        # complète prépare ainsi la prochaine construction incrémentale.
         # ---------------------------------------------------------------
 
+        state = load_build_state()
+
+        previous_pieces = {
+            piece["cote"]: piece
+            for piece in (
+                state["pieces"]
+                if state
+                else []
+            )
+        }
+
+        signatures = {
+            entry.cote: source_signature(
+                entry.pdf_path,
+                previous_pieces.get(
+                    entry.cote
+                ),
+            )
+            for entry in entries
+        }
+
+        reused = None
+
+        if incremental:
+            reused, reason = plan_incremental_build(
+                state,
+                entries,
+                signatures,
+                page_numbers=not no_page_numbers,
+            )
+
+            if reused is None:
+                self.stdout.write(
+                    self.style.WARNING(
+                        "Reconstruction complète : "
+                        f"{reason}."
+                    )
+                )
+
         if STAGING_DIR.exists():
             shutil.rmtree(
                 STAGING_DIR
@@ -1193,10 +2036,7 @@ class Command(
 
             index_doc, index_links = (
                 render_index_document(
-                    entries,
-                    mark_placeholders=(
-                        mark_placeholders
-                    ),
+                    index_rows
                 )
             )
 
@@ -1205,8 +2045,8 @@ class Command(
                 != index_page_count
             ):
                 raise CommandError(
-                    "La pagination de l'index a changé "
-                    "entre les deux passes."
+                    "La pagination de l'index ne "
+                    "correspond pas à sa mise en page."
                 )
 
             index_path = (
@@ -1222,12 +2062,15 @@ class Command(
 
             # -----------------------------------------------------------
             # 6. Construire le cahier.
+            #
+            # Pages liminaires : couverture puis index. Elles sont
+            # toujours régénérées (quelques pages).
             # -----------------------------------------------------------
 
-            cahier = fitz.open()
+            front = fitz.open()
 
             add_cahier_cover(
-                cahier,
+                front,
                 exhibit_count=len(
                     entries
                 ),
@@ -1236,25 +2079,97 @@ class Command(
                 ),
             )
 
-            # Index après la couverture.
-            cahier.insert_pdf(
+            front.insert_pdf(
                 index_doc
             )
 
-            # Pièces P-1 -> P-n.
-            for entry in entries:
-                source = fitz.open(
-                    str(
-                        entry.pdf_path
+            cahier_path = (
+                STAGING_DIR
+                / CAHIER_FILENAME
+            )
+
+            if (
+                reused is None
+                and streaming
+            ):
+                cahier, segments, shared_images = (
+                    write_cahier_segments(
+                        cahier_path,
+                        front,
+                        entries,
+                        total_pages=(
+                            expected_total_pages
+                        ),
+                        page_numbers=(
+                            not no_page_numbers
+                        ),
+                        segment_bytes=segment_bytes,
+                        max_memory_mb=max_memory_mb,
+                    )
+                )
+
+                self.stdout.write(
+                    "Écriture par segments : "
+                    f"{segments} segment(s), "
+                    f"{shared_images} image(s) partagée(s)."
+                )
+
+            elif reused is None:
+                cahier = fitz.open()
+
+                cahier.insert_pdf(
+                    front
+                )
+
+                # Pièces P-1 -> P-n.
+                for entry in entries:
+                    source = fitz.open(
+                        str(
+                            entry.pdf_path
+                        )
                     )
+
+                    try:
+                        cahier.insert_pdf(
+                            source
+                        )
+                    finally:
+                        source.close()
+
+            else:
+                # Copie octet par octet : le PDF précédent est ensuite
+                # modifié en place puis sauvegardé de façon incrémentale.
+                shutil.copyfile(
+                    OUTPUT_DIR
+                    / CAHIER_FILENAME,
+                    cahier_path,
                 )
 
-                try:
-                    cahier.insert_pdf(
-                        source
+                cahier = fitz.open(
+                    str(cahier_path)
+                )
+
+                inserted_pages, restamped_pages = (
+                    splice_cahier(
+                        cahier,
+                        state,
+                        entries,
+                        reused,
+                        front,
+                        page_numbers=(
+                            not no_page_numbers
+                        ),
                     )
-                finally:
-                    source.close()
+                )
+
+                self.stdout.write(
+                    f"Incrémental : {len(reused)} pièce(s) "
+                    f"conservée(s), {inserted_pages} page(s) "
+                    f"insérée(s), {restamped_pages} page(s) "
+                    "conservée(s) repaginée(s)."
+                )
+
+            front.close()
 
             # -----------------------------------------------------------
             # 7. Index cliquable.
@@ -1311,27 +2226,90 @@ class Command(
 
             # -----------------------------------------------------------
             # 9. Pagination continue.
+            #
+            # En mode incrémental, splice_cahier a déjà repaginé les
+            # seules pages concernées ; en écriture par segments, les
+            # pages l'ont été au fil de l'eau.
             # -----------------------------------------------------------
 
-            if not no_page_numbers:
+            if (
+                reused is None
+                and not streaming
+                and not no_page_numbers
+            ):
                 stamp_page_numbers(
                     cahier
                 )
 
-            cahier_path = (
-                STAGING_DIR
-                / CAHIER_FILENAME
-            )
+            if (
+                (reused is not None or streaming)
+                and cahier.can_save_incrementally()
+            ):
+                cahier.save(
+                    str(cahier_path),
+                    incremental=True,
+                    encryption=fitz.PDF_ENCRYPT_KEEP,
+                    deflate=True,
+                )
 
-            cahier.save(
-                str(cahier_path),
-                garbage=4,
-                deflate=True,
-            )
+                # Un cahier écrit par segments n'est jamais recompacté
+                # (cela le chargerait entièrement) : sa taille sert de
+                # référence.
+                compact_size = (
+                    state["compact_size"]
+                    if reused is not None
+                    else cahier_path.stat().st_size
+                )
+
+            else:
+                compact_path = cahier_path.with_suffix(
+                    ".compact.pdf"
+                )
+
+                cahier.save(
+                    str(compact_path),
+                    garbage=4,
+                    deflate=True,
+                )
+
+                os.replace(
+                    compact_path,
+                    cahier_path,
+                )
+
+                compact_size = (
+                    cahier_path.stat().st_size
+                )
 
             cahier.close()
             index_doc.close()
 
+            (
+                STAGING_DIR
+                / BUILD_STATE_FILENAME
+            ).write_text(
+                json.dumps(
+                    build_state(
+                        entries,
+                        signatures,
+                        front_page_count=(
+                            1
+                            + index_page_count
+                        ),
+                        total_pages=(
+                            expected_total_pages
+                        ),
+                        page_numbers=(
+                            not no_page_numbers
+                        ),
+                        compact_size=compact_size,
+                    ),
+                    ensure_ascii=False,
+                    indent=2,
+                ),
+                encoding="utf-8",
+            )
+
             # -----------------------------------------------------------
             # 10. Manifest du cahier.
             # -----------------------------------------------------------
@@ -1448,3 +2426,8 @@ class Command(
                 f"{OUTPUT_DIR / MANIFEST_FILENAME}"
             )
         )
+
+        self.stdout.write(
+            "Mémoire résidente maximale : "
+            f"{peak_rss_mb():.0f} Mo"
+        )
@@ -7,15 +7,21 @@ from pathlib import Path
 from django.conf import settings
 from django.core.management.base import BaseCommand, CommandError
 
+from case_manager.evidence_audit import DescriptivePieceIndex
 from case_manager.procedural_registry import (
     build_proposed_registry,
     build_registry_report,
     collect_historic_alias_mappings,
+    diff_registry_reports,
     expand_collective_references,
     extract_pleading_placeholders,
+    load_registry_snapshot,
     parse_bordereau,
+    registry_input_digests,
     reports_digest,
+    reusable_sections,
     write_registry_reports,
+    write_registry_snapshot,
 )
 
 
@@ -29,7 +35,17 @@ class Command(BaseCommand):
         parser.add_argument("--pleading", type=Path, default=base / "legal/requete_secton_faits_lp.md")
         parser.add_argument("--input-dir", type=Path, default=base / "legal/organisation_preuve")
         parser.add_argument("--output-dir", type=Path, default=base / "legal/organisation_preuve/registre_procedural")
-        parser.add_argument("--check", action="store_true")
+        parser.add_argument("--snapshot", type=Path, default=base / ".procedural_registry_snapshot.json")
+        parser.add_argument(
+            "--refresh",
+            action="store_true",
+            help="Recalcule toutes les sections sans réutiliser l’instantané (ex. après une modification de la base).",
+        )
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Vérifie que les rapports sont à jour ; les sections qui interrogent la base sont toujours recalculées.",
+        )
 
     def handle(self, *args, **options):
         required = ["audit_json", "bordereau", "pleading", "input_dir"]
@@ -41,10 +57,36 @@ class Command(BaseCommand):
         audit = json.loads(options["audit_json"].read_text(encoding="utf-8"))
         legal_dir = options["bordereau"].parent
         bordereau_rows = parse_bordereau(options["bordereau"])
-        registry, components, conflicts = build_proposed_registry(bordereau_rows, audit, legal_dir)
-        aliases = collect_historic_alias_mappings(options["input_dir"], legal_dir)
-        ranges = expand_collective_references(audit["unresolved"], audit)
-        placeholders = extract_pleading_placeholders(options["pleading"])
+        digests = registry_input_digests(
+            audit_path=options["audit_json"],
+            bordereau_path=options["bordereau"],
+            pleading_path=options["pleading"],
+            input_dir=options["input_dir"],
+        )
+        snapshot = None if options["refresh"] else load_registry_snapshot(options["snapshot"])
+        # Sections dont les entrées n’ont pas changé depuis l’instantané. Les
+        # empreintes ne couvrent pas la base : --check recalcule les sections
+        # qui l’interrogent.
+        reused = reusable_sections(snapshot, digests, database=not options["check"])
+        # Un seul index des pièces descriptives : chaque fichier et chaque
+        # chemin média n'est résolu qu'une fois pour tout le registre.
+        piece_index = DescriptivePieceIndex()
+        if "registry" in reused:
+            registry, components, conflicts = (reused["registry"][key] for key in ("registry", "components", "conflicts"))
+        else:
+            registry, components, conflicts = build_proposed_registry(bordereau_rows, audit, legal_dir, piece_index)
+        if "historic_aliases" in reused:
+            aliases = reused["historic_aliases"]["historic_aliases"]
+        else:
+            aliases = collect_historic_alias_mappings(options["input_dir"], legal_dir, piece_index)
+        if "collective_expansions" in reused:
+            ranges = reused["collective_expansions"]["collective_expansions"]
+        else:
+            ranges = expand_collective_references(audit["unresolved"], audit)
+        if "pleading_placeholders" in reused:
+            placeholders = reused["pleading_placeholders"]["pleading_placeholders"]
+        else:
+            placeholders = extract_pleading_placeholders(options["pleading"])
         report = build_registry_report(
             audit=audit,
             bordereau_rows=bordereau_rows,
@@ -55,6 +97,12 @@ class Command(BaseCommand):
             range_rows=ranges,
             placeholder_rows=placeholders,
         )
+        recomputed = [section for section in digests if section not in reused]
+        self.stdout.write(f"Sections recalculées : {', '.join(recomputed) or 'aucune'}")
+        if snapshot is not None:
+            diff = diff_registry_reports(snapshot["report"], report)
+            self.stdout.write("Différences avec l’instantané précédent :")
+            self.stdout.write(json.dumps(diff, ensure_ascii=False, indent=2, sort_keys=True))
 
         output_dir = options["output_dir"].resolve()
         if options["check"]:
@@ -71,6 +119,7 @@ class Command(BaseCommand):
             self.stdout.write(self.style.SUCCESS("Le registre procédural proposé est reproductible et à jour."))
         else:
             paths = write_registry_reports(output_dir, report)
+            write_registry_snapshot(options["snapshot"], digests, report)
             self.stdout.write(self.style.SUCCESS(f"Registre proposé écrit dans {output_dir}"))
             self.stdout.write(f"Empreinte : {reports_digest(paths)}")
         self.stdout.write(json.dumps(report["summary"], ensure_ascii=False, indent=2, sort_keys=True))
@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from case_manager.models import LegalCase
+from case_manager.services import rebuild_produced_exhibits
+
+
+class Command(BaseCommand):
+    help = (
+        "Régénère la liste des pièces produites (ProducedExhibit) d'une ou "
+        "plusieurs causes et rapporte le nombre de requêtes SQL et la durée."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--case",
+            type=int,
+            action="append",
+            default=[],
+            help="ID de la cause à régénérer (répétable). Par défaut : toutes les causes.",
+        )
+
+    def handle(self, *args, **options):
+        case_ids = options["case"] or list(LegalCase.objects.values_list("pk", flat=True))
+        for case_id in case_ids:
+            started = time.perf_counter()
+            with CaptureQueriesContext(connection) as queries:
+                count = rebuild_produced_exhibits(case_id)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"Cause {case_id}: {count} pièce(s) produite(s), "
+                f"{len(queries)} requête(s) SQL, {elapsed:.2f}s"
+            )
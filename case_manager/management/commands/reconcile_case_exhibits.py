@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from case_manager.models import LegalCase
+from case_manager.services import refresh_case_exhibits
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcule entièrement le registre des pièces (ExhibitRegistry) d'une ou "
+        "plusieurs causes. Les signaux appliquent des mises à jour incrémentales ; "
+        "cette commande sert de réconciliation explicite."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--case",
+            type=int,
+            action="append",
+            default=[],
+            help="ID de la cause à réconcilier (répétable). Par défaut : toutes les causes.",
+        )
+
+    def handle(self, *args, **options):
+        case_ids = options["case"] or list(LegalCase.objects.values_list("pk", flat=True))
+        for case_id in case_ids:
+            before = set(
+                LegalCase.objects.filter(pk=case_id)
+                .values_list("exhibits__content_type_id", "exhibits__object_id")
+            )
+            highest = refresh_case_exhibits(case_id)
+            after = set(
+                LegalCase.objects.filter(pk=case_id)
+                .values_list("exhibits__content_type_id", "exhibits__object_id")
+            )
+            before.discard((None, None))
+            after.discard((None, None))
+            self.stdout.write(
+                f"Cause {case_id}: +{len(after - before)} / -{len(before - after)} "
+                f"(dernier numéro P-{highest})"
+            )
+        self.stdout.write(self.style.SUCCESS(f"{len(case_ids)} cause(s) réconciliée(s)."))
@@ -11,13 +11,17 @@ from pathlib import Path
 from django.conf import settings
 from django.core.management.base import BaseCommand, CommandError
 
-from document_manager.models import Document
 from email_manager.models import Email, EmailThread
 from events.models import Event
-from googlechat_manager.models import ChatSequence
 from pdf_manager.models import PDFDocument
 from photos.models import Photo, PhotoDocument
 
+from case_manager.exhibit_renderers.sources import (
+    KIND_MODELS,
+    SourceIndex,
+    ordered_related,
+)
+
 
 # ---------------------------------------------------------------------------
 # Configuration
@@ -43,6 +47,17 @@ MANUAL_DIR = Path(settings.BASE_DIR) / "manual_pieces"
 STAGING_DIR = Path(settings.BASE_DIR) / ".pieces_build"
 BACKUP_DIR = Path(settings.BASE_DIR) / ".pieces_backup"
 
+# Relations lues par l'export et l'aperçu, préchargées en bloc par
+# SourceIndex dans l'ordre de copie des fichiers.
+EXPORT_RELATIONS = {
+    "event": (("linked_photos", ("pk",)),),
+    "photodoc": (("photos", ("pk",)),),
+    "thread": (("emails", ("date_sent", "pk")),),
+}
+EXPORT_SELECT = {
+    "event": ("linked_email",),
+}
+
 
 # Quelques entrées du bordereau actuel ne contiennent pas encore
 # un model+pk exploitable automatiquement.
@@ -414,7 +429,7 @@ def preview_pdf(pdf: PDFDocument, label: str, root: Path) -> list[Path]:
 def preview_event(event: Event, label: str, root: Path) -> list[Path]:
     outputs = []
 
-    photos = list(event.linked_photos.all().order_by("pk"))
+    photos = ordered_related(event, "linked_photos", "pk")
 
     if len(photos) == 1 and not event.linked_email:
         return preview_photo(photos[0], label, root)
@@ -453,7 +468,7 @@ def preview_photodoc(
     label: str,
     root: Path,
 ) -> list[Path]:
-    photos = list(photodoc.photos.all().order_by("pk"))
+    photos = ordered_related(photodoc, "photos", "pk")
 
     if not photos:
         raise FileNotFoundError(
@@ -484,7 +499,7 @@ def preview_thread(
     label: str,
     root: Path,
 ) -> list[Path]:
-    emails = list(thread.emails.all().order_by("date_sent", "pk"))
+    emails = ordered_related(thread, "emails", "date_sent", "pk")
 
     if not emails:
         raise FileNotFoundError(
@@ -636,7 +651,7 @@ def export_event(event: Event, label: str, root: Path) -> list[Path]:
     """
     outputs = []
 
-    photos = list(event.linked_photos.all().order_by("pk"))
+    photos = ordered_related(event, "linked_photos", "pk")
 
     if len(photos) == 1 and not event.linked_email:
         return export_photo(photos[0], label, root)
@@ -680,7 +695,7 @@ def export_photodoc(
     """
     PhotoDocument est une association de Photo.
     """
-    photos = list(photodoc.photos.all().order_by("pk"))
+    photos = ordered_related(photodoc, "photos", "pk")
 
     if not photos:
         raise FileNotFoundError(
@@ -716,9 +731,7 @@ def export_thread(
     """
     EmailThread est une association d'Email.
     """
-    emails = list(
-        thread.emails.all().order_by("date_sent", "pk")
-    )
+    emails = ordered_related(thread, "emails", "date_sent", "pk")
 
     if not emails:
         raise FileNotFoundError(
@@ -749,11 +762,26 @@ def export_thread(
 # Export d'une référence
 # ---------------------------------------------------------------------------
 
+def load_source_index(refs) -> SourceIndex:
+    """
+    Charge en bloc les objets de toutes les références : une requête par
+    modèle et par relation, quel que soit le nombre de cotes.
+    """
+    return SourceIndex.load(
+        refs,
+        relations=EXPORT_RELATIONS,
+        select=EXPORT_SELECT,
+    )
+
+
 def export_source(
     row: BordereauRow,
     ref: SourceRef,
     output_root: Path,
+    source_index: SourceIndex | None = None,
 ) -> list[Path]:
+    if source_index is None:
+        source_index = load_source_index([ref])
 
     # Document et ChatSequence :
     # 1. représentation manuelle
@@ -797,34 +825,28 @@ def export_source(
             else row.cote
         )
 
-        pk = int(raw_id) if raw_id.isdigit() else raw_id
+        obj = (
+            source_index.get(ref.kind, raw_id)
+            if ref.kind in KIND_MODELS
+            else None
+        )
 
         if ref.kind == "pdf":
-            obj = PDFDocument.objects.get(pk=pk)
             outputs.extend(export_pdf(obj, label, output_root))
 
         elif ref.kind == "email":
-            obj = Email.objects.get(pk=pk)
             outputs.extend(export_email(obj, label, output_root))
 
         elif ref.kind == "photo":
-            obj = Photo.objects.get(pk=pk)
             outputs.extend(export_photo(obj, label, output_root))
 
         elif ref.kind == "event":
-            obj = Event.objects.get(pk=pk)
             outputs.extend(export_event(obj, label, output_root))
 
         elif ref.kind == "photodoc":
-            obj = PhotoDocument.objects.get(pk=pk)
             outputs.extend(export_photodoc(obj, label, output_root))
 
         elif ref.kind == "thread":
-            if str(raw_id).isdigit():
-                obj = EmailThread.objects.get(pk=int(raw_id))
-            else:
-                obj = EmailThread.objects.get(thread_id=raw_id)
-
             outputs.extend(export_thread(obj, label, output_root))
 
         elif ref.kind == "path":
@@ -846,7 +868,10 @@ def preview_source(
     row: BordereauRow,
     ref: SourceRef,
     output_root: Path,
+    source_index: SourceIndex | None = None,
 ) -> list[Path]:
+    if source_index is None:
+        source_index = load_source_index([ref])
 
     if ref.kind in {"document", "chatsequence"}:
         if len(ref.ids) != 1:
@@ -854,10 +879,7 @@ def preview_source(
                 f"{ref.kind} avec plusieurs IDs non supporté : {ref.ids}"
             )
 
-        if ref.kind == "document":
-            Document.objects.get(pk=int(ref.ids[0]))
-        else:
-            ChatSequence.objects.get(pk=int(ref.ids[0]))
+        source_index.get(ref.kind, ref.ids[0])
 
         source_key = f"{ref.kind}-{ref.ids[0]}"
 
@@ -877,34 +899,29 @@ def preview_source(
 
     for index, raw_id in enumerate(ref.ids, start=1):
         label = f"{row.cote}.{index}" if multiple else row.cote
-        pk = int(raw_id) if raw_id.isdigit() else raw_id
+
+        obj = (
+            source_index.get(ref.kind, raw_id)
+            if ref.kind in KIND_MODELS
+            else None
+        )
 
         if ref.kind == "pdf":
-            obj = PDFDocument.objects.get(pk=pk)
             outputs.extend(preview_pdf(obj, label, output_root))
 
         elif ref.kind == "email":
-            obj = Email.objects.get(pk=pk)
             outputs.extend(preview_email(obj, label, output_root))
 
         elif ref.kind == "photo":
-            obj = Photo.objects.get(pk=pk)
             outputs.extend(preview_photo(obj, label, output_root))
 
         elif ref.kind == "event":
-            obj = Event.objects.get(pk=pk)
             outputs.extend(preview_event(obj, label, output_root))
 
         elif ref.kind == "photodoc":
-            obj = PhotoDocument.objects.get(pk=pk)
             outputs.extend(preview_photodoc(obj, label, output_root))
 
         elif ref.kind == "thread":
-            if str(raw_id).isdigit():
-                obj = EmailThread.objects.get(pk=int(raw_id))
-            else:
-                obj = EmailThread.objects.get(thread_id=raw_id)
-
             outputs.extend(preview_thread(obj, label, output_root))
 
         elif ref.kind == "path":
@@ -952,8 +969,10 @@ class Command(BaseCommand):
         manifest = {}
         unresolved = []
 
-        for row in rows:
-            ref = resolve_source(row)
+        refs = [resolve_source(row) for row in rows]
+        source_index = load_source_index(refs)
+
+        for row, ref in zip(rows, refs):
 
             if ref is None:
                 unresolved.append(row.cote)
@@ -983,9 +1002,9 @@ class Command(BaseCommand):
 
             try:
                 if dry_run:
-                    outputs = preview_source(row, ref, output_root)
+                    outputs = preview_source(row, ref, output_root, source_index)
                 else:
-                    outputs = export_source(row, ref, output_root)
+                    outputs = export_source(row, ref, output_root, source_index)
             except Exception as exc:
                 raise CommandError(
                     f"Erreur pour {row.cote} ({ref.kind}:{ref.ids}) : {exc}"
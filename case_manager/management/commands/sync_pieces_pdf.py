@@ -3,7 +3,11 @@
 from __future__ import annotations
 
 import json
+import multiprocessing
 import shutil
+from concurrent.futures import (
+    ProcessPoolExecutor,
+)
 from pathlib import Path
 
 import fitz
@@ -14,21 +18,6 @@ from django.core.management.base import (
     CommandError,
 )
 
-from document_manager.models import Document
-from email_manager.models import (
-    Email,
-    EmailThread,
-)
-from events.models import Event
-from googlechat_manager.models import (
-    ChatSequence,
-)
-from pdf_manager.models import PDFDocument
-from photos.models import (
-    Photo,
-    PhotoDocument,
-)
-
 from case_manager.exhibit_renderers.registry import (
     RENDERERS,
 )
@@ -38,6 +27,17 @@ from case_manager.exhibit_renderers.email import (
 from case_manager.exhibit_renderers.manual import (
     MANUAL_DIR,
 )
+from case_manager.exhibit_renderers.sources import (
+    RENDER_RELATIONS,
+    SourceIndex,
+    ordered_related,
+)
+from case_manager.exhibit_renderers.worker import (
+    init_worker,
+)
+from case_manager.exhibit_renderers import (
+    cache as render_cache,
+)
 
 # Réutilisation du moteur déjà validé.
 from case_manager.management.commands.sync_pieces import (
@@ -63,93 +63,55 @@ BACKUP_DIR = (
 )
 
 
-def resolve_objects(ref):
+def resolve_objects(ref, index=None):
     """
     Transforme SourceRef en objets Django.
+
+    Sans index, les objets de cette seule référence sont chargés (avec les
+    relations lues par les renderers).
     """
 
-    if ref.kind == "pdf":
-        return [
-            PDFDocument.objects.get(
-                pk=int(pk)
-            )
-            for pk in ref.ids
-        ]
+    if index is None:
+        index = SourceIndex.load(
+            [ref],
+            relations=RENDER_RELATIONS,
+        )
 
-    if ref.kind == "photo":
-        return [
-            Photo.objects.get(
-                pk=int(pk)
-            )
-            for pk in ref.ids
-        ]
+    return index.resolve(ref)
 
-    if ref.kind == "photodoc":
-        return [
-            PhotoDocument.objects.get(
-                pk=int(pk)
-            )
-            for pk in ref.ids
-        ]
 
-    if ref.kind == "event":
-        return [
-            Event.objects.get(
-                pk=int(pk)
-            )
-            for pk in ref.ids
-        ]
+def load_sources(rows) -> dict:
+    """
+    Résout toutes les cotes en bloc : une requête par modèle et par
+    relation, quel que soit le nombre de cotes.
 
-    if ref.kind == "email":
-        return [
-            Email.objects.get(
-                pk=int(pk)
-            )
-            for pk in ref.ids
-        ]
+    Retourne {cote: objets}. Une cote absente (non résolue, objet
+    manquant) est résolue à nouveau par render_row, qui rapporte l'erreur.
+    """
 
-    if ref.kind == "thread":
-        if len(ref.ids) != 1:
-            raise ValueError(
-                "Une cote thread doit "
-                "référencer un seul thread."
-            )
+    refs = {
+        row.cote: resolve_source(row)
+        for row in rows
+    }
 
-        raw_id = ref.ids[0]
+    index = SourceIndex.load(
+        refs.values(),
+        relations=RENDER_RELATIONS,
+    )
 
-        if raw_id.isdigit():
-            thread = (
-                EmailThread.objects.get(
-                    pk=int(raw_id)
-                )
-            )
-        else:
-            thread = (
-                EmailThread.objects.get(
-                    thread_id=raw_id
-                )
-            )
+    sources = {}
 
-        return [thread]
+    for cote, ref in refs.items():
+        if ref is None:
+            continue
 
-    if ref.kind == "document":
-        return [
-            Document.objects.get(
-                pk=int(ref.ids[0])
-            )
-        ]
+        try:
+            sources[cote] = index.resolve(ref)
 
-    if ref.kind == "chatsequence":
-        return [
-            ChatSequence.objects.get(
-                pk=int(ref.ids[0])
-            )
-        ]
+        except Exception:
+            continue
 
-    raise ValueError(
-        f"Type non supporté : "
-        f"{ref.kind}"
-    )
+    return sources
 
 
 def _page_count(path) -> int:
@@ -180,7 +142,9 @@ def compute_stats(ref, sources, output_path) -> dict:
         )
 
     elif kind == "thread":
-        emails = list(sources[0].emails.all())
+        emails = ordered_related(
+            sources[0], "emails", "date_sent", "pk"
+        )
         stats["email_count"] = len(emails)
         stats["attachment_count"] = sum(
             len(extract_eml_attachments(e)) for e in emails
@@ -189,13 +153,19 @@ def compute_stats(ref, sources, output_path) -> dict:
     elif kind == "event":
         stats["event_count"] = len(sources)
         stats["photo_count"] = sum(
-            e.linked_photos.count() for e in sources
+            len(
+                ordered_related(
+                    e, "linked_photos", "datetime_original", "pk"
+                )
+            )
+            for e in sources
         )
 
     elif kind == "photodoc":
         stats["photodoc_count"] = len(sources)
         stats["photo_count"] = sum(
-            pd.photos.count() for pd in sources
+            len(ordered_related(pd, "photos", "pk"))
+            for pd in sources
         )
 
     elif kind == "photo":
@@ -218,6 +188,124 @@ def compute_stats(ref, sources, output_path) -> dict:
     return stats
 
 
+def render_row(
+    row,
+    staging_dir: Path,
+    cache_dir: Path | None = None,
+    sources=None,
+) -> dict:
+    """
+    Rend UNE cote dans staging_dir et retourne son entrée de manifeste.
+
+    Fonction de niveau module : exécutée telle quelle dans un processus du
+    pool (--jobs). Une erreur de rendu est enregistrée dans l'entrée et
+    n'interrompt pas les autres cotes.
+
+    Avec cache_dir, une cote dont l'empreinte des sources est déjà en cache
+    n'est pas rendue à nouveau (clé « cached » de l'entrée, retirée avant
+    l'écriture du manifeste).
+
+    sources : objets déjà résolus par load_sources ; sinon la cote est
+    résolue seule.
+    """
+
+    ref = None
+
+    try:
+        ref = resolve_source(row)
+
+        if ref is None:
+            raise ValueError(
+                f"{row.cote} non résolue."
+            )
+
+        renderer = RENDERERS.get(ref.kind)
+
+        if renderer is None:
+            raise ValueError(
+                f"Aucun renderer pour {ref.kind}."
+            )
+
+        base = {
+            "status": "ok",
+            "source_type": ref.kind,
+            "source_ids": list(ref.ids),
+            "description": row.description,
+        }
+
+        if sources is None:
+            sources = resolve_objects(ref)
+
+        destination = (
+            staging_dir / f"{row.cote}.pdf"
+        )
+
+        fingerprint = (
+            render_cache.source_fingerprint(
+                row, ref, sources
+            )
+            if cache_dir
+            else None
+        )
+
+        cached = bool(
+            fingerprint
+            and render_cache.fetch(
+                fingerprint,
+                destination,
+                cache_dir,
+            )
+        )
+
+        if cached:
+            output = destination
+
+        else:
+            output = renderer.render(
+                row=row,
+                sources=sources,
+                destination=destination,
+            )
+
+            if fingerprint:
+                render_cache.store(
+                    fingerprint,
+                    output,
+                    cache_dir,
+                )
+
+        stats = compute_stats(
+            ref, sources, output
+        )
+
+        return {
+            **base,
+            "output": output.name,
+            "fingerprint": fingerprint,
+            **stats,
+            "cached": cached,
+        }
+
+    except Exception as exc:
+        return _error_entry(
+            row, ref, exc
+        )
+
+
+def _error_entry(
+    row,
+    ref,
+    exc,
+) -> dict:
+    return {
+        "status": "error",
+        "source_type": ref.kind if ref else "unknown",
+        "source_ids": list(ref.ids) if ref else [],
+        "description": row.description,
+        "error": str(exc),
+    }
+
+
 class Command(BaseCommand):
 
     help = (
@@ -242,6 +330,24 @@ class Command(BaseCommand):
                 "liste de cotes, ex. --only P-2 P-43"
             ),
         )
+        parser.add_argument(
+            "--no-cache",
+            action="store_true",
+            help=(
+                "Ignore le cache de rendu et "
+                "régénère toutes les cotes."
+            ),
+        )
+        parser.add_argument(
+            "--jobs",
+            type=int,
+            default=1,
+            help=(
+                "Nombre de processus de rendu en "
+                "parallèle (PyMuPDF n'est pas "
+                "thread-safe). Défaut : 1."
+            ),
+        )
 
     def handle(
         self,
@@ -250,6 +356,12 @@ class Command(BaseCommand):
     ):
         dry_run = options["dry_run"]
         only = options.get("only")
+        jobs = max(1, options["jobs"])
+        cache_dir = (
+            None
+            if options["no_cache"]
+            else render_cache.RENDER_CACHE_DIR
+        )
 
         # --only en génération RÉELLE : sortie dans un dossier séparé
         # (pieces_pdf_test/), afin de ne JAMAIS écraser le jeu complet
@@ -286,6 +398,11 @@ class Command(BaseCommand):
         manifest = {}
 
         if dry_run:
+            index = SourceIndex.load(
+                [resolve_source(row) for row in rows],
+                relations=RENDER_RELATIONS,
+            )
+
             for row in rows:
                 ref = resolve_source(row)
 
@@ -300,8 +417,8 @@ class Command(BaseCommand):
                         f"{ref.kind}."
                     )
 
-                sources = resolve_objects(
-                    ref
+                resolve_objects(
+                    ref, index
                 )
 
                 self.stdout.write(
@@ -330,83 +447,45 @@ class Command(BaseCommand):
 
         try:
             error_count = 0
+            cached_count = 0
+
+            # Le manifeste est assemblé dans l'ordre du bordereau, quel que
+            # soit l'ordre d'achèvement des rendus : sortie déterministe.
+            for row, entry in zip(
+                rows,
+                self._render_rows(
+                    rows, staging_dir, jobs, cache_dir
+                ),
+            ):
+                cached = entry.pop("cached", False)
+                cached_count += cached
+                manifest[row.cote] = entry
 
-            for row in rows:
-                ref = None
-
-                try:
-                    ref = resolve_source(row)
-
-                    if ref is None:
-                        raise ValueError(
-                            f"{row.cote} non résolue."
-                        )
-
-                    renderer = RENDERERS.get(ref.kind)
-
-                    if renderer is None:
-                        raise ValueError(
-                            f"Aucun renderer pour {ref.kind}."
-                        )
-
-                    base = {
-                        "status": "ok",
-                        "source_type": ref.kind,
-                        "source_ids": list(ref.ids),
-                        "description": row.description,
-                    }
-
-                    # Erreur de rendu d'UNE cote : enregistrée, n'interrompt
-                    # pas les 104 autres (le run reste un test d'intégrité).
-                    sources = resolve_objects(ref)
-
-                    destination = (
-                        staging_dir / f"{row.cote}.pdf"
-                    )
-
-                    output = renderer.render(
-                        row=row,
-                        sources=sources,
-                        destination=destination,
-                    )
-
-                    stats = compute_stats(
-                        ref, sources, output
-                    )
-
-                    manifest[row.cote] = {
-                        **base,
-                        "output": output.name,
-                        **stats,
-                    }
-
-                    self.stdout.write(
-                        f"{row.cote:<6} "
-                        f"-> {ref.kind}:"
-                        f"{','.join(ref.ids):<14} "
-                        f"{stats['page_count']:>3} p."
-                        + (
-                            "  [placeholder]"
-                            if stats.get("placeholder")
-                            else ""
-                        )
-                    )
-
-                except Exception as exc:
+                if entry["status"] != "ok":
                     error_count += 1
-                    base = {
-                        "status": "error",
-                        "source_type": ref.kind if ref else "unknown",
-                        "source_ids": list(ref.ids) if ref else [],
-                        "description": row.description,
-                        "error": str(exc),
-                    }
-                    manifest[row.cote] = base
                     self.stdout.write(
                         self.style.ERROR(
-                            f"{row.cote:<6} ERREUR : {exc}"
+                            f"{row.cote:<6} ERREUR : {entry['error']}"
                         )
                     )
+                    continue
+
+                self.stdout.write(
+                    f"{row.cote:<6} "
+                    f"-> {entry['source_type']}:"
+                    f"{','.join(entry['source_ids']):<14} "
+                    f"{entry['page_count']:>3} p."
+                    + (
+                        "  [placeholder]"
+                        if entry.get("placeholder")
+                        else ""
+                    )
+                    + (
+                        "  [cache]"
+                        if cached
+                        else ""
+                    )
+                )
 
             # Résumé global d'intégrité.
             cote_entries = [
@@ -479,6 +558,17 @@ class Command(BaseCommand):
                     backup_dir
                 )
 
+            # Jeu complet réussi : le cache ne garde que les rendus courants.
+            if cache_dir and not only:
+                render_cache.prune(
+                    {
+                        v["fingerprint"]
+                        for k, v in manifest.items()
+                        if k != "_summary" and v.get("fingerprint")
+                    },
+                    cache_dir,
+                )
+
         except Exception as exc:
             if staging_dir.exists() and not isinstance(exc, CommandError):
                 shutil.rmtree(
@@ -490,6 +580,68 @@ class Command(BaseCommand):
         self.stdout.write(
             self.style.SUCCESS(
                 "PDF générés dans : "
-                f"{output_dir}"
+                f"{output_dir} "
+                f"({len(rows) - cached_count} rendue(s), "
+                f"{cached_count} depuis le cache)"
             )
         )
+
+    def _render_rows(
+        self,
+        rows,
+        staging_dir: Path,
+        jobs: int,
+        cache_dir: Path | None,
+    ):
+        """
+        Rend les cotes et produit leurs entrées de manifeste dans l'ordre
+        des lignes. Avec --jobs > 1, chaque rendu s'exécute dans un
+        processus « spawn » (connexion DB et état PyMuPDF propres).
+
+        Les sources sont chargées en bloc dans ce processus puis transmises
+        aux rendus (objets sérialisés avec leurs relations préchargées).
+        """
+
+        sources = load_sources(rows)
+
+        if jobs == 1:
+            for row in rows:
+                yield render_row(
+                    row,
+                    staging_dir,
+                    cache_dir,
+                    sources.get(row.cote),
+                )
+
+            return
+
+        with ProcessPoolExecutor(
+            max_workers=jobs,
+            mp_context=multiprocessing.get_context(
+                "spawn"
+            ),
+            initializer=init_worker,
+        ) as pool:
+            futures = [
+                pool.submit(
+                    render_row,
+                    row,
+                    staging_dir,
+                    cache_dir,
+                    sources.get(row.cote),
+                )
+                for row in rows
+            ]
+
+            for row, future in zip(
+                rows, futures
+            ):
+                try:
+                    yield future.result()
+
+                except Exception as exc:
+                    # Processus du pool perdu (ex. mémoire) : la cote
+                    # est signalée en erreur comme un échec de rendu.
+                    yield _error_entry(
+                        row, None, exc
+                    )
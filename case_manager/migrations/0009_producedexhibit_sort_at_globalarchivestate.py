@@ -0,0 +1,28 @@
+# Generated by Django 5.2.4 on 2026-10-17 01:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('case_manager', '0008_producedexhibit_public_url'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='producedexhibit',
+            name='sort_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='GlobalArchiveState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('watermarks', models.JSONField(blank=True, default=dict, help_text='Model label -> last seen timestamp (ISO) or pk.')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('case', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='archive_state', to='case_manager.legalcase')),
+            ],
+        ),
+    ]
@@ -116,6 +116,10 @@ class ProducedExhibit(models.Model):
     content_type = models.ForeignKey(ContentType, on_delete=models.SET_NULL, null=True)
     object_id = models.PositiveIntegerField(null=True)
     content_object = GenericForeignKey('content_type', 'object_id')
+
+    # Sort instant of the parent exhibit (children share it). Only set for the
+    # master archive, whose timeline is maintained incrementally from it.
+    sort_at = models.DateTimeField(null=True, blank=True, db_index=True)
     
     # Metadata
     created_at = models.DateTimeField(auto_now_add=True)
@@ -126,3 +130,16 @@ class ProducedExhibit(models.Model):
 
     def __str__(self):
         return f"{self.label} - {self.date_display}"
+
+
+class GlobalArchiveState(models.Model):
+    """
+    High-water marks of the master archive: the latest change seen per
+    evidence model when its ProducedExhibit rows were last brought up to date.
+    """
+    case = models.OneToOneField(LegalCase, on_delete=models.CASCADE, related_name='archive_state')
+    watermarks = models.JSONField(default=dict, blank=True, help_text="Model label -> last seen timestamp (ISO) or pk.")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Archive state of {self.case}"
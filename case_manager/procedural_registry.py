@@ -2,7 +2,8 @@
 
 This stage deliberately remains a proposal: it reads the provisional bordereau,
 historic aliases and pleading placeholders, but does not edit the pleading or
-write exhibit numbers to Django.
+write exhibit numbers to Django.  A JSON snapshot of the last report lets a
+run reuse every section whose inputs are unchanged and report what moved.
 """
 
 from __future__ import annotations
@@ -10,14 +11,17 @@ from __future__ import annotations
 import csv
 import hashlib
 import json
+import os
 import re
 import unicodedata
 from collections import defaultdict
+from itertools import chain
 from pathlib import Path
 from typing import Iterator
 
 from case_manager.evidence_audit import (
     MODEL_CLASSES,
+    DescriptivePieceIndex,
     ReferenceOccurrence,
     _object_date,
     _object_title,
@@ -25,6 +29,7 @@ from case_manager.evidence_audit import (
     object_original_status,
     resolve_descriptive_piece_occurrences,
 )
+from case_manager.table_readers import find_header, iter_csv_rows, iter_xlsx_rows
 
 
 PLACEHOLDER_PATTERN = re.compile(r"P-\[([^\]]+)\]")
@@ -79,7 +84,7 @@ def parse_bordereau(path: Path) -> list[dict]:
     return rows
 
 
-def resolve_reference_text(text: str, legal_dir: Path, source: str) -> list[ReferenceOccurrence]:
+def reference_occurrences(text: str, source: str) -> list[ReferenceOccurrence]:
     occurrences = extract_references_from_text(
         text,
         source_file=source,
@@ -98,13 +103,23 @@ def resolve_reference_text(text: str, legal_dir: Path, source: str) -> list[Refe
                 context=text,
             )
         )
-    return resolve_descriptive_piece_occurrences(occurrences, legal_dir)
+    return occurrences
+
+
+def resolve_reference_text(
+    text: str,
+    legal_dir: Path,
+    source: str,
+    index: DescriptivePieceIndex | None = None,
+) -> list[ReferenceOccurrence]:
+    return resolve_descriptive_piece_occurrences(reference_occurrences(text, source), legal_dir, index)
 
 
 def build_proposed_registry(
     bordereau_rows: list[dict],
     audit: dict,
     legal_dir: Path,
+    index: DescriptivePieceIndex | None = None,
 ) -> tuple[list[dict], list[dict], list[dict]]:
     audit_by_key = {row["canonical_key"]: row for row in audit["canonical"]}
     missing_audit_keys: dict[str, dict] = {}
@@ -112,12 +127,16 @@ def build_proposed_registry(
     component_rows: list[dict] = []
     cotes_by_key: dict[str, set[str]] = defaultdict(set)
 
-    for bordereau_row in bordereau_rows:
-        occurrences = resolve_reference_text(
-            bordereau_row["support_reference"],
-            legal_dir,
-            "bordereau_pieces.md",
-        )
+    # Every row's descriptive pieces are resolved in one batch.
+    index = index or DescriptivePieceIndex()
+    row_occurrences = [
+        reference_occurrences(bordereau_row["support_reference"], "bordereau_pieces.md")
+        for bordereau_row in bordereau_rows
+    ]
+    index.prepare(chain.from_iterable(row_occurrences), legal_dir)
+
+    for bordereau_row, occurrences in zip(bordereau_rows, row_occurrences):
+        occurrences = resolve_descriptive_piece_occurrences(occurrences, legal_dir, index)
         canonical_keys = sorted(
             {
                 occurrence.canonical_key
@@ -206,6 +225,15 @@ def _cote_sort_key(value: str) -> tuple[int, str]:
     return (int(match.group()) if match else 10**9, value)
 
 
+EXACT_REFERENCE_HEADER = "reference interne exacte"
+ALIAS_HEADER = "cote ou alias mentionne"
+
+
+def _union_header(cells: list[str]) -> list[str] | None:
+    header = find_header(cells, EXACT_REFERENCE_HEADER, _normalized)
+    return header if header is not None and ALIAS_HEADER in header else None
+
+
 def _iter_markdown_union_rows(path: Path) -> Iterator[dict]:
     header: list[str] | None = None
     for line_number, line in enumerate(path.read_text(encoding="utf-8").splitlines(), 1):
@@ -213,9 +241,9 @@ def _iter_markdown_union_rows(path: Path) -> Iterator[dict]:
             header = None
             continue
         cells = _markdown_cells(line)
-        normalized = [_normalized(cell) for cell in cells]
-        if "reference interne exacte" in normalized and "cote ou alias mentionne" in normalized:
-            header = normalized
+        row_header = _union_header(cells)
+        if row_header is not None:
+            header = row_header
             continue
         if header is None or all(re.fullmatch(r":?-{2,}:?", cell) for cell in cells if cell):
             continue
@@ -224,63 +252,59 @@ def _iter_markdown_union_rows(path: Path) -> Iterator[dict]:
         yield {
             "source_file": path.name,
             "source_location": f"line:{line_number}",
-            "exact_reference": cells[header.index("reference interne exacte")],
-            "alias_text": cells[header.index("cote ou alias mentionne")],
+            "exact_reference": cells[header.index(EXACT_REFERENCE_HEADER)],
+            "alias_text": cells[header.index(ALIAS_HEADER)],
         }
 
 
 def _iter_csv_union_rows(path: Path) -> Iterator[dict]:
-    with path.open("r", encoding="utf-8-sig", newline="") as handle:
-        reader = csv.reader(handle)
-        header: list[str] | None = None
-        for row_number, cells in enumerate(reader, 1):
-            normalized = [_normalized(cell) for cell in cells]
-            if "reference interne exacte" in normalized and "cote ou alias mentionne" in normalized:
-                header = normalized
-                continue
-            if header is None:
-                continue
-            if len(cells) <= max(header.index("reference interne exacte"), header.index("cote ou alias mentionne")):
-                continue
-            yield {
-                "source_file": path.name,
-                "source_location": f"row:{row_number}",
-                "exact_reference": cells[header.index("reference interne exacte")],
-                "alias_text": cells[header.index("cote ou alias mentionne")],
-            }
+    columns: tuple[int, int] | None = None
+    for row_number, cells in iter_csv_rows(path):
+        header = _union_header(cells)
+        if header is not None:
+            columns = header.index(EXACT_REFERENCE_HEADER), header.index(ALIAS_HEADER)
+            continue
+        if columns is None or len(cells) <= max(columns):
+            continue
+        yield {
+            "source_file": path.name,
+            "source_location": f"row:{row_number}",
+            "exact_reference": cells[columns[0]],
+            "alias_text": cells[columns[1]],
+        }
 
 
 def _iter_xlsx_union_rows(path: Path) -> Iterator[dict]:
-    from openpyxl import load_workbook
-
-    workbook = load_workbook(path, read_only=True, data_only=True)
-    try:
-        for worksheet in workbook.worksheets:
-            header: list[str] | None = None
-            for row_number, row in enumerate(worksheet.iter_rows(values_only=True), 1):
-                cells = [_plain(cell) for cell in row]
-                normalized = [_normalized(cell) for cell in cells]
-                if "reference interne exacte" in normalized and "cote ou alias mentionne" in normalized:
-                    header = normalized
-                    continue
-                if header is None:
-                    continue
-                exact_index = header.index("reference interne exacte")
-                alias_index = header.index("cote ou alias mentionne")
-                if max(exact_index, alias_index) >= len(cells) or not cells[exact_index]:
-                    continue
-                yield {
-                    "source_file": path.name,
-                    "source_location": f"sheet:{worksheet.title};row:{row_number}",
-                    "exact_reference": cells[exact_index],
-                    "alias_text": cells[alias_index],
-                }
-    finally:
-        workbook.close()
+    sheet_title: str | None = None
+    columns: tuple[int, int] | None = None
+    for title, row_number, cells in iter_xlsx_rows(path):
+        if title != sheet_title:
+            sheet_title, columns = title, None
+        header = _union_header(cells)
+        if header is not None:
+            columns = header.index(EXACT_REFERENCE_HEADER), header.index(ALIAS_HEADER)
+            continue
+        if columns is None or max(columns) >= len(cells):
+            continue
+        # Only the two projected columns of a data row are normalized.
+        exact_reference = _plain(cells[columns[0]])
+        if not exact_reference:
+            continue
+        yield {
+            "source_file": path.name,
+            "source_location": f"sheet:{title};row:{row_number}",
+            "exact_reference": exact_reference,
+            "alias_text": _plain(cells[columns[1]]),
+        }
 
 
-def collect_historic_alias_mappings(input_dir: Path, legal_dir: Path) -> list[dict]:
+def collect_historic_alias_mappings(
+    input_dir: Path,
+    legal_dir: Path,
+    index: DescriptivePieceIndex | None = None,
+) -> list[dict]:
     candidates: dict[str, dict[str, set[str]]] = defaultdict(lambda: {"keys": set(), "sources": set()})
+    aliased_rows: list[tuple[dict, list[str], list[ReferenceOccurrence]]] = []
     for path in sorted(input_dir.iterdir()):
         if not path.is_file():
             continue
@@ -296,12 +320,18 @@ def collect_historic_alias_mappings(input_dir: Path, legal_dir: Path) -> list[di
             aliases = sorted(set(PROCEDURAL_ALIAS_PATTERN.findall(row["alias_text"])), key=_cote_sort_key)
             if not aliases:
                 continue
-            occurrences = resolve_reference_text(row["exact_reference"], legal_dir, row["source_file"])
-            keys = {occurrence.canonical_key for occurrence in occurrences if occurrence.canonical_key}
-            for alias in aliases:
-                normalized_alias = alias.upper()
-                candidates[normalized_alias]["keys"].update(keys)
-                candidates[normalized_alias]["sources"].add(f"{row['source_file']}:{row['source_location']}")
+            aliased_rows.append((row, aliases, reference_occurrences(row["exact_reference"], row["source_file"])))
+
+    # Descriptive pieces cited by every input file are resolved in one batch.
+    index = index or DescriptivePieceIndex()
+    index.prepare(chain.from_iterable(occurrences for _, _, occurrences in aliased_rows), legal_dir)
+    for row, aliases, occurrences in aliased_rows:
+        occurrences = resolve_descriptive_piece_occurrences(occurrences, legal_dir, index)
+        keys = {occurrence.canonical_key for occurrence in occurrences if occurrence.canonical_key}
+        for alias in aliases:
+            normalized_alias = alias.upper()
+            candidates[normalized_alias]["keys"].update(keys)
+            candidates[normalized_alias]["sources"].add(f"{row['source_file']}:{row['source_location']}")
 
     rows = []
     for alias, data in sorted(candidates.items(), key=lambda item: _cote_sort_key(item[0])):
@@ -526,3 +556,124 @@ def reports_digest(paths: list[Path]) -> str:
         digest.update(path.name.encode("utf-8"))
         digest.update(path.read_bytes())
     return digest.hexdigest()
+
+
+SNAPSHOT_VERSION = 1
+
+# Report keys produced by each recomputable section of the registry.
+SNAPSHOT_SECTIONS = {
+    "registry": ("registry", "components", "conflicts"),
+    "historic_aliases": ("historic_aliases",),
+    "collective_expansions": ("collective_expansions",),
+    "pleading_placeholders": ("pleading_placeholders",),
+}
+
+# Sections that also query the database (object status, media paths of
+# descriptive pieces), which their digests do not cover.
+DATABASE_SECTIONS = frozenset({"registry", "historic_aliases"})
+
+# Fields identifying a row of each report list in a snapshot diff.
+REPORT_ROW_KEYS = {
+    "registry": ("proposed_cote",),
+    "components": ("proposed_cote", "component_order"),
+    "conflicts": ("canonical_key",),
+    "historic_aliases": ("historic_alias",),
+    "collective_expansions": ("collective_reference", "candidate_pk"),
+    "pleading_placeholders": ("line", "occurrence_in_line"),
+}
+
+
+def _files_digest(paths) -> str:
+    digest = hashlib.sha256()
+    for path in sorted(paths, key=lambda item: item.name):
+        digest.update(path.name.encode("utf-8") + b"\0")
+        digest.update(hashlib.sha256(path.read_bytes()).digest())
+    return digest.hexdigest()
+
+
+def registry_input_digests(*, audit_path: Path, bordereau_path: Path, pleading_path: Path, input_dir: Path) -> dict[str, str]:
+    """Digest of the inputs of each snapshot section.
+
+    The code of this module, ``evidence_audit`` and ``table_readers`` is part of
+    every digest.  Database state is not: the audit JSON stands in for it, and
+    ``DATABASE_SECTIONS`` are recomputed whenever the database may have changed.
+    """
+    legal_dir = bordereau_path.parent
+    code = _files_digest(Path(__file__).with_name(name) for name in ("procedural_registry.py", "evidence_audit.py", "table_readers.py"))
+    audit = _files_digest([audit_path])
+    pieces = _files_digest(legal_dir.glob("piece_*.md"))
+    inputs = _files_digest(
+        path for path in input_dir.iterdir() if path.is_file() and path.suffix.casefold() in {".md", ".csv", ".xlsx"}
+    )
+    parts = {
+        "registry": (code, audit, _files_digest([bordereau_path]), pieces),
+        "historic_aliases": (code, inputs, pieces),
+        "collective_expansions": (code, audit),
+        "pleading_placeholders": (code, _files_digest([pleading_path])),
+    }
+    return {section: hashlib.sha256("\0".join(values).encode("ascii")).hexdigest() for section, values in parts.items()}
+
+
+def load_registry_snapshot(path: Path) -> dict | None:
+    try:
+        snapshot = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        return None
+    return snapshot
+
+
+def reusable_sections(snapshot: dict | None, digests: dict[str, str], *, database: bool = True) -> dict[str, dict]:
+    """Report keys of the snapshot sections whose inputs are unchanged.
+
+    With ``database=False`` the ``DATABASE_SECTIONS`` are never reused.
+    """
+    if not snapshot:
+        return {}
+    previous = snapshot.get("digests", {})
+    return {
+        section: {key: snapshot["report"][key] for key in keys}
+        for section, keys in SNAPSHOT_SECTIONS.items()
+        if previous.get(section) == digests[section] and (database or section not in DATABASE_SECTIONS)
+    }
+
+
+def write_registry_snapshot(path: Path, digests: dict[str, str], report: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(f"{path.name}.{os.getpid()}.part")
+    partial.write_text(
+        json.dumps({"version": SNAPSHOT_VERSION, "digests": digests, "report": report}, ensure_ascii=False),
+        encoding="utf-8",
+    )
+    os.replace(partial, path)
+
+
+def _rows_by_key(rows: list[dict], fields: tuple[str, ...]) -> dict[str, list[dict]]:
+    grouped: dict[str, list[dict]] = defaultdict(list)
+    for row in rows:
+        grouped[" / ".join(str(row.get(field, "")) for field in fields)].append(row)
+    return grouped
+
+
+def diff_registry_reports(previous: dict, current: dict) -> dict:
+    """Added, removed and changed row keys per report list, plus summary deltas."""
+    diff: dict = {}
+    for name, fields in REPORT_ROW_KEYS.items():
+        before = _rows_by_key(previous.get(name, []), fields)
+        after = _rows_by_key(current.get(name, []), fields)
+        changes = {
+            "added": sorted(after.keys() - before.keys()),
+            "removed": sorted(before.keys() - after.keys()),
+            "changed": sorted(key for key in after.keys() & before.keys() if after[key] != before[key]),
+        }
+        if any(changes.values()):
+            diff[name] = changes
+    summary = {
+        key: [previous.get("summary", {}).get(key), value]
+        for key, value in current["summary"].items()
+        if previous.get("summary", {}).get(key) != value
+    }
+    if summary:
+        diff["summary"] = summary
+    return diff
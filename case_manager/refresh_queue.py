@@ -0,0 +1,126 @@
+# case_manager/refresh_queue.py
+"""
+Deferred, coalesced exhibit registry maintenance.
+
+m2m signals only mark registry keys of a case as dirty. All marks made
+during one transaction are merged and, once it commits, handed to a single
+background worker that reconciles each dirty case once. A bulk
+`narrative.evenements.set(...)` (post_remove + post_add) therefore costs one
+registry update, run after the response has been sent.
+
+Set EXHIBIT_REFRESH_ASYNC = False to run the update synchronously on commit
+(scripts, tests).
+"""
+import atexit
+import logging
+import queue
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+
+from .exhibit_service import reconcile_exhibit_keys
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+_queue = queue.Queue()
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def _current_batch():
+    """
+    Dirty keys of the current transaction, bound to the outermost atomic block.
+
+    The Atomic object of a `@transaction.atomic` decorator is reused from one
+    call to the next, so keys marked in a rolled-back transaction can be
+    flushed with the next transaction it opens. This is harmless:
+    reconcile_exhibit_keys re-checks every key against the narratives, and a
+    key that is no longer dirty is left as is.
+    """
+    owner = connection.atomic_blocks[0] if connection.in_atomic_block else None
+    batch = getattr(_local, 'batch', None)
+    if batch is None or owner is None or batch['owner'] is not owner:
+        batch = {'owner': owner, 'cases': defaultdict(set), 'flushed': False}
+        _local.batch = batch
+    return batch
+
+
+def mark_case_dirty(case_id, keys):
+    """Schedules a reconcile of ``keys`` for the case once the transaction commits."""
+    if not keys:
+        return
+    batch = _current_batch()
+    batch['cases'][case_id].update(keys)
+    # Registered on every mark: a callback registered inside a savepoint that
+    # rolls back is discarded, and _flush runs only once per batch anyway.
+    transaction.on_commit(lambda: _flush(batch))
+
+
+def _flush(batch):
+    if batch['flushed']:
+        return
+    batch['flushed'] = True
+    if getattr(_local, 'batch', None) is batch:
+        _local.batch = None
+    cases = dict(batch['cases'])
+    if not cases:
+        return
+    if getattr(settings, 'EXHIBIT_REFRESH_ASYNC', True):
+        _ensure_worker()
+        _queue.put(cases)
+    else:
+        _run(cases)
+
+
+def _run(cases):
+    for case_id, keys in cases.items():
+        created, deleted = reconcile_exhibit_keys(case_id, keys)
+        logger.info("Exhibits of Case %s updated: +%s / -%s", case_id, created, deleted)
+
+
+def _worker_loop():
+    while True:
+        cases = defaultdict(set)
+        jobs = [_queue.get()]
+        # Coalesce everything already waiting: one reconcile per case.
+        while True:
+            try:
+                jobs.append(_queue.get_nowait())
+            except queue.Empty:
+                break
+        for job in jobs:
+            for case_id, keys in job.items():
+                cases[case_id].update(keys)
+        try:
+            close_old_connections()
+            _run(cases)
+        except Exception:
+            logger.exception(
+                "Exhibit registry update failed for cases %s; "
+                "run `manage.py reconcile_case_exhibits` to repair.", sorted(cases)
+            )
+        finally:
+            close_old_connections()
+            for _ in jobs:
+                _queue.task_done()
+
+
+def _ensure_worker():
+    global _worker
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_worker_loop, name="exhibit-refresh", daemon=True)
+            _worker.start()
+
+
+def wait_for_pending_refreshes():
+    """Blocks until every queued registry update has been applied."""
+    _queue.join()
+
+
+# The worker is a daemon thread: let short-lived processes (shell, commands)
+# finish queued updates before exiting.
+atexit.register(wait_for_pending_refreshes)
@@ -5,13 +5,19 @@ Logic has been decomposed into specialized modules for maintainability.
 """
 
 from .exhibit_service import (
+    EVIDENCE_FIELDS,
     refresh_case_exhibits,
+    reconcile_exhibit_keys,
+    case_evidence_keys,
+    evidence_keys_for_linked,
+    evidence_keys_for_narratives,
     get_datetime_for_sorting,
     rebuild_produced_exhibits,
 )
 
 from .archive_service import (
     rebuild_global_exhibits,
+    sync_global_exhibits,
     get_item_metadata,
     get_sort_date,
 )
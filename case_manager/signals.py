@@ -2,33 +2,53 @@ from django.db.models.signals import m2m_changed
 from django.dispatch import receiver
 from argument_manager.models import TrameNarrative
 from case_manager.models import PerjuryContestation
-from case_manager.services import refresh_case_exhibits
+from case_manager.services import (
+    EVIDENCE_FIELDS,
+    evidence_keys_for_linked,
+    evidence_keys_for_narratives,
+)
+from case_manager.refresh_queue import mark_case_dirty
 import sys
 
-# List of ManyToMany fields in TrameNarrative that constitute "Evidence"
-EVIDENCE_FIELDS = [
-    'evenements',
-    'citations_courriel',
-    'citations_pdf',
-    'photo_documents',
-    'source_statements',
-    'citations_chat',
-]
-
-def trigger_case_refresh(narrative):
+# Through model -> TrameNarrative evidence field name
+EVIDENCE_THROUGH_FIELDS = {
+    getattr(TrameNarrative, field_name).through: field_name
+    for field_name in EVIDENCE_FIELDS
+}
+
+
+def _stash_cleared_pks(sender, m2m_field, instance, reverse):
     """
-    Finds all LegalCases linked to this narrative (via PerjuryContestation)
-    and refreshes their exhibits.
+    post_clear carries no pk_set: remember what is about to be cleared so the
+    delta can still be computed once the rows are gone.
     """
-    # Find all contestations that use this narrative
-    linked_contestations = narrative.supported_contestations.all()
-    
-    # Get unique cases from these contestations
-    cases_to_refresh = set(c.case for c in linked_contestations)
-    
-    for case in cases_to_refresh:
-        print(f"Signal: Refreshing exhibits for Case {case.id} due to update in Narrative {narrative.id}")
-        refresh_case_exhibits(case.id)
+    source_column = m2m_field.m2m_reverse_field_name() if reverse else m2m_field.m2m_field_name()
+    target_column = m2m_field.m2m_field_name() if reverse else m2m_field.m2m_reverse_field_name()
+    pks = set(
+        sender.objects.filter(**{source_column: instance.pk}).values_list(target_column, flat=True)
+    )
+    instance.__dict__.setdefault('_m2m_cleared_pks', {})[sender] = pks
+
+
+def _changed_pks(sender, instance, action, pk_set):
+    if action == "post_clear":
+        return instance.__dict__.get('_m2m_cleared_pks', {}).pop(sender, set())
+    return set(pk_set or ())
+
+
+def _cases_for_narratives(narrative_ids):
+    return set(
+        PerjuryContestation.objects.filter(supporting_narratives__in=narrative_ids)
+        .values_list('case_id', flat=True)
+        .distinct()
+    )
+
+
+def _mark_cases(case_ids, keys):
+    # Registry updates are coalesced per transaction and applied after commit.
+    for case_id in case_ids:
+        mark_case_dirty(case_id, keys)
+
 
 @receiver(m2m_changed, sender=TrameNarrative.evenements.through)
 @receiver(m2m_changed, sender=TrameNarrative.citations_courriel.through)
@@ -36,21 +56,41 @@ def trigger_case_refresh(narrative):
 @receiver(m2m_changed, sender=TrameNarrative.photo_documents.through)
 @receiver(m2m_changed, sender=TrameNarrative.source_statements.through)
 @receiver(m2m_changed, sender=TrameNarrative.citations_chat.through)
-def evidence_changed(sender, instance, action, **kwargs):
+def evidence_changed(sender, instance, action, reverse, pk_set, **kwargs):
     """
     Triggered when evidence is added/removed from a TrameNarrative.
+    Only the registry entries implied by the changed pk_set are touched.
     """
     # Prevent signal execution during loaddata
     if 'loaddata' in sys.argv:
         return
 
+    if action == "pre_clear":
+        field = TrameNarrative._meta.get_field(EVIDENCE_THROUGH_FIELDS[sender])
+        _stash_cleared_pks(sender, field, instance, reverse)
+        return
+
     # We only care about actions that change the DB content
-    if action in ["post_add", "post_remove", "post_clear"]:
+    if action not in ["post_add", "post_remove", "post_clear"]:
+        return
+
+    pks = _changed_pks(sender, instance, action, pk_set)
+    if reverse:
+        # 'instance' is the evidence object, pks are narratives
+        narrative_ids, evidence_pks = pks, {instance.pk}
+    else:
         # 'instance' is the TrameNarrative object being modified
-        trigger_case_refresh(instance)
+        narrative_ids, evidence_pks = {instance.pk}, pks
+    if not narrative_ids or not evidence_pks:
+        return
+
+    field_name = EVIDENCE_THROUGH_FIELDS[sender]
+    keys = evidence_keys_for_linked(field_name, evidence_pks)
+    _mark_cases(_cases_for_narratives(narrative_ids), keys)
+
 
 @receiver(m2m_changed, sender=PerjuryContestation.supporting_narratives.through)
-def narrative_link_changed(sender, instance, action, **kwargs):
+def narrative_link_changed(sender, instance, action, reverse, pk_set, **kwargs):
     """
     Triggered when a TrameNarrative is linked/unlinked to a PerjuryContestation.
     """
@@ -58,11 +98,27 @@ def narrative_link_changed(sender, instance, action, **kwargs):
     if 'loaddata' in sys.argv:
         return
 
-    if action in ["post_add", "post_remove", "post_clear"]:
-        # In this specific m2m relation:
-        # If instance is PerjuryContestation, we refresh its case.
-        if isinstance(instance, PerjuryContestation):
-            refresh_case_exhibits(instance.case.id)
-        # If instance is TrameNarrative (reverse relation), we use the helper
-        elif isinstance(instance, TrameNarrative):
-            trigger_case_refresh(instance)
+    if action == "pre_clear":
+        field = PerjuryContestation._meta.get_field('supporting_narratives')
+        _stash_cleared_pks(sender, field, instance, reverse)
+        return
+
+    if action not in ["post_add", "post_remove", "post_clear"]:
+        return
+
+    pks = _changed_pks(sender, instance, action, pk_set)
+    if not pks:
+        return
+
+    # If instance is PerjuryContestation, pks are narratives of its case.
+    if isinstance(instance, PerjuryContestation):
+        case_ids, narrative_ids = {instance.case_id}, pks
+    # If instance is TrameNarrative (reverse relation), pks are contestations.
+    else:
+        case_ids = set(
+            PerjuryContestation.objects.filter(pk__in=pks).values_list('case_id', flat=True)
+        )
+        narrative_ids = {instance.pk}
+
+    keys = evidence_keys_for_narratives(narrative_ids)
+    _mark_cases(case_ids, keys)
@@ -0,0 +1,59 @@
+"""Streaming readers for the CSV and XLSX tables of the evidence corpus.
+
+Rows are yielded one at a time as lists of strings, so neither the audit nor
+the registry ever holds a whole annex in memory.  Header rows are located
+with ``find_header``, which only normalizes the cells of rows that can name
+the « Référence interne exacte » column; callers then read just the columns
+they need from the other rows.
+"""
+
+from __future__ import annotations
+
+import csv
+import re
+from pathlib import Path
+from typing import Callable, Iterator
+
+
+CSV_BUFFER_SIZE = 1024 * 1024
+
+# Characters that normalize (accents stripped, casefolded) to the « x » of
+# « exacte ».  A cell without one cannot be the reference column header.
+_HEADER_HINT = re.compile("[xXẊẋẌẍ]")
+
+
+def iter_csv_rows(path: Path) -> Iterator[tuple[int, list[str]]]:
+    """``(row_number, cells)`` of a UTF-8 CSV file, read through a buffered handle."""
+    with path.open("r", encoding="utf-8-sig", newline="", buffering=CSV_BUFFER_SIZE) as handle:
+        yield from enumerate(csv.reader(handle), 1)
+
+
+def iter_xlsx_rows(path: Path) -> Iterator[tuple[str, int, list[str]]]:
+    """``(sheet_title, row_number, cells)`` of every worksheet, streamed in read-only mode.
+
+    Cell values are converted with ``str(value or "")``; empty cells become ``""``.
+    """
+    try:
+        from openpyxl import load_workbook
+    except ImportError as exc:  # pragma: no cover - environment guard
+        raise RuntimeError("openpyxl is required to read XLSX annexes") from exc
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        for worksheet in workbook.worksheets:
+            for row_number, row in enumerate(worksheet.iter_rows(values_only=True), 1):
+                yield worksheet.title, row_number, [str(value) if value else "" for value in row]
+    finally:
+        workbook.close()
+
+
+def find_header(cells: list[str], label: str, normalize: Callable[[str], str]) -> list[str] | None:
+    """Normalized cells of a header row naming ``label``, else ``None``.
+
+    ``label`` must contain an « x » and ``normalize`` may only strip accents,
+    casefold and collapse whitespace: cells without a ``_HEADER_HINT``
+    character are then skipped until the label is found.
+    """
+    if not any(_HEADER_HINT.search(cell) and normalize(cell) == label for cell in cells):
+        return None
+    return [normalize(cell) for cell in cells]
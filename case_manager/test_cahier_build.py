@@ -0,0 +1,282 @@
+import shutil
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+import fitz
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase
+
+from case_manager.management.commands import build_cahier_pieces
+from case_manager.management.commands.build_cahier_pieces import (
+    BUILD_STATE_FILENAME,
+    CAHIER_FILENAME,
+    ExhibitEntry,
+    plan_incremental_build,
+    remove_page_number,
+    stamp_page_numbers,
+)
+
+
+def write_piece(path, cote, pages, version=1):
+    doc = fitz.open()
+    for number in range(pages):
+        page = doc.new_page(width=612, height=792)
+        page.insert_text((72, 72), f"{cote} page {number + 1} version {version}")
+    doc.save(str(path))
+    doc.close()
+
+
+class CahierBuildTestCase(SimpleTestCase):
+    """
+    Exécute build_cahier_pieces dans un répertoire temporaire : les pièces
+    sont des PDF générés, décrits par self.pieces (cote -> nombre de pages).
+    """
+
+    def setUp(self):
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = Path(directory.name)
+        self.pieces: dict[str, int] = {}
+
+        # Pièces minuscules : les pages liminaires réinsérées à chaque
+        # construction doubleraient vite le cahier.
+        for name, value in {
+            "COMPACT_GROWTH_RATIO": 100,
+            "OUTPUT_DIR": self.root / "cahier_pieces",
+            "STAGING_DIR": self.root / ".cahier_pieces_build",
+            "BACKUP_DIR": self.root / ".cahier_pieces_backup",
+            "load_exhibit_entries": self.entries,
+        }.items():
+            patcher = mock.patch.object(build_cahier_pieces, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def entries(self):
+        return [
+            ExhibitEntry(
+                cote=cote,
+                description=f"Pièce {cote}",
+                pdf_path=self.root / f"{cote}.pdf",
+                page_count=pages,
+                placeholder=False,
+                source_type="document",
+                source_ids=[cote],
+            )
+            for cote, pages in self.pieces.items()
+        ]
+
+    def set_piece(self, cote, pages, version=1):
+        self.pieces[cote] = pages
+        write_piece(self.root / f"{cote}.pdf", cote, pages, version)
+
+    def build(self, *args):
+        out = StringIO()
+        call_command(build_cahier_pieces.Command(), *args, stdout=out)
+        return out.getvalue()
+
+    def cahier_pages(self):
+        with fitz.open(str(self.root / "cahier_pieces" / CAHIER_FILENAME)) as doc:
+            return [page.get_text() for page in doc], doc.get_toc()
+
+    def assertMatchesFullBuild(self, *args):
+        """
+        Compare le cahier courant à une construction complète, puis le
+        rétablit pour que la construction incrémentale suivante en parte.
+        """
+        output_dir = self.root / "cahier_pieces"
+        kept_dir = self.root / "incremental"
+        shutil.copytree(output_dir, kept_dir)
+        incremental = self.cahier_pages()
+        output = self.build(*args)
+        self.assertNotIn("Incrémental", output)
+        self.assertEqual(incremental, self.cahier_pages())
+        shutil.rmtree(output_dir)
+        kept_dir.rename(output_dir)
+
+
+class IncrementalBuildTests(CahierBuildTestCase):
+    def test_consecutive_incremental_runs_match_a_full_build(self):
+        self.set_piece("P-1", 2)
+        self.set_piece("P-2", 1)
+        self.set_piece("P-3", 3)
+        self.build()
+
+        # Pièce modifiée (le total change) et pièce ajoutée.
+        self.set_piece("P-2", 2, version=2)
+        self.set_piece("P-4", 1)
+        output = self.build("--incremental")
+        self.assertIn("Incrémental : 2 pièce(s) conservée(s)", output)
+        pages, toc = self.cahier_pages()
+        self.assertEqual(len(pages), 2 + 8)
+        self.assertIn("P-2 page 2 version 2", pages[5])
+        self.assertIn("Page 10 de 10", pages[9])
+        self.assertMatchesFullBuild()
+
+        # Seconde construction incrémentale, sur la précédente : pièce
+        # retirée en tête, toutes les pages conservées se décalent.
+        self.set_piece("P-3", 3, version=2)
+        del self.pieces["P-1"]
+        output = self.build("--incremental")
+        self.assertIn("Incrémental : 2 pièce(s) conservée(s)", output)
+        self.assertMatchesFullBuild()
+
+        # Rien n'a changé : seules les pages liminaires sont réinsérées.
+        output = self.build("--incremental")
+        self.assertIn("Incrémental : 3 pièce(s) conservée(s), 2 page(s) insérée(s), 0 page(s)", output)
+        self.assertMatchesFullBuild()
+
+    def test_two_incremental_runs_in_a_row(self):
+        self.set_piece("P-1", 1)
+        self.set_piece("P-2", 2)
+        self.set_piece("P-3", 1)
+        self.build()
+
+        del self.pieces["P-2"]
+        self.build("--incremental")
+        self.assertMatchesFullBuild()
+        self.set_piece("P-1", 3, version=2)
+        self.set_piece("P-5", 2)
+        output = self.build("--incremental")
+        self.assertIn("Incrémental : 1 pièce(s) conservée(s)", output)
+        pages, _ = self.cahier_pages()
+        self.assertEqual(pages[-1].count("Page "), 1)
+        self.assertMatchesFullBuild()
+
+    def test_unchanged_pieces_keep_their_page_numbers(self):
+        self.set_piece("P-1", 1)
+        self.set_piece("P-2", 2)
+        self.build()
+
+        self.set_piece("P-2", 2, version=2)
+        output = self.build("--incremental")
+        self.assertIn("4 page(s) insérée(s), 0 page(s) conservée(s) repaginée(s)", output)
+        self.assertMatchesFullBuild()
+
+    def test_corrupt_build_state_falls_back_to_a_full_build(self):
+        self.set_piece("P-1", 1)
+        self.build()
+        (self.root / "cahier_pieces" / BUILD_STATE_FILENAME).write_text('{"pieces": [', encoding="utf-8")
+
+        output = self.build("--incremental")
+        self.assertIn("Reconstruction complète : aucune construction précédente.", output)
+        self.assertMatchesFullBuild()
+
+    def test_toggled_pagination_falls_back_to_a_full_build(self):
+        self.set_piece("P-1", 2)
+        self.build()
+
+        output = self.build("--incremental", "--no-page-numbers")
+        self.assertIn("Reconstruction complète : option de pagination modifiée.", output)
+        pages, _ = self.cahier_pages()
+        self.assertNotIn("Page 1 de", "".join(pages))
+        self.assertMatchesFullBuild("--no-page-numbers")
+
+    def test_grown_cahier_is_compacted(self):
+        self.set_piece("P-1", 2)
+        self.build()
+
+        with mock.patch.object(build_cahier_pieces, "COMPACT_GROWTH_RATIO", 0.5):
+            output = self.build("--incremental")
+        self.assertIn("Reconstruction complète : compactage du cahier.", output)
+
+
+class PlanIncrementalBuildTests(CahierBuildTestCase):
+    def plan(self, state):
+        entries = self.entries()
+        signatures = {
+            entry.cote: {"sha256": f"{entry.cote}-v1"}
+            for entry in entries
+        }
+        return plan_incremental_build(state, entries, signatures, page_numbers=True)
+
+    def test_reordered_pieces_fall_back_to_a_full_build(self):
+        self.pieces = {"P-1": 1, "P-2": 1}
+        output_dir = self.root / "cahier_pieces"
+        output_dir.mkdir()
+        (output_dir / CAHIER_FILENAME).write_bytes(b"%PDF")
+        state = {
+            "page_numbers": True,
+            "compact_size": 4,
+            "pieces": [
+                {"cote": "P-2", "page_count": 1, "sha256": "P-2-v1"},
+                {"cote": "P-1", "page_count": 1, "sha256": "P-1-v1"},
+            ],
+        }
+
+        self.assertEqual(self.plan(state), (None, "ordre des pièces modifié"))
+        state["pieces"].reverse()
+        self.assertEqual(self.plan(state), ({"P-1", "P-2"}, ""))
+        state["pieces"][0]["page_count"] = 2
+        self.assertEqual(self.plan(state), ({"P-2"}, ""))
+
+
+class RemovePageNumberTests(SimpleTestCase):
+    def test_only_the_previous_stamp_is_removed(self):
+        doc = fitz.open()
+        for _ in range(3):
+            doc.new_page(width=612, height=792).insert_text((72, 72), "contenu")
+        stamp_page_numbers(doc)
+
+        remove_page_number(doc[1], old_index=1, old_total=3)
+        self.assertEqual(doc[1].get_text().split(), ["contenu"])
+        self.assertIn("Page 3 de 3", doc[2].get_text())
+
+        with self.assertRaisesMessage(CommandError, "Relancez sans --incremental"):
+            remove_page_number(doc[1], old_index=1, old_total=3)
+        with self.assertRaisesMessage(CommandError, "sur la page 3"):
+            remove_page_number(doc[2], old_index=2, old_total=4)
+
+
+class StreamingBuildTests(CahierBuildTestCase):
+    def setUp(self):
+        super().setUp()
+        self.set_piece("P-1", 2)
+        self.set_piece("P-2", 1)
+        self.set_piece("P-3", 3)
+
+    def test_segments_match_the_in_memory_build(self):
+        self.build()
+        in_memory = self.cahier_pages()
+
+        # Un segment par pièce.
+        with mock.patch.object(build_cahier_pieces, "SEGMENT_BYTES", 1):
+            output = self.build("--streaming")
+        self.assertIn("Écriture par segments : 4 segment(s)", output)
+        pages, toc = self.cahier_pages()
+        self.assertEqual((pages, toc), in_memory)
+        self.assertEqual(
+            [page.split("\n")[-2] for page in pages],
+            [f"Page {number} de 8" for number in range(1, 9)],
+        )
+
+    def test_memory_cap_flushes_a_segment(self):
+        # Pièce P-1 : au-delà du plafond, puis en deçà après l'écriture.
+        with mock.patch.object(
+            build_cahier_pieces,
+            "current_rss_mb",
+            side_effect=[150, 50, 50, 50],
+        ):
+            output = self.build("--max-memory", "100")
+        self.assertIn("Écriture par segments : 2 segment(s)", output)
+        self.assertMatchesFullBuild()
+
+    def test_memory_still_over_the_cap_aborts_the_build(self):
+        self.build()
+        previous = self.cahier_pages()
+
+        with mock.patch.object(build_cahier_pieces, "current_rss_mb", return_value=150):
+            with self.assertRaisesMessage(CommandError, "se terminant par P-1, au-delà de --max-memory (100 Mo)"):
+                self.build("--max-memory", "100")
+        self.assertEqual(self.cahier_pages(), previous)
+
+    def test_incremental_build_on_a_streamed_cahier(self):
+        with mock.patch.object(build_cahier_pieces, "SEGMENT_BYTES", 1):
+            self.build("--streaming")
+
+        self.set_piece("P-2", 2, version=2)
+        output = self.build("--incremental")
+        self.assertIn("Incrémental : 2 pièce(s) conservée(s)", output)
+        self.assertMatchesFullBuild()
@@ -0,0 +1,79 @@
+from io import BytesIO
+
+import docx
+from django.test import SimpleTestCase
+from docx.shared import Inches
+from PIL import Image
+
+from case_manager.docx_stream import StreamingDocx, anchor_link, heading, page_break, paragraph, run, table
+
+
+def png(size):
+    output = BytesIO()
+    Image.new('RGB', size, (10, 20, 30)).save(output, format='PNG')
+    return output.getvalue()
+
+
+def mpo(size):
+    output = BytesIO()
+    frames = [Image.new('RGB', size, (10, 20, 30)), Image.new('RGB', size, (0, 0, 0))]
+    frames[0].save(output, format='MPO', save_all=True, append_images=frames[1:])
+    return output.getvalue()
+
+
+class StreamingDocxTests(SimpleTestCase):
+    def stream(self, document, body):
+        chunks = list(document.stream(body))
+        self.assertGreater(len(chunks), 1)
+        return docx.Document(BytesIO(b''.join(chunks)))
+
+    def test_python_docx_reads_streamed_document(self):
+        document = StreamingDocx(left_margin=Inches(0.75), right_margin=Inches(0.75))
+        image = png((400, 200))
+
+        def body():
+            yield heading('Dénonciation: A & B', level=0)
+            yield paragraph(run('Ligne\x0c un\nligne deux', bold=True), style='ListBullet')
+            yield from table(
+                [[[paragraph(anchor_link('P-1', 'exhibit_1'))], [paragraph(document.picture('a.png', image, Inches(2)))]]],
+                [Inches(1), Inches(3)],
+                style='TableGrid',
+            )
+            yield page_break()
+            yield heading('Pièce P-1', level=1, bookmark=(1, 'exhibit_1'))
+            yield paragraph(document.picture('a.png', image, Inches(2)))
+
+        result = self.stream(document, body())
+
+        paragraphs = result.paragraphs
+        self.assertEqual(paragraphs[0].style.name, 'Title')
+        self.assertEqual(paragraphs[0].text, 'Dénonciation: A & B')
+        self.assertEqual(paragraphs[1].style.name, 'List Bullet')
+        self.assertEqual(paragraphs[1].text, 'Ligne un\nligne deux')
+        self.assertTrue(paragraphs[1].runs[0].bold)
+        self.assertEqual(paragraphs[3].style.name, 'Heading 1')
+        self.assertEqual(result.tables[0].style.name, 'Table Grid')
+        self.assertEqual(result.sections[0].left_margin, Inches(0.75))
+        self.assertEqual(len(result.inline_shapes), 2)
+        self.assertEqual(result.inline_shapes[0].height, Inches(1))
+        # A picture used twice is stored once.
+        self.assertEqual(len({rel.target_part for rel in result.part.rels.values() if 'image' in rel.reltype}), 1)
+
+    def test_multi_frame_smartphone_jpeg_is_embedded_as_jpeg(self):
+        document = StreamingDocx()
+        image = mpo((300, 150))
+        self.assertEqual(Image.open(BytesIO(image)).format, 'MPO')
+        result = self.stream(document, iter([paragraph(document.picture('photo.jpg', image, Inches(2)))]))
+        self.assertEqual(len(result.inline_shapes), 1)
+        self.assertEqual(result.inline_shapes[0].height, Inches(1))
+        [part] = [rel.target_part for rel in result.part.rels.values() if 'image' in rel.reltype]
+        self.assertEqual(part.content_type, 'image/jpeg')
+        self.assertEqual(part.blob, image)
+
+    def test_unreadable_picture_raises_before_anything_is_recorded(self):
+        document = StreamingDocx()
+        with self.assertRaises(Exception):
+            document.picture('broken.png', b'not an image', Inches(2))
+        result = self.stream(document, iter([paragraph(run('texte'))]))
+        self.assertEqual(result.paragraphs[0].text, 'texte')
+        self.assertEqual(len(result.inline_shapes), 0)
@@ -1,6 +1,18 @@
+import os
+import tempfile
+from pathlib import Path
+from unittest import mock
+
 from django.test import SimpleTestCase
 
-from case_manager.evidence_audit import _media_path_candidates, extract_references_from_text
+from case_manager import evidence_audit
+from case_manager.evidence_audit import (
+    DescriptivePieceIndex,
+    _media_path_candidates,
+    collect_occurrences,
+    extract_references_from_text,
+    resolve_descriptive_piece_occurrences,
+)
 
 
 class EvidenceReferenceExtractionTests(SimpleTestCase):
@@ -51,8 +63,154 @@ class EvidenceReferenceExtractionTests(SimpleTestCase):
         self.assertIsNone(occurrence.model)
         self.assertEqual(occurrence.reference_form, "procedural_alias_only")
 
+    def test_mixed_references_keep_pattern_priority_order(self):
+        occurrences = self.extract("Voir piece_tableau.md, Photo id=7 et piece_thread-3_email-4.md")
+        self.assertEqual(
+            [(item.reference_form, item.model, item.pk) for item in occurrences],
+            [
+                ("piece_markdown", "Email", 4),
+                ("direct_tuple", "Photo", 7),
+                ("unparsed_piece_reference", None, None),
+            ],
+        )
+
+    def test_specific_piece_name_wins_over_overlapping_generic_name(self):
+        occurrences = self.extract("piece_a-piece_pdf-1.md")
+        self.assertEqual(
+            [(item.raw_reference, item.model, item.pk) for item in occurrences],
+            [("piece_pdf-1.md", "PDFDocument", 1)],
+        )
+
     def test_media_path_is_normalized_without_media_prefix(self):
         paths = _media_path_candidates(
             "Source: `media/photos/IMG_3095.jpg` et pdf_documents/report.pdf."
         )
         self.assertEqual(paths, {"photos/IMG_3095.jpg", "pdf_documents/report.pdf"})
+
+
+class CollectOccurrencesCacheTests(SimpleTestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.root = Path(temp_dir.name) / "preuve"
+        self.root.mkdir()
+        self.cache_path = Path(temp_dir.name) / "cache.json"
+        (self.root / "a.md").write_text("Voir piece_pdf-1.md\n", encoding="utf-8")
+        (self.root / "b.md").write_text("Events id=4, 5\n", encoding="utf-8")
+
+    def collect(self):
+        stats = {}
+        occurrences = collect_occurrences(self.root, cache_path=self.cache_path, stats=stats)
+        return occurrences, stats
+
+    def test_unchanged_files_are_not_rescanned(self):
+        first, stats = self.collect()
+        self.assertEqual(stats["rescanned_file_count"], 2)
+        second, stats = self.collect()
+        self.assertEqual(stats["rescanned_file_count"], 0)
+        self.assertEqual(second, first)
+        self.assertEqual(second, collect_occurrences(self.root))
+
+    def test_only_modified_file_is_rescanned(self):
+        self.collect()
+        (self.root / "b.md").write_text("Events id=4, 5\nPhoto id=9\n", encoding="utf-8")
+        occurrences, stats = self.collect()
+        self.assertEqual(stats["rescanned_file_count"], 1)
+        self.assertIn(("Photo", 9), {(item.model, item.pk) for item in occurrences})
+
+    def test_cache_of_another_input_dir_is_not_reused(self):
+        self.collect()
+        other = self.root.with_name("autre")
+        other.mkdir()
+        for name, text in (("a.md", "Voir piece_pdf-2.md\n"), ("b.md", "Events id=6, 7\n")):
+            path = other / name
+            path.write_text(text, encoding="utf-8")
+            source = (self.root / name).stat()
+            os.utime(path, ns=(source.st_atime_ns, source.st_mtime_ns))
+
+        stats = {}
+        occurrences = collect_occurrences(other, cache_path=self.cache_path, stats=stats)
+        self.assertEqual(stats["rescanned_file_count"], 2)
+        self.assertEqual(occurrences, collect_occurrences(other))
+
+
+class DescriptivePieceIndexTests(SimpleTestCase):
+    def test_source_block_tuples_resolve_without_media_queries(self):
+        with tempfile.TemporaryDirectory() as directory:
+            legal_dir = Path(directory)
+            (legal_dir / "piece_liasse.md").write_text(
+                "Source : Events id=4, 5\n---\nCorps.\n",
+                encoding="utf-8",
+            )
+            occurrences = extract_references_from_text(
+                "piece_liasse.md et piece_absente.md",
+                source_file="test.md",
+                source_format="markdown",
+                source_location="line:1",
+            )
+            index = DescriptivePieceIndex()
+            resolved = resolve_descriptive_piece_occurrences(occurrences, legal_dir, index)
+            again = resolve_descriptive_piece_occurrences(occurrences, legal_dir, index)
+        self.assertEqual(
+            [(item.reference_form, item.model, item.pk) for item in resolved],
+            [
+                ("descriptive_piece_components", "Event", 4),
+                ("descriptive_piece_components", "Event", 5),
+                ("unparsed_piece_reference", None, None),
+            ],
+        )
+        self.assertEqual(again, resolved)
+
+    def test_media_paths_resolve_with_one_query_per_model(self):
+        # Stored spellings as returned by a case- and accent-insensitive collation.
+        stored = {
+            "PDFDocument": [(3, "pdf_documents/rapport_ete.pdf")],
+            "Document": [],
+            "Photo": [(7, "PHOTOS/IMG_1.JPG"), (8, "photos/IMG_2.jpg")],
+        }
+        fields = []
+        queries = []
+        for model_name, _model_class, field in evidence_audit.MEDIA_PATH_FIELDS:
+            model_class = mock.Mock()
+            model_class.objects.filter.side_effect = (
+                lambda rows=stored[model_name], **lookup: queries.append(lookup)
+                or mock.Mock(values_list=mock.Mock(return_value=rows))
+            )
+            fields.append((model_name, model_class, field))
+
+        with tempfile.TemporaryDirectory() as directory:
+            legal_dir = Path(directory)
+            text = []
+            for number in range(10):
+                cited = "media/photos/img_1.jpg" if number % 2 == 0 else "photos/IMG_2.jpg"
+                (legal_dir / f"piece_photo_{number}.md").write_text(
+                    f"Source : {cited}\n---\n",
+                    encoding="utf-8",
+                )
+                text.append(f"piece_photo_{number}.md")
+            (legal_dir / "piece_rapport.md").write_text(
+                "Source : pdf_documents/Rapport_Été.pdf et photos/IMG_2.jpg\n---\n",
+                encoding="utf-8",
+            )
+            text.append("piece_rapport.md")
+            occurrences = extract_references_from_text(
+                " ".join(text),
+                source_file="test.md",
+                source_format="markdown",
+                source_location="line:1",
+            )
+            index = DescriptivePieceIndex()
+            with mock.patch.object(evidence_audit, "MEDIA_PATH_FIELDS", tuple(fields)):
+                resolved = resolve_descriptive_piece_occurrences(occurrences, legal_dir, index)
+                again = resolve_descriptive_piece_occurrences(occurrences, legal_dir, index)
+
+        self.assertEqual(len(queries), 3)
+        self.assertEqual(
+            [(item.raw_reference, item.model, item.pk) for item in resolved][:2],
+            [("piece_photo_0.md", "Photo", 7), ("piece_photo_1.md", "Photo", 8)],
+        )
+        self.assertEqual(
+            [(item.model, item.pk) for item in resolved if item.raw_reference == "piece_rapport.md"],
+            [("PDFDocument", 3), ("Photo", 8)],
+        )
+        self.assertEqual(again, resolved)
@@ -0,0 +1,77 @@
+from io import BytesIO
+
+import fitz
+from django.test import SimpleTestCase
+from PIL import Image
+
+from case_manager.exhibit_renderers.common import (
+    _target_pixels,
+    add_image_page,
+    prepare_image,
+)
+from case_manager.management.commands.build_cahier_pieces import share_duplicate_images
+
+
+def encode(size, *, image_format="JPEG", orientation=None):
+    output = BytesIO()
+    options = {}
+    if orientation:
+        exif = Image.Exif()
+        exif[0x0112] = orientation
+        options["exif"] = exif
+    Image.new("RGB", size, (200, 120, 40)).save(output, format=image_format, **options)
+    return output.getvalue()
+
+
+class PrepareImageTests(SimpleTestCase):
+    def test_oversized_photo_is_downsampled_to_target_dpi(self):
+        prepared = prepare_image(encode((6000, 4000)))
+        max_width, max_height = _target_pixels("jpeg")
+        self.assertLessEqual(prepared.width, max_width)
+        self.assertLessEqual(prepared.height, max_height)
+        self.assertAlmostEqual(prepared.width / prepared.height, 1.5, places=2)
+
+    def test_exif_rotation_is_applied(self):
+        prepared = prepare_image(encode((3000, 2000), orientation=6))
+        self.assertGreater(prepared.height, prepared.width)
+
+    def test_small_upright_image_is_kept_as_is(self):
+        raw = encode((800, 600))
+        self.assertEqual(prepare_image(raw).data, raw)
+
+    def test_identical_images_share_one_xref(self):
+        doc = fitz.open()
+        raw = encode((1200, 900), image_format="PNG")
+        image_xrefs = {}
+        for _ in range(3):
+            add_image_page(doc, raw, image_format="png", shared_xrefs=image_xrefs)
+        xrefs = {page.get_images()[0][0] for page in doc}
+        self.assertEqual(len(xrefs), 1)
+
+
+def piece_pdf(raw, pages):
+    doc = fitz.open()
+    image_xrefs = {}
+    for _ in range(pages):
+        add_image_page(doc, raw, image_format="png", shared_xrefs=image_xrefs)
+    return doc.tobytes()
+
+
+class ShareDuplicateImagesTests(SimpleTestCase):
+    def test_image_shared_across_pages_after_an_earlier_piece(self):
+        raw = encode((600, 400), image_format="PNG")
+        cahier = fitz.open()
+        seen, replaced = {}, {}
+        shared = 0
+        for pages in (1, 2):
+            start = cahier.page_count
+            cahier.insert_pdf(fitz.open(stream=piece_pdf(raw, pages), filetype="pdf"))
+            shared += share_duplicate_images(cahier, range(start, cahier.page_count), seen, replaced)
+
+        self.assertEqual(shared, 1)
+        xrefs = {page.get_images()[0][0] for page in cahier}
+        self.assertEqual(len(xrefs), 1)
+        self.assertTrue(cahier.xref_stream_raw(xrefs.pop()))
+        reference = cahier[0].get_pixmap().samples
+        for page in cahier:
+            self.assertEqual(page.get_pixmap().samples, reference)
@@ -0,0 +1,61 @@
+import fitz
+from django.test import SimpleTestCase
+
+from case_manager.exhibit_renderers.common import (
+    BODY_SIZE,
+    FONT_NORMAL,
+    _font_metrics,
+    _wrap_lines,
+    add_paginated_text,
+)
+
+
+class PaginatedTextTests(SimpleTestCase):
+    def paginate(self, text):
+        doc = fitz.open()
+        add_paginated_text(doc, text)
+        return doc
+
+    def unused_height(self, text, width):
+        doc = fitz.open()
+        page = doc.new_page(width=width + 20, height=5000)
+        return page.insert_textbox(
+            fitz.Rect(0, 0, width, 4000),
+            text,
+            fontsize=BODY_SIZE,
+            fontname=FONT_NORMAL,
+        )
+
+    def test_line_breaks_match_insert_textbox(self):
+        widths = _font_metrics(FONT_NORMAL)[0]
+        text = (
+            "Objet : relevé\tde paie — « mars »  2023\n\n"
+            + "mot " * 60
+            + "x" * 250
+            + " fin’ €\nderniere ligne"
+        )
+        for width in (504, 200, 40):
+            lines = list(_wrap_lines(text, widths, BODY_SIZE, width))
+            self.assertAlmostEqual(
+                self.unused_height("\n".join(lines), width),
+                self.unused_height(text, width),
+            )
+
+    def test_long_text_keeps_every_word_in_order(self):
+        text = "\n\n".join(
+            f"Paragraphe {i} " + "contenu " * (i % 40) for i in range(400)
+        )
+        doc = self.paginate(text)
+        extracted = " ".join(page.get_text() for page in doc)
+        self.assertGreater(len(doc), 1)
+        self.assertEqual(extracted.split(), text.split())
+
+    def test_oversized_word_spans_pages(self):
+        word = "a" * 20000
+        doc = self.paginate(word)
+        extracted = "".join("".join(page.get_text().split()) for page in doc)
+        self.assertGreater(len(doc), 1)
+        self.assertEqual(extracted, word)
+
+    def test_blank_text_adds_nothing(self):
+        self.assertEqual(len(self.paginate(" \n\n ")), 0)
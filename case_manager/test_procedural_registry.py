@@ -4,10 +4,15 @@ from tempfile import TemporaryDirectory
 from django.test import SimpleTestCase
 
 from case_manager.procedural_registry import (
+    diff_registry_reports,
     expand_collective_references,
     extract_pleading_placeholders,
+    load_registry_snapshot,
     parse_bordereau,
+    registry_input_digests,
     resolve_reference_text,
+    reusable_sections,
+    write_registry_snapshot,
 )
 
 
@@ -63,3 +68,54 @@ class ProceduralRegistryTests(SimpleTestCase):
             )
         keys = {item.canonical_key for item in occurrences if item.canonical_key}
         self.assertTrue({"EmailThread:6", "Email:6", "Email:8", "Email:295", "Email:306"}.issubset(keys))
+
+
+class RegistrySnapshotTests(SimpleTestCase):
+    def test_only_sections_with_changed_inputs_are_recomputed(self):
+        with TemporaryDirectory() as directory:
+            root = Path(directory)
+            input_dir = root / "organisation_preuve"
+            input_dir.mkdir()
+            paths = {
+                "audit_path": root / "audit.json",
+                "bordereau_path": root / "bordereau.md",
+                "pleading_path": root / "pleading.md",
+                "input_dir": input_dir,
+            }
+            for name in ("audit_path", "bordereau_path", "pleading_path"):
+                paths[name].write_text("v1", encoding="utf-8")
+            report = {
+                "summary": {"pleading_placeholder_count": 1},
+                "registry": [], "components": [], "conflicts": [], "historic_aliases": [], "collective_expansions": [],
+                "pleading_placeholders": [{"line": 1, "occurrence_in_line": 1, "mapping_status": "unresolved"}],
+            }
+            snapshot_path = root / "snapshot.json"
+            write_registry_snapshot(snapshot_path, registry_input_digests(**paths), report)
+
+            paths["pleading_path"].write_text("v2", encoding="utf-8")
+            (input_dir / "notes.txt").write_text("ignored", encoding="utf-8")
+            snapshot = load_registry_snapshot(snapshot_path)
+            reused = reusable_sections(snapshot, registry_input_digests(**paths))
+            checked = reusable_sections(snapshot, registry_input_digests(**paths), database=False)
+        self.assertEqual(set(reused), {"registry", "historic_aliases", "collective_expansions"})
+        # The database may have changed: sections querying it are recomputed.
+        self.assertEqual(set(checked), {"collective_expansions"})
+        self.assertEqual(reused["registry"]["components"], [])
+
+    def test_diff_lists_row_keys_and_summary_changes(self):
+        previous = {
+            "summary": {"historic_alias_count": 2},
+            "historic_aliases": [
+                {"historic_alias": "P-1", "mapping_status": "resolved"},
+                {"historic_alias": "P-2", "mapping_status": "unresolved"},
+            ],
+        }
+        current = {
+            "summary": {"historic_alias_count": 2},
+            "historic_aliases": [
+                {"historic_alias": "P-1", "mapping_status": "ambiguous"},
+                {"historic_alias": "P-3", "mapping_status": "resolved"},
+            ],
+        }
+        diff = diff_registry_reports(previous, current)
+        self.assertEqual(diff, {"historic_aliases": {"added": ["P-3"], "removed": ["P-2"], "changed": ["P-1"]}})
@@ -0,0 +1,32 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from django.test import SimpleTestCase
+from openpyxl import Workbook
+
+from case_manager.procedural_registry import _normalized
+from case_manager.table_readers import find_header, iter_csv_rows, iter_xlsx_rows
+
+
+class TableReaderTests(SimpleTestCase):
+    def test_find_header_normalizes_only_header_rows(self):
+        header = find_header(["Cote", "Référence  interne EXACTE"], "reference interne exacte", _normalized)
+        self.assertEqual(header, ["cote", "reference interne exacte"])
+        self.assertIsNone(find_header(["Deux pièces", "Courriel"], "reference interne exacte", _normalized))
+
+    def test_rows_are_streamed_with_their_location(self):
+        with TemporaryDirectory() as directory:
+            csv_path = Path(directory) / "table.csv"
+            csv_path.write_text("\ufeffa,b\n1,\n", encoding="utf-8")
+            xlsx_path = Path(directory) / "table.xlsx"
+            workbook = Workbook()
+            workbook.active.title = "Union"
+            workbook.active.append(["Photo 3", None, 0, 7])
+            workbook.create_sheet("Notes").append(["x"])
+            workbook.save(xlsx_path)
+
+            self.assertEqual(list(iter_csv_rows(csv_path)), [(1, ["a", "b"]), (2, ["1", ""])])
+            self.assertEqual(
+                list(iter_xlsx_rows(xlsx_path)),
+                [("Union", 1, ["Photo 3", "", "", "7"]), ("Notes", 1, ["x"])],
+            )
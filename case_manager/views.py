@@ -5,7 +5,7 @@ from django.views.generic import ListView, DetailView, CreateView, View, FormVie
 from django.views.generic.edit import UpdateView
 from django.urls import reverse_lazy, reverse
 from django.shortcuts import redirect, get_object_or_404, render
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
 from django.utils import timezone
 from django.conf import settings
 from django.contrib import messages
@@ -18,12 +18,12 @@ import os
 import zipfile
 from django.utils.html import strip_tags
 from docx.shared import Inches, Pt
-from docx.enum.text import WD_ALIGN_PARAGRAPH
 from django.views.decorators.http import require_POST
 
 from .models import LegalCase, PerjuryContestation, AISuggestion, ExhibitRegistry, ProducedExhibit
 from .forms import LegalCaseForm, PerjuryContestationForm, PerjuryContestationNarrativeForm, PerjuryContestationStatementsForm
 from .services import refresh_case_exhibits, rebuild_produced_exhibits
+from .docx_stream import StreamingDocx, anchor_link, heading, page_break, paragraph, run, table
 from ai_services.utils import EvidenceFormatter
 from ai_services.services import analyze_for_json_output, run_police_investigator_service, AI_PERSONAS
 from document_manager.models import LibraryNode, DocumentSource, Statement
@@ -32,6 +32,9 @@ from pdf_manager.models import PDFDocument
 from email_manager.models import Email
 from protagonist_manager.models import Protagonist
 
+# Pièces lues par lot lors de l'export Word en flux.
+EXPORT_CHUNK_SIZE = 200
+
 def _normalize_suggestion_json(data_dict):
     """
     Normalizes the AI suggestion JSON to a standard format.
@@ -342,7 +345,10 @@ class LegalCaseExportView(View):
             
         produced_exhibits = ProducedExhibit.objects.filter(case=case).order_by('sort_order')
         
-        document = docx.Document()
+        # Le document est écrit en flux (docx_stream) : le téléchargement
+        # commence avant la lecture de la dernière pièce et rien n'est
+        # construit en mémoire.
+        document = StreamingDocx(left_margin=Inches(0.75), right_margin=Inches(0.75))
 
         def clean_text(text):
             if not text: return ""
@@ -351,24 +357,7 @@ class LegalCaseExportView(View):
             text = html.unescape(text)
             return text.strip()
 
-        def add_hyperlink(paragraph, text, anchor):
-            part = paragraph.part
-            r_id = part.relate_to(anchor, docx.opc.constants.RELATIONSHIP_TYPE.HYPERLINK, is_external=True)
-            hyperlink = docx.oxml.shared.OxmlElement('w:hyperlink')
-            hyperlink.set(docx.oxml.shared.qn('r:id'), r_id)
-            hyperlink.set(docx.oxml.shared.qn('w:anchor'), anchor, )
-            new_run = docx.oxml.shared.OxmlElement('w:r')
-            rPr = docx.oxml.shared.OxmlElement('w:rPr')
-            new_run.append(rPr)
-            new_run.text = text
-            hyperlink.append(new_run)
-            r = paragraph.add_run()
-            r._r.append(hyperlink)
-            r.font.color.rgb = docx.shared.RGBColor(0x05, 0x63, 0xC1)
-            r.font.underline = True
-            return hyperlink
-
-        def add_markdown_content(doc, raw_text):
+        def markdown_content(raw_text):
             # Version simplifiée sans renumbering_map car les labels sont fixes dans ProducedExhibit
             text = clean_text(raw_text)
             if not text: return
@@ -382,210 +371,173 @@ class LegalCaseExportView(View):
                 if not line: continue
                 para_style = None
                 if re.match(r'^[\*\-]\s+', line):
-                    para_style = 'List Bullet'
+                    para_style = 'ListBullet'
                     line = re.sub(r'^[\*\-]\s+', '', line)
                 elif re.match(r'^\d+\.\s+', line):
-                    para_style = 'List Number'
+                    para_style = 'ListNumber'
                     line = re.sub(r'^[\*\-]\s+', '', line)
 
-                p = doc.add_paragraph(style=para_style)
-                p.add_run(line)
-
-        # ------------------------------------------------------------------
-        # DOCUMENT GENERATION
-        # ------------------------------------------------------------------
-        section = document.sections[0]
-        section.left_margin = Inches(0.75)
-        section.right_margin = Inches(0.75)
-
-        document.add_heading(f'Dénonciation: {case.title}', level=0)
-        
-        # --- SECTIONS ARGUMENTAIRES ---
-        for contestation in case.contestations.all():
-            document.add_heading(contestation.title, level=2)
-            
-            document.add_heading('1. Déclaration', level=3)
-            add_markdown_content(document, contestation.final_sec1_declaration)
-            
-            document.add_heading('2. Preuve', level=3)
-            add_markdown_content(document, contestation.final_sec2_proof)
+                yield paragraph(run(line), style=para_style)
+
+        def photo_grid(photos, caption):
+            # Grille de photos à deux colonnes ; une ligne est écrite par paire.
+            def photo_cell(index, photo):
+                if not photo.file:
+                    return []
+                try:
+                    with photo.file.open('rb') as handle:
+                        picture = document.picture(photo.file.name, handle.read(), Inches(2.8))
+                    return [
+                        paragraph(picture),
+                        paragraph(run(caption(index, photo)), alignment='center'),
+                    ]
+                except Exception as e:
+                    return [paragraph(), paragraph(run(f"[Erreur: {e}]"))]
+
+            def rows():
+                cells = []
+                for index, photo in enumerate(photos):
+                    cells.append(photo_cell(index, photo))
+                    if len(cells) == 2:
+                        yield cells
+                        cells = []
+                if cells:
+                    yield cells + [[]]
+
+            yield from table(rows(), [Inches(3.5), Inches(3.5)])
+
+        def body():
+            yield heading(f'Dénonciation: {case.title}', level=0)
             
-            document.add_heading('3. Mens Rea', level=3)
-            add_markdown_content(document, contestation.final_sec3_mens_rea)
-            
-            document.add_heading('4. Intention', level=3)
-            add_markdown_content(document, contestation.final_sec4_intent)
-            
-            document.add_page_break()
-
-        # ==================================================================
-        # TABLE DES PIÈCES (Format Site Web)
-        # ==================================================================
-        document.add_heading('Index des Pièces (Production)', level=1)
-        
-        # Création du tableau à 5 colonnes
-        table = document.add_table(rows=1, cols=5)
-        table.style = 'Table Grid'
-        table.autofit = False 
-        
-        # En-têtes
-        hdr_cells = table.rows[0].cells
-        hdr_cells[0].text = 'Cote'
-        hdr_cells[0].width = Inches(0.8)
-        
-        hdr_cells[1].text = 'Date'
-        hdr_cells[1].width = Inches(1.0)
-        
-        hdr_cells[2].text = 'Type'
-        hdr_cells[2].width = Inches(1.0)
-        
-        hdr_cells[3].text = 'Description'
-        hdr_cells[3].width = Inches(3.0)
-        
-        hdr_cells[4].text = 'Parties'
-        hdr_cells[4].width = Inches(1.5)
+            # --- SECTIONS ARGUMENTAIRES ---
+            for contestation in case.contestations.all():
+                yield heading(contestation.title, level=2)
+                
+                yield heading('1. Déclaration', level=3)
+                yield from markdown_content(contestation.final_sec1_declaration)
+                
+                yield heading('2. Preuve', level=3)
+                yield from markdown_content(contestation.final_sec2_proof)
+                
+                yield heading('3. Mens Rea', level=3)
+                yield from markdown_content(contestation.final_sec3_mens_rea)
+                
+                yield heading('4. Intention', level=3)
+                yield from markdown_content(contestation.final_sec4_intent)
+                
+                yield page_break()
 
-        # Remplissage avec ProducedExhibit
-        for item in produced_exhibits:
-            row_cells = table.add_row().cells
-            
-            # Cell 0: Cote avec lien interne vers l'annexe
-            bookmark_name = f"exhibit_{item.sort_order}" # ex: exhibit_1, exhibit_2
-            add_hyperlink(row_cells[0].paragraphs[0], item.label, bookmark_name)
-            
-            # Cell 1: Date
-            row_cells[1].text = item.date_display or ""
-            
-            # Cell 2: Type
-            row_cells[2].text = item.exhibit_type or ""
+            # ==================================================================
+            # TABLE DES PIÈCES (Format Site Web)
+            # ==================================================================
+            yield heading('Index des Pièces (Production)', level=1)
             
-            # Cell 3: Description (Nettoyage léger)
-            desc_clean = clean_text(item.description)
-            # Pour les citations, on peut mettre en italique
-            if "«" in desc_clean:
-                row_cells[3].paragraphs[0].add_run(desc_clean).italic = True
-            else:
-                row_cells[3].text = desc_clean
-            
-            # Cell 4: Parties
-            row_cells[4].text = item.parties or ""
+            # Tableau à 5 colonnes : Cote, Date, Type, Description, Parties
+            widths = [Inches(0.8), Inches(1.0), Inches(1.0), Inches(3.0), Inches(1.5)]
+            header = [[paragraph(run(title))] for title in ('Cote', 'Date', 'Type', 'Description', 'Parties')]
+
+            def index_rows():
+                yield header
+                for item in produced_exhibits.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+                    # Cell 0: Cote avec lien interne vers l'annexe
+                    bookmark_name = f"exhibit_{item.sort_order}" # ex: exhibit_1, exhibit_2
+                    # Cell 3: Description (Nettoyage léger)
+                    desc_clean = clean_text(item.description)
+                    # Pour les citations, on met en italique
+                    yield [
+                        [paragraph(anchor_link(item.label, bookmark_name))],
+                        [paragraph(run(item.date_display or ""))],
+                        [paragraph(run(item.exhibit_type or ""))],
+                        [paragraph(run(desc_clean, italic="«" in desc_clean))],
+                        [paragraph(run(item.parties or ""))],
+                    ]
+
+            yield from table(index_rows(), widths, style='TableGrid', fixed=True)
+
+            # ==================================================================
+            # ANNEXES (Basé sur ProducedExhibit)
+            # ==================================================================
+            yield page_break()
+            yield heading('ANNEXES - CONTENU DÉTAILLÉ', level=0)
+
+            # Objets liés chargés par lots (une requête par type et par lot)
+            annexes = (
+                produced_exhibits
+                .select_related('content_type')
+                .prefetch_related('content_object')
+                .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+            )
+            for item in annexes:
+                obj = item.content_object # L'objet réel (Email, PDF, etc.)
+                if not obj: continue # Sécurité si l'objet a été supprimé
+
+                label = item.label
+                bookmark_name = f"exhibit_{item.sort_order}"
+                
+                # Heading avec Bookmark
+                yield heading(f'Pièce {label}', level=1, bookmark=(item.sort_order, bookmark_name))
 
-        # ==================================================================
-        # ANNEXES (Basé sur ProducedExhibit)
-        # ==================================================================
-        document.add_page_break()
-        document.add_heading('ANNEXES - CONTENU DÉTAILLÉ', level=0)
+                # --- Affichage conditionnel selon le type d'objet ---
+                # On utilise item.content_type.model pour savoir comment l'afficher
+                model_name = item.content_type.model
 
-        for item in produced_exhibits:
-            obj = item.content_object # L'objet réel (Email, PDF, etc.)
-            if not obj: continue # Sécurité si l'objet a été supprimé
+                if model_name == 'email' or model_name == 'quote': 
+                    # Note: 'quote' pointe souvent vers un Email ou un PDF, il faut gérer le parent
+                    actual_obj = obj
+                    if model_name == 'quote':
+                        if hasattr(obj, 'email'): actual_obj = obj.email
+                        elif hasattr(obj, 'pdf_document'): actual_obj = obj.pdf_document
+                    
+                    # Affiche le contexte de base
+                    yield paragraph(
+                        run(f"Description : {item.description}\n", bold=True),
+                        run(f"Parties : {item.parties}", italic=True),
+                    )
+                    
+                    yield paragraph(run('--- Contenu ---', italic=True))
+                    
+                    if hasattr(actual_obj, 'body_plain_text'):
+                        raw_body = actual_obj.body_plain_text or "[Vide]"
+                        # Restore email history stripping
+                        body_lines = raw_body.splitlines()
+                        cleaned_lines = [line for line in body_lines if not line.strip().startswith('>')]
+                        cleaned_body = "\n".join(cleaned_lines)
+                        body_text = clean_text(cleaned_body)
+                        yield paragraph(run(body_text), alignment='both')
 
-            label = item.label
-            bookmark_name = f"exhibit_{item.sort_order}"
-            
-            # Heading avec Bookmark
-            heading_paragraph = document.add_heading(f'Pièce {label}', level=1)
-            bookmark_start = docx.oxml.shared.OxmlElement('w:bookmarkStart')
-            bookmark_start.set(docx.oxml.shared.qn('w:id'), str(item.sort_order))
-            bookmark_start.set(docx.oxml.shared.qn('w:name'), bookmark_name)
-            heading_paragraph._p.insert(0, bookmark_start)
-            bookmark_end = docx.oxml.shared.OxmlElement('w:bookmarkEnd')
-            bookmark_end.set(docx.oxml.shared.qn('w:id'), str(item.sort_order))
-            heading_paragraph._p.append(bookmark_end)
-
-            # --- Affichage conditionnel selon le type d'objet ---
-            # On utilise item.content_type.model pour savoir comment l'afficher
-            model_name = item.content_type.model
-
-            if model_name == 'email' or model_name == 'quote': 
-                # Note: 'quote' pointe souvent vers un Email ou un PDF, il faut gérer le parent
-                actual_obj = obj
-                if model_name == 'quote':
-                    if hasattr(obj, 'email'): actual_obj = obj.email
-                    elif hasattr(obj, 'pdf_document'): actual_obj = obj.pdf_document
-                
-                # Affiche le contexte de base
-                p = document.add_paragraph()
-                p.add_run(f"Description : {item.description}\n").bold = True
-                p.add_run(f"Parties : {item.parties}").italic = True
-                
-                document.add_paragraph('--- Contenu ---').italic = True
-                
-                if hasattr(actual_obj, 'body_plain_text'):
-                    raw_body = actual_obj.body_plain_text or "[Vide]"
-                    # Restore email history stripping
-                    body_lines = raw_body.splitlines()
-                    cleaned_lines = [line for line in body_lines if not line.strip().startswith('>')]
-                    cleaned_body = "\n".join(cleaned_lines)
-                    body_text = clean_text(cleaned_body)
-                    document.add_paragraph(body_text).alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
+                elif model_name == 'event':
+                    yield paragraph(run(f"Date : {obj.date}"))
+                    yield paragraph(run("Description : ", bold=True))
+                    yield from markdown_content(obj.explanation)
+
+                    # Restore photo display for events
+                    photos = list(obj.linked_photos.all())
+                    if photos:
+                        yield paragraph(run("Preuve visuelle :", italic=True))
+                        yield from photo_grid(photos, lambda index, photo: photo.file_name or "Image")
+
+                elif model_name == 'photodocument':
+                    yield paragraph(run(f"Titre : {obj.title}"))
+                    if obj.description:
+                        yield from markdown_content(obj.description)
+                    
+                    # Restore photo display for photodocuments
+                    photos = list(obj.photos.all())
+                    if photos:
+                        yield from photo_grid(photos, lambda index, photo: f"Page {index + 1}")
 
-            elif model_name == 'event':
-                document.add_paragraph(f"Date : {obj.date}")
-                p = document.add_paragraph()
-                p.add_run("Description : ").bold = True
-                add_markdown_content(document, obj.explanation)
-
-                # Restore photo display for events
-                photos = obj.linked_photos.all()
-                if photos.exists():
-                    document.add_paragraph("Preuve visuelle :").italic = True
-                    photo_table = document.add_table(rows=0, cols=2)
-                    row_cells = None
-                    for index, photo in enumerate(photos):
-                        if index % 2 == 0:
-                            row_cells = photo_table.add_row().cells
-                        cell = row_cells[index % 2]
-                        if photo.file:
-                            try:
-                                paragraph = cell.paragraphs[0]
-                                run = paragraph.add_run()
-                                run.add_picture(photo.file.open(), width=Inches(2.8))
-                                caption = cell.add_paragraph(photo.file_name or "Image")
-                                caption.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                            except Exception as e:
-                                cell.add_paragraph(f"[Erreur: {e}]")
+                elif model_name == 'pdfdocument' or model_name == 'document':
+                    yield paragraph(run(f"Document : {item.description}"))
+                    yield paragraph(run(f"Auteur : {item.parties}"))
+                    yield paragraph(run("[Voir fichier PDF joint au dossier]", italic=True))
 
-            elif model_name == 'photodocument':
-                document.add_paragraph(f"Titre : {obj.title}")
-                if obj.description:
-                    add_markdown_content(document, obj.description)
-                
-                # Restore photo display for photodocuments
-                photos = obj.photos.all()
-                if photos.exists():
-                    photo_table = document.add_table(rows=0, cols=2)
-                    row_cells = None
-                    for index, photo in enumerate(photos):
-                        if index % 2 == 0:
-                            row_cells = photo_table.add_row().cells
-                        cell = row_cells[index % 2]
-                        if photo.file:
-                            try:
-                                paragraph = cell.paragraphs[0]
-                                run = paragraph.add_run()
-                                run.add_picture(photo.file.open(), width=Inches(2.8))
-                                caption = cell.add_paragraph(f"Page {index + 1}")
-                                caption.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                            except Exception as e:
-                                cell.add_paragraph(f"[Erreur: {e}]")
-
-            elif model_name == 'pdfdocument' or model_name == 'document':
-                document.add_paragraph(f"Document : {item.description}")
-                document.add_paragraph(f"Auteur : {item.parties}")
-                document.add_paragraph("[Voir fichier PDF joint au dossier]").italic = True
-
-            elif model_name == 'statement':
-                 document.add_paragraph(f"Déclaration : {obj.text}")
+                elif model_name == 'statement':
+                     yield paragraph(run(f"Déclaration : {obj.text}"))
 
-            document.add_page_break()
+                yield page_break()
 
-        # Save
-        f = io.BytesIO()
-        document.save(f)
-        f.seek(0)
-        response = HttpResponse(f.getvalue(),
-                                content_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document')
+        response = StreamingHttpResponse(document.stream(body()),
+                                         content_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document')
         response['Content-Disposition'] = f'attachment; filename="case_{case.pk}_export_v2.docx"'
         return response
 
@@ -0,0 +1,113 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ai_services.services import generate_embedding
+from core.services import SEARCH_CONFIGS, semantic_search_candidates
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure le compromis rappel/latence de la recherche sémantique ANN "
+        "(HNSW ef_search / IVFFlat probes) contre le classement exact."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--query",
+            action="append",
+            default=[],
+            help="Texte de requête (répétable). Encodé avec le modèle d'embedding.",
+        )
+        parser.add_argument(
+            "--sample",
+            type=int,
+            default=20,
+            help="Nombre d'embeddings existants utilisés comme requêtes si aucun --query n'est fourni.",
+        )
+        parser.add_argument("--limit", type=int, default=10)
+        parser.add_argument(
+            "--ef-search",
+            default="10,40,100,200",
+            help="Valeurs hnsw.ef_search à tester, séparées par des virgules.",
+        )
+        parser.add_argument(
+            "--probes",
+            default="",
+            help="Valeurs ivfflat.probes à tester, séparées par des virgules.",
+        )
+
+    def handle(self, *args, **options):
+        limit = options["limit"]
+        vectors = self._query_vectors(options["query"], options["sample"])
+        if not vectors:
+            raise CommandError("Aucun vecteur de requête disponible (embeddings manquants ?).")
+
+        self.stdout.write(f"{len(vectors)} requête(s), top-{limit}")
+
+        exact_results = []
+        exact_timings = []
+        for vector in vectors:
+            started = time.perf_counter()
+            ranked = semantic_search_candidates(vector, limit=limit, exact=True)
+            exact_timings.append((time.perf_counter() - started) * 1000)
+            exact_results.append({(source, pk) for source, pk, *_ in ranked})
+        self._report("exact", exact_timings, recall=1.0)
+
+        for name, values in (("ef_search", options["ef_search"]), ("probes", options["probes"])):
+            for value in self._parse_values(values):
+                timings = []
+                recalls = []
+                for vector, expected in zip(vectors, exact_results):
+                    started = time.perf_counter()
+                    ranked = semantic_search_candidates(vector, limit=limit, **{name: value})
+                    timings.append((time.perf_counter() - started) * 1000)
+                    found = {(source, pk) for source, pk, *_ in ranked}
+                    recalls.append(len(found & expected) / len(expected) if expected else 1.0)
+                self._report(f"{name}={value}", timings, recall=statistics.mean(recalls))
+
+    def _parse_values(self, raw):
+        values = []
+        for part in raw.split(","):
+            part = part.strip()
+            if not part:
+                continue
+            try:
+                values.append(int(part))
+            except ValueError as exc:
+                raise CommandError(f"Valeur invalide : {part}") from exc
+        return values
+
+    def _query_vectors(self, queries, sample):
+        if queries:
+            return [vector for vector in (generate_embedding(text) for text in queries) if vector]
+
+        # Reuse stored embeddings as queries: no model load, representative distribution.
+        vectors = []
+        per_source = max(1, sample // len(SEARCH_CONFIGS))
+        for config in SEARCH_CONFIGS:
+            embeddings = (
+                config["model"].objects
+                .filter(embedding__isnull=False)
+                .order_by("?")
+                .values_list("embedding", flat=True)[:per_source]
+            )
+            vectors.extend(list(embedding) for embedding in embeddings)
+        return vectors[:sample]
+
+    def _report(self, label, timings, recall):
+        self.stdout.write(
+            f"{label:<16} recall@k={recall:.3f}  "
+            f"p50={_percentile(timings, 50):.1f}ms  "
+            f"p95={_percentile(timings, 95):.1f}ms  "
+            f"mean={statistics.mean(timings):.1f}ms"
+        )
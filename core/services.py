@@ -1,60 +1,388 @@
+import re
+from contextlib import contextmanager
+
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection, transaction
+from django.db.models import BigIntegerField, CharField, F, Value
 from pgvector.django import CosineDistance
-from email_manager.models import Email
-from pdf_manager.models import PDFDocument
+from ai_services.models import EmbeddingChunk
+from argument_manager.models import TrameNarrative
+from email_manager.models import Email, Quote as EmailQuote
+from pdf_manager.models import PDFDocument, Quote as PDFQuote
 from photos.models import PhotoDocument
-from document_manager.models import Document
+from document_manager.models import Document, Statement
 from events.models import Event
 from ai_services.services import generate_embedding
 from core.mixins import ExhibitableMixin
 
-def global_semantic_search(query_text, limit=10):
+# Evidence sources covered by the global semantic search.
+# The 'key' is the discriminator returned by the UNION query; adding a new
+# evidence type only requires a new entry here, not a new round trip.
+# 'chunk_field' marks long-text sources embedded passage by passage
+# (EmbeddingChunk): their best passage competes in the ranking on its own.
+SEARCH_CONFIGS = [
+    {'key': 'email', 'model': Email, 'type': 'Email', 'icon': 'bi-envelope', 'chunk_field': 'body_plain_text'},
+    {'key': 'pdf', 'model': PDFDocument, 'type': 'PDF', 'icon': 'bi-file-pdf', 'chunk_field': 'ai_analysis'},
+    {'key': 'event', 'model': Event, 'type': 'Événement', 'icon': 'bi-calendar-event'},
+    {'key': 'photo', 'model': PhotoDocument, 'type': 'Photo', 'icon': 'bi-camera'},
+    {'key': 'document', 'model': Document, 'type': 'Document', 'icon': 'bi-file-earmark-text'},
+]
+
+
+# Several passages of the same document can match; over-fetch chunk rows so
+# that deduplicating per document still leaves enough distinct candidates.
+CHUNK_OVERFETCH = 3
+
+
+def _ranked_candidates_queryset(query_vector, limit, configs=SEARCH_CONFIGS):
+    """
+    Builds a single UNION ALL queryset returning (source, pk, distance, chunk_id)
+    rows. Each branch keeps its own ORDER BY/LIMIT so PostgreSQL can still use
+    the per-table vector index, then the outer query ranks the merged candidates.
+    Chunked sources add a passage branch whose rows point to their parent pk.
+    """
+    branches = []
+    for config in configs:
+        source = Value(config['key'], output_field=CharField())
+        branches.append(
+            config['model'].objects
+            .filter(embedding__isnull=False)
+            .annotate(
+                source=source,
+                distance=CosineDistance('embedding', query_vector),
+                chunk_id=Value(None, output_field=BigIntegerField()),
+            )
+            .order_by('distance')
+            .values_list('source', 'pk', 'distance', 'chunk_id')[:limit]
+        )
+        if config.get('chunk_field'):
+            branches.append(
+                EmbeddingChunk.objects
+                .filter(content_type=ContentType.objects.get_for_model(config['model']))
+                .annotate(
+                    source=source,
+                    parent_id=F('object_id'),
+                    distance=CosineDistance('embedding', query_vector),
+                    chunk_id=F('pk'),
+                )
+                .order_by('distance')
+                .values_list('source', 'parent_id', 'distance', 'chunk_id')[:limit * CHUNK_OVERFETCH]
+            )
+
+    first, *others = branches
+    return first.union(*others, all=True).order_by('distance')
+
+
+@contextmanager
+def ann_search_settings(ef_search=None, probes=None, exact=False):
+    """
+    Applies pgvector search parameters for the duration of one transaction.
+    - ef_search: HNSW candidate list size (higher = better recall, slower).
+    - probes: IVFFlat lists scanned (only relevant for IVFFlat indexes).
+    - exact: disables index scans to get the exact (sequential) ranking.
+    The settings are SET LOCAL, so they never leak to other requests.
+    """
+    with transaction.atomic():
+        settings_to_apply = []
+        if ef_search:
+            settings_to_apply.append(('hnsw.ef_search', str(int(ef_search))))
+        if probes:
+            settings_to_apply.append(('ivfflat.probes', str(int(probes))))
+        if exact:
+            settings_to_apply.append(('enable_indexscan', 'off'))
+
+        if settings_to_apply:
+            with connection.cursor() as cursor:
+                for name, value in settings_to_apply:
+                    cursor.execute("SELECT set_config(%s, %s, true)", [name, value])
+        yield
+
+
+def semantic_search_candidates(query_vector, limit=10, ef_search=None, probes=None, exact=False):
+    """
+    Returns the ranked top-k as a list of (source key, pk, distance, chunk_id)
+    tuples, without hydrating the model instances. A document matched both
+    as a whole and through passages keeps its best (max-similarity) row;
+    chunk_id is set when that row is a passage.
+    """
+    with ann_search_settings(ef_search=ef_search, probes=probes, exact=exact):
+        rows = list(_ranked_candidates_queryset(query_vector, limit))
+
+    ranked = []
+    seen = set()
+    for source, pk, distance, chunk_id in rows:
+        if (source, pk) in seen:
+            continue
+        seen.add((source, pk))
+        ranked.append((source, pk, distance, chunk_id))
+        if len(ranked) == limit:
+            break
+    return ranked
+
+
+def _format_result(obj, config, distance, passage=None):
+    if isinstance(obj, ExhibitableMixin):
+        return {
+            'type': obj.get_exhibit_type(),
+            'icon': config['icon'],
+            'title': obj.get_exhibit_title(),
+            'content': obj.get_exhibit_description(),
+            'date': obj.get_exhibit_date(),
+            'distance': distance,
+            'url': obj.get_absolute_url() if hasattr(obj, 'get_absolute_url') else "#",
+            'object': obj,
+            'passage': passage,
+        }
+    # Fallback for models without Mixin
+    return {
+        'type': config['type'],
+        'icon': config['icon'],
+        'title': str(obj),
+        'content': "",
+        'date': None,
+        'distance': distance,
+        'url': "#",
+        'object': obj,
+        'passage': passage,
+    }
+
+
+def global_semantic_search(query_text, limit=10, ef_search=None, probes=None):
     """
     Searches across all primary evidence sources using vector embeddings.
+    The top-k across every source is ranked in one database round trip; the
+    winning rows are then hydrated with one query per source type present.
+    ef_search/probes tune the recall-vs-latency trade-off of the ANN indexes.
     Leverages the ExhibitableMixin interface for consistent result formatting.
     """
     query_vector = generate_embedding(query_text)
     if not query_vector:
         return []
 
+    ranked = semantic_search_candidates(
+        query_vector, limit=limit, ef_search=ef_search, probes=probes
+    )
+    if not ranked:
+        return []
+
+    configs_by_key = {config['key']: config for config in SEARCH_CONFIGS}
+
+    pks_by_source = {}
+    for source, pk, _distance, _chunk_id in ranked:
+        pks_by_source.setdefault(source, []).append(pk)
+
+    objects_by_source = {
+        source: configs_by_key[source]['model'].objects.in_bulk(pks)
+        for source, pks in pks_by_source.items()
+    }
+
+    chunk_ids = [chunk_id for _source, _pk, _distance, chunk_id in ranked if chunk_id]
+    chunks = EmbeddingChunk.objects.in_bulk(chunk_ids) if chunk_ids else {}
+
+    results = []
+    for source, pk, distance, chunk_id in ranked:
+        obj = objects_by_source[source].get(pk)
+        if obj is None:
+            # Row deleted between the ranking and the hydration query.
+            continue
+        config = configs_by_key[source]
+        passage = None
+        chunk = chunks.get(chunk_id)
+        if chunk is not None:
+            text = getattr(obj, config['chunk_field']) or ""
+            passage = {
+                'text': text[chunk.start_offset:chunk.end_offset].strip(),
+                'start': chunk.start_offset,
+                'end': chunk.end_offset,
+            }
+        results.append(_format_result(obj, config, distance, passage=passage))
+
+    return results
+
+
+# --- Hybrid lexical + vector evidence search ("Link Existing Evidence") ---
+
+# Reciprocal-rank fusion constant (Cormack et al.): dampens the weight of
+# the very first ranks so neither leg dominates the fused ordering.
+RRF_K = 60
+HYBRID_MAX_DEPTH = 200
+FTS_CONFIG = 'french'
+
+# Each entry must match a GinIndex(SearchVector(*fields, config='french'))
+# declared on the model, otherwise the lexical leg falls back to a scan.
+EVIDENCE_SEARCH_CONFIGS = [
+    {
+        'key': 'Statement',
+        'model': Statement,
+        'label': 'Reproduced Text',
+        'fields': ('text',),
+        'filters': {'is_user_created': False},
+        'vector': True,
+        'preview': lambda item: f"'{(item.text or '')[:80]}...'",
+    },
+    {
+        'key': 'TrameNarrative',
+        'model': TrameNarrative,
+        'label': 'Narrative',
+        'fields': ('titre', 'resume'),
+        'vector': False,
+        'preview': lambda item: f"{item.titre}: {item.resume[:60]}...",
+    },
+    {
+        'key': 'EmailQuote',
+        'model': EmailQuote,
+        'label': 'Email Quote',
+        'fields': ('quote_text',),
+        'select_related': ('email',),
+        'vector': True,
+        'preview': lambda item: f"Email from '{item.email.subject}': '{item.quote_text[:60]}...'",
+    },
+    {
+        'key': 'PDFQuote',
+        'model': PDFQuote,
+        'label': 'PDF Quote',
+        'fields': ('quote_text',),
+        'select_related': ('pdf_document',),
+        'vector': True,
+        'preview': lambda item: f"PDF '{item.pdf_document.title}': '{item.quote_text[:60]}...'",
+    },
+    {
+        'key': 'Event',
+        'model': Event,
+        'label': 'Event',
+        'fields': ('explanation',),
+        'vector': True,
+        'preview': lambda item: f"Event on {item.date.strftime('%Y-%m-%d')}: {item.explanation[:60]}...",
+    },
+    {
+        'key': 'PhotoDocument',
+        'model': PhotoDocument,
+        'label': 'Photo Document',
+        'fields': ('title', 'description'),
+        'vector': True,
+        'preview': lambda item: f"Photo Doc: '{item.title}'",
+    },
+]
+
+
+def prefix_tsquery_text(query_text):
+    """
+    Turns free text typed in a search box into a raw prefix tsquery
+    ('garde partag' -> 'garde:* & partag:*'), so results show up while the
+    user is still typing. Returns None when no searchable term remains.
+    """
+    terms = re.findall(r"[^\W_]+", query_text or "")
+    if not terms:
+        return None
+    return " & ".join(f"{term}:*" for term in terms)
+
+
+def build_prefix_tsquery(query_text):
+    raw = prefix_tsquery_text(query_text)
+    if raw is None:
+        return None
+    return SearchQuery(raw, search_type='raw', config=FTS_CONFIG)
+
+
+def _hybrid_candidates_queryset(tsquery, query_vector, depth, configs):
+    """
+    One UNION ALL over every source: lexical rows carry a ts_rank score,
+    vector rows a cosine distance. Rows are (leg, source, pk, score).
+    """
+    branches = []
+    for config in configs:
+        base = config['model'].objects.filter(**config.get('filters', {}))
+        source = Value(config['key'], output_field=CharField())
+        if tsquery is not None:
+            search_vector = SearchVector(*config['fields'], config=FTS_CONFIG)
+            branches.append(
+                base.annotate(search=search_vector)
+                .filter(search=tsquery)
+                .annotate(
+                    leg=Value('lexical', output_field=CharField()),
+                    source=source,
+                    score=SearchRank(search_vector, tsquery),
+                )
+                .order_by('-score')
+                .values_list('leg', 'source', 'pk', 'score')[:depth]
+            )
+        if query_vector is not None and config['vector']:
+            branches.append(
+                base.filter(embedding__isnull=False)
+                .annotate(
+                    leg=Value('vector', output_field=CharField()),
+                    source=source,
+                    score=CosineDistance('embedding', query_vector),
+                )
+                .order_by('score')
+                .values_list('leg', 'source', 'pk', 'score')[:depth]
+            )
+
+    if not branches:
+        return []
+    first, *others = branches
+    return first.union(*others, all=True)
+
+
+def reciprocal_rank_fusion(ranked_lists, k=RRF_K):
+    """Fuses ranked lists of hashable keys into one list of (key, score)."""
+    scores = {}
+    for ranked in ranked_lists:
+        for position, key in enumerate(ranked, start=1):
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + position)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+def hybrid_evidence_search(query_text, page=1, page_size=10, semantic=True, configs=EVIDENCE_SEARCH_CONFIGS):
+    """
+    Ranks evidence by fusing French full-text search (GIN tsvector indexes)
+    with pgvector similarity through reciprocal-rank fusion.
+    Both legs run in a single UNION query; only the requested page is
+    hydrated. Returns (results, has_next).
+    """
+    tsquery = build_prefix_tsquery(query_text)
+    query_vector = generate_embedding(query_text) if semantic else None
+    if tsquery is None and not query_vector:
+        return [], False
+
+    page = max(1, page)
+    depth = min(HYBRID_MAX_DEPTH, page * page_size + 1)
+    rows = list(_hybrid_candidates_queryset(tsquery, query_vector, depth, configs))
+
+    lexical = sorted((row for row in rows if row[0] == 'lexical'), key=lambda row: row[3], reverse=True)
+    vector = sorted((row for row in rows if row[0] == 'vector'), key=lambda row: row[3])
+    fused = reciprocal_rank_fusion([
+        [(source, pk) for _leg, source, pk, _score in lexical],
+        [(source, pk) for _leg, source, pk, _score in vector],
+    ])
+
+    start = (page - 1) * page_size
+    page_items = fused[start:start + page_size]
+    has_next = len(fused) > start + page_size
+
+    configs_by_key = {config['key']: config for config in configs}
+    pks_by_source = {}
+    for (source, pk), _score in page_items:
+        pks_by_source.setdefault(source, []).append(pk)
+
+    objects_by_source = {}
+    for source, pks in pks_by_source.items():
+        config = configs_by_key[source]
+        qs = config['model'].objects.select_related(*config.get('select_related', ()))
+        objects_by_source[source] = qs.in_bulk(pks)
+
     results = []
-    
-    search_configs = [
-        {'model': Email, 'type': 'Email', 'icon': 'bi-envelope'},
-        {'model': PDFDocument, 'type': 'PDF', 'icon': 'bi-file-pdf'},
-        {'model': Event, 'type': 'Événement', 'icon': 'bi-calendar-event'},
-        {'model': PhotoDocument, 'type': 'Photo', 'icon': 'bi-camera'},
-        {'model': Document, 'type': 'Document', 'icon': 'bi-file-earmark-text'},
-    ]
-
-    for config in search_configs:
-        qs = config['model'].objects.annotate(
-            distance=CosineDistance('embedding', query_vector)
-        ).filter(embedding__isnull=False).order_by('distance')[:limit]
-        
-        for obj in qs:
-            if isinstance(obj, ExhibitableMixin):
-                results.append({
-                    'type': obj.get_exhibit_type(),
-                    'icon': config['icon'],
-                    'title': obj.get_exhibit_title(),
-                    'content': obj.get_exhibit_description(),
-                    'date': obj.get_exhibit_date(),
-                    'distance': obj.distance,
-                    'url': obj.get_absolute_url() if hasattr(obj, 'get_absolute_url') else "#"
-                })
-            else:
-                # Fallback for models without Mixin
-                results.append({
-                    'type': config['type'],
-                    'icon': config['icon'],
-                    'title': str(obj),
-                    'content': "",
-                    'date': None,
-                    'distance': obj.distance,
-                    'url': "#"
-                })
-
-    # Sort all results by distance (closest first)
-    results.sort(key=lambda x: x['distance'])
-
-    return results[:limit]
+    for (source, pk), score in page_items:
+        item = objects_by_source[source].get(pk)
+        if item is None:
+            continue
+        config = configs_by_key[source]
+        results.append({
+            'content_type_id': ContentType.objects.get_for_model(config['model']).id,
+            'object_id': item.pk,
+            'preview_text': config['preview'](item),
+            'object_type': config['label'],
+            'score': round(score, 6),
+        })
+    return results, has_next
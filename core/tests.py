@@ -1,3 +1,26 @@
-from django.test import TestCase
+from django.test import SimpleTestCase
 
-# Create your tests here.
+from core.services import prefix_tsquery_text, reciprocal_rank_fusion
+
+
+class ReciprocalRankFusionTests(SimpleTestCase):
+    def test_items_found_by_both_legs_rank_first(self):
+        fused = reciprocal_rank_fusion([
+            [("Event", 1), ("Statement", 2), ("EmailQuote", 3)],
+            [("EmailQuote", 3), ("PDFQuote", 4)],
+        ])
+        self.assertEqual(fused[0][0], ("EmailQuote", 3))
+        self.assertEqual({key for key, _score in fused}, {
+            ("Event", 1), ("Statement", 2), ("EmailQuote", 3), ("PDFQuote", 4),
+        })
+
+    def test_empty_lists_fuse_to_nothing(self):
+        self.assertEqual(reciprocal_rank_fusion([[], []]), [])
+
+
+class PrefixTsqueryTests(SimpleTestCase):
+    def test_terms_become_prefix_conjunction(self):
+        self.assertEqual(prefix_tsquery_text("garde partag"), "garde:* & partag:*")
+
+    def test_punctuation_only_query_is_not_searchable(self):
+        self.assertIsNone(prefix_tsquery_text("'&|!"))
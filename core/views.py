@@ -6,7 +6,7 @@ from pdf_manager.models import PDFDocument
 from email_manager.models import Email
 from document_manager.models import Document
 from case_manager.models import LegalCase
-from case_manager.services import rebuild_global_exhibits
+from case_manager.services import rebuild_global_exhibits, sync_global_exhibits
 from .services import global_semantic_search
 
 def index(request):
@@ -117,9 +117,12 @@ class GenerateGlobalTimelineView(View):
             title="MASTER ARCHIVE - ALL EVIDENCE"
         )
         
-        # 2. Run the rebuild service
+        # 2. Bring the archive up to date (?full=1 forces a complete rebuild)
         try:
-            count = rebuild_global_exhibits(master_case.pk)
+            if request.GET.get('full'):
+                count = rebuild_global_exhibits(master_case.pk)
+            else:
+                count = sync_global_exhibits(master_case.pk)
             messages.success(request, f"Global Timeline updated! {count} items indexed.")
         except Exception as e:
             messages.error(request, f"Error generating timeline: {e}")
@@ -1,24 +1,46 @@
-
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from typing import Callable, List, Optional, Type
+from typing import Callable, Iterator, List, Optional, Tuple, Type
 
-from django.core.management.base import BaseCommand
-from django.db import transaction
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
 from tqdm import tqdm
 
-from ai_services.services import generate_embeddings_batch
+from ai_services.encoder import encode_texts, init_worker, set_torch_threads
+from ai_services.models import EmbeddingChunk
+from ai_services.services import (
+    embedding_fingerprint,
+    generate_chunked_embeddings_batch,
+    generate_embeddings_batch,
+)
 from document_manager.models import Statement, Document
 from email_manager.models import Quote as EmailQuote, Email
 from pdf_manager.models import Quote as PdfQuote, PDFDocument
 from events.models import Event
 from photos.models import PhotoDocument
 
+MODE_MISSING = "missing"
+MODE_CHANGED = "changed"
+MODE_ALL = "all"
+
+# Marks the end of a stage's input queue.
+_END = object()
+
 
 @dataclass
 class ModelConfig:
     model: Type
     text_getter: Callable[[object], Optional[str]]
     label: str
+    # Columns read by text_getter; only these are loaded when scanning rows.
+    text_fields: Tuple[str, ...] = ()
+    # Long texts: embed passage by passage (EmbeddingChunk) and pool.
+    chunked: bool = False
 
 
 class Command(BaseCommand):
@@ -27,19 +49,73 @@ class Command(BaseCommand):
     )
 
     def add_arguments(self, parser):
-        parser.add_argument("--chunk-size", type=int, default=250)
-        parser.add_argument("--batch-size", type=int, default=32)
         parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=250,
+            help="Rows per pipeline work item (DB read and bulk_update granularity).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=32,
+            help="Forward-pass batch size passed to model.encode.",
+        )
+        parser.add_argument(
+            "--encoder-threads",
+            type=int,
+            default=None,
+            help="Chunks encoded concurrently (default: 1, or --encoder-processes).",
+        )
+        parser.add_argument(
+            "--encoder-processes",
+            type=int,
+            default=0,
+            help="Encode in N worker processes, each with its own model copy (0 = in-process).",
+        )
+        parser.add_argument(
+            "--torch-threads",
+            type=int,
+            default=None,
+            help="torch intra-op threads per encoding process.",
+        )
+        parser.add_argument("--read-queue-depth", type=int, default=4)
+        parser.add_argument("--write-queue-depth", type=int, default=4)
+        mode = parser.add_mutually_exclusive_group()
+        mode.add_argument(
             "--only-missing",
-            action="store_true",
-            default=True,
+            action="store_const",
+            const=MODE_MISSING,
+            dest="mode",
             help="Process only rows where embedding is NULL (default behavior).",
         )
+        mode.add_argument(
+            "--changed",
+            action="store_const",
+            const=MODE_CHANGED,
+            dest="mode",
+            help=(
+                "Re-embed rows whose source text fingerprint differs from the stored one "
+                "(includes missing embeddings and rows embedded before fingerprints existed)."
+            ),
+        )
+        mode.add_argument(
+            "--all",
+            action="store_const",
+            const=MODE_ALL,
+            dest="mode",
+            help="Recompute every embedding.",
+        )
+        parser.set_defaults(mode=MODE_MISSING)
 
     def handle(self, *args, **options):
         chunk_size = options["chunk_size"]
         batch_size = options["batch_size"]
-        only_missing = options["only_missing"]
+        mode = options["mode"]
+        processes = options["encoder_processes"]
+        encoder_threads = options["encoder_threads"] or max(1, processes)
+        if min(chunk_size, batch_size, encoder_threads, options["read_queue_depth"], options["write_queue_depth"]) < 1:
+            raise CommandError("Sizes, thread counts and queue depths must be positive.")
 
         configs = [
             # --- SOURCE MODELS (New) ---
@@ -47,96 +123,280 @@ class Command(BaseCommand):
                 model=Email,
                 text_getter=lambda obj: getattr(obj, "body_plain_text", None),
                 label="email_manager.Email",
+                text_fields=("body_plain_text",),
+                chunked=True,
             ),
             ModelConfig(
                 model=Event,
                 text_getter=lambda obj: getattr(obj, "explanation", None),
                 label="events.Event",
+                text_fields=("explanation",),
             ),
             ModelConfig(
                 model=PDFDocument,
                 text_getter=lambda obj: getattr(obj, "ai_analysis", None),
                 label="pdf_manager.PDFDocument",
+                text_fields=("ai_analysis",),
+                chunked=True,
             ),
             ModelConfig(
                 model=PhotoDocument,
                 text_getter=lambda obj: (getattr(obj, "ai_analysis", "") or getattr(obj, "description", "")),
                 label="photos.PhotoDocument",
+                text_fields=("ai_analysis", "description"),
             ),
             ModelConfig(
                 model=Document,
                 text_getter=lambda obj: f"{getattr(obj, 'title', '')}\n{getattr(obj, 'solemn_declaration', '')}".strip() or None,
                 label="document_manager.Document",
+                text_fields=("title", "solemn_declaration"),
             ),
             # --- FRAGMENT MODELS (Existing) ---
             ModelConfig(
                 model=EmailQuote,
                 text_getter=lambda obj: getattr(obj, "quote_text", None),
                 label="email_manager.Quote",
+                text_fields=("quote_text",),
             ),
             ModelConfig(
                 model=PdfQuote,
                 text_getter=lambda obj: getattr(obj, "quote_text", None),
                 label="pdf_manager.Quote",
+                text_fields=("quote_text",),
             ),
             ModelConfig(
                 model=Statement,
                 text_getter=lambda obj: getattr(obj, "text", None),
                 label="document_manager.Statement",
+                text_fields=("text",),
             ),
         ]
 
-        for cfg in configs:
-            self._process_model(
-                cfg=cfg,
-                chunk_size=chunk_size,
-                batch_size=batch_size,
-                only_missing=only_missing,
+        pool = None
+        encoder = None
+        if processes:
+            # spawn: forking a process that already holds DB connections and
+            # torch thread pools is unsafe.
+            pool = ProcessPoolExecutor(
+                max_workers=processes,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_worker,
+                initargs=(options["torch_threads"],),
             )
+            encoder = lambda texts, size: pool.submit(encode_texts, texts, size).result()
+        else:
+            set_torch_threads(options["torch_threads"])
+
+        started = time.perf_counter()
+        total_rows = 0
+        try:
+            for cfg in configs:
+                total_rows += self._process_model(
+                    cfg=cfg,
+                    chunk_size=chunk_size,
+                    batch_size=batch_size,
+                    mode=mode,
+                    encoder=encoder,
+                    encoder_threads=encoder_threads,
+                    read_queue_depth=options["read_queue_depth"],
+                    write_queue_depth=options["write_queue_depth"],
+                )
+        finally:
+            if pool is not None:
+                pool.shutdown()
 
-        self.stdout.write(self.style.SUCCESS("Embedding backfill completed."))
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Embedding backfill completed: {total_rows} rows in {elapsed:.1f}s "
+            f"({total_rows / elapsed if elapsed else 0:.1f} rows/s)."
+        ))
 
     def _process_model(
         self,
         cfg: ModelConfig,
         chunk_size: int,
         batch_size: int,
-        only_missing: bool,
-    ) -> None:
+        mode: str,
+        encoder: Optional[Callable] = None,
+        encoder_threads: int = 1,
+        read_queue_depth: int = 4,
+        write_queue_depth: int = 4,
+    ) -> int:
+        """
+        Runs reader -> encoders -> writer as concurrent stages connected by
+        bounded queues, so DB reads and writes overlap with encoding.
+        Returns the number of rows written.
+        """
         qs = cfg.model.objects.all().order_by("pk")
-        if only_missing:
+        if mode == MODE_MISSING:
             qs = qs.filter(embedding__isnull=True)
+        if cfg.text_fields:
+            # Never load the stored vectors: they are only ever overwritten.
+            qs = qs.only("pk", "embedding_source_hash", *cfg.text_fields)
 
         total = qs.count()
-        self.stdout.write(f"Processing {cfg.label}: {total} rows")
+        self.stdout.write(f"Processing {cfg.label}: {total} rows ({mode})")
+        if not total:
+            return 0
 
-        buffer: List[object] = []
+        read_queue: queue.Queue = queue.Queue(maxsize=read_queue_depth)
+        write_queue: queue.Queue = queue.Queue(maxsize=write_queue_depth)
+        # On failure every stage keeps draining its queue (without working)
+        # until it sees _END, so no producer can block forever.
+        failed = threading.Event()
+        errors: List[BaseException] = []
+        written = [0]
         pbar = tqdm(total=total, desc=cfg.label, unit="row")
 
-        for obj in qs.iterator(chunk_size=chunk_size):
-            buffer.append(obj)
-            if len(buffer) >= batch_size:
-                self._embed_and_update(cfg, buffer)
-                pbar.update(len(buffer))
-                buffer.clear()
+        def fail(exc):
+            errors.append(exc)
+            failed.set()
 
-        if buffer:
-            self._embed_and_update(cfg, buffer)
-            pbar.update(len(buffer))
-            buffer.clear()
+        def reader():
+            try:
+                for rows in self._iter_stale_chunks(cfg, qs, chunk_size, mode, pbar):
+                    if failed.is_set():
+                        break
+                    read_queue.put(rows)
+            except Exception as exc:
+                fail(exc)
+            finally:
+                for _ in range(encoder_threads):
+                    read_queue.put(_END)
+                connection.close()
+
+        def encode_worker():
+            try:
+                while True:
+                    rows = read_queue.get()
+                    if rows is _END:
+                        break
+                    if failed.is_set():
+                        continue
+                    try:
+                        texts = [cfg.text_getter(row) for row in rows]
+                        chunks = None
+                        if cfg.chunked:
+                            results = generate_chunked_embeddings_batch(texts, batch_size=batch_size, encoder=encoder)
+                            embeddings = [result[0] if result else None for result in results]
+                            chunks = [result[1] if result else [] for result in results]
+                        else:
+                            embeddings = generate_embeddings_batch(texts, batch_size=batch_size, encoder=encoder)
+                        write_queue.put((rows, texts, embeddings, chunks))
+                    except Exception as exc:
+                        fail(exc)
+            finally:
+                connection.close()
 
+        def writer():
+            try:
+                while True:
+                    item = write_queue.get()
+                    if item is _END:
+                        break
+                    if failed.is_set():
+                        continue
+                    try:
+                        written[0] += self._write_embeddings(cfg, *item)
+                    except Exception as exc:
+                        fail(exc)
+            finally:
+                connection.close()
+
+        started = time.perf_counter()
+        reader_thread = threading.Thread(target=reader, name=f"{cfg.label}-reader")
+        encoder_pool = [
+            threading.Thread(target=encode_worker, name=f"{cfg.label}-encoder-{i}")
+            for i in range(encoder_threads)
+        ]
+        writer_thread = threading.Thread(target=writer, name=f"{cfg.label}-writer")
+
+        writer_thread.start()
+        for thread in encoder_pool:
+            thread.start()
+        reader_thread.start()
+
+        reader_thread.join()
+        for thread in encoder_pool:
+            thread.join()
+        write_queue.put(_END)
+        writer_thread.join()
         pbar.close()
 
-    def _embed_and_update(self, cfg: ModelConfig, rows: List[object]) -> None:
-        texts = [cfg.text_getter(row) for row in rows]
-        embeddings = generate_embeddings_batch(texts)
+        if errors:
+            raise errors[0]
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"  {written[0]} row(s) embedded for {cfg.label} in {elapsed:.1f}s "
+            f"({written[0] / elapsed if elapsed else 0:.1f} rows/s)"
+        )
+        return written[0]
+
+    def _iter_stale_chunks(self, cfg: ModelConfig, qs, chunk_size: int, mode: str, pbar) -> Iterator[List[object]]:
+        buffer: List[object] = []
+        for obj in qs.iterator(chunk_size=chunk_size):
+            pbar.update(1)
+            if mode == MODE_CHANGED:
+                fingerprint = embedding_fingerprint(cfg.text_getter(obj))
+                if fingerprint == obj.embedding_source_hash:
+                    continue
+            buffer.append(obj)
+            if len(buffer) >= chunk_size:
+                yield buffer
+                buffer = []
+        if buffer:
+            yield buffer
 
+    def _write_embeddings(
+        self,
+        cfg: ModelConfig,
+        rows: List[object],
+        texts: List[Optional[str]],
+        embeddings: List[Optional[List[float]]],
+        chunks: Optional[List[list]] = None,
+    ) -> int:
         to_update = []
-        for row, emb in zip(rows, embeddings):
-            if emb is not None:
+        new_chunks = []
+        for index, (row, text, emb) in enumerate(zip(rows, texts, embeddings)):
+            fingerprint = embedding_fingerprint(text)
+            if emb is not None or (fingerprint is None and row.embedding_source_hash):
+                # Text emptied since the last run clears the stale vector;
+                # encoder failures keep the old one.
                 row.embedding = emb
+                row.embedding_source_hash = fingerprint
                 to_update.append(row)
+                if chunks is not None:
+                    new_chunks.extend(
+                        (row.pk, chunk_index, start, end, vector)
+                        for chunk_index, (start, end, vector) in enumerate(chunks[index])
+                    )
 
         if to_update:
             with transaction.atomic():
-                cfg.model.objects.bulk_update(to_update, ["embedding"], batch_size=len(to_update))
+                cfg.model.objects.bulk_update(
+                    to_update,
+                    ["embedding", "embedding_source_hash"],
+                    batch_size=len(to_update),
+                )
+                if chunks is not None:
+                    self._replace_chunks(cfg, [row.pk for row in to_update], new_chunks)
+        return len(to_update)
+
+    def _replace_chunks(self, cfg: ModelConfig, pks: List[int], new_chunks: list) -> None:
+        content_type = ContentType.objects.get_for_model(cfg.model)
+        EmbeddingChunk.objects.filter(content_type=content_type, object_id__in=pks).delete()
+        EmbeddingChunk.objects.bulk_create(
+            [
+                EmbeddingChunk(
+                    content_type=content_type,
+                    object_id=pk,
+                    chunk_index=chunk_index,
+                    start_offset=start,
+                    end_offset=end,
+                    embedding=vector,
+                )
+                for pk, chunk_index, start, end, vector in new_chunks
+            ],
+            batch_size=500,
+        )
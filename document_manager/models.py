@@ -1,5 +1,7 @@
 from django.db import models
-from pgvector.django import VectorField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+from pgvector.django import HnswIndex, VectorField
 from django.conf import settings
 from treebeard.mp_tree import MP_Node
 from django.core.exceptions import ValidationError
@@ -44,6 +46,10 @@ class Document(models.Model, ExhibitableMixin):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     embedding = VectorField(dimensions=768, null=True, blank=True)
+    embedding_source_hash = models.CharField(
+        max_length=64, null=True, blank=True, editable=False,
+        help_text="Fingerprint of the text the embedding was computed from."
+    )
     file_source = models.FileField(
         upload_to='evidence_files/',  # Changed to 'evidence_files/' for clarity
         null=True,
@@ -63,6 +69,15 @@ class Document(models.Model, ExhibitableMixin):
     class Meta:
         verbose_name = "Document"
         verbose_name_plural = "Documents"
+        indexes = [
+            HnswIndex(
+                name='document_embedding_hnsw',
+                fields=['embedding'],
+                m=16,
+                ef_construction=64,
+                opclasses=['vector_cosine_ops'],
+            ),
+        ]
 
     # --- Exhibitable Interface ---
     def get_exhibit_date(self):
@@ -84,6 +99,10 @@ class Document(models.Model, ExhibitableMixin):
 
 class Statement(models.Model):
     embedding = VectorField(dimensions=768, null=True, blank=True)
+    embedding_source_hash = models.CharField(
+        max_length=64, null=True, blank=True, editable=False,
+        help_text="Fingerprint of the text the embedding was computed from."
+    )
     """
     Represents a single, reusable block of content (an assertion, fact, or paragraph).
     """
@@ -104,6 +123,16 @@ class Statement(models.Model):
     class Meta:
         verbose_name = "Statement"
         verbose_name_plural = "Statements"
+        indexes = [
+            HnswIndex(
+                name='statement_embedding_hnsw',
+                fields=['embedding'],
+                m=16,
+                ef_construction=64,
+                opclasses=['vector_cosine_ops'],
+            ),
+            GinIndex(SearchVector('text', config='french'), name='statement_text_fts'),
+        ]
 
 class LibraryNode(MP_Node):
     """
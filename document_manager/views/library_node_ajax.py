@@ -4,18 +4,13 @@ from django.shortcuts import get_object_or_404
 from django.db import transaction, models
 from django.template.loader import render_to_string
 from django.contrib.contenttypes.models import ContentType
-from django.db.models import Q
 import logging
 
 from ..models import LibraryNode, Document, Statement
 from ..forms.manual_forms import LibraryNodeCreateForm
 
-# Models from other apps to be searched
-from argument_manager.models import TrameNarrative
-from email_manager.models import Quote as EmailQuote
-from pdf_manager.models import Quote as PDFQuote
-from events.models import Event
-from photos.models import PhotoDocument
+# Federated lexical + vector search over the evidence models
+from core.services import hybrid_evidence_search
 
 logger = logging.getLogger(__name__)
 
@@ -23,89 +18,36 @@ logger = logging.getLogger(__name__)
 def search_evidence_ajax(request):
     """
     Performs a federated search across multiple models for a given query.
+    Full-text (French tsvector) and vector similarity results are fused into
+    one ranking (reciprocal-rank fusion) and returned one page at a time.
     Returns results in a standardized JSON format for the 'Link Existing Evidence' modal.
     """
     query = request.GET.get('query', '').strip()
-    results = []
-    
+
     logger.info(f"Starting evidence search for query: '{query}'")
 
     RESULT_LIMIT = 10
 
     if not query or len(query) < 2:
         logger.warning("Query too short, returning empty results.")
-        return JsonResponse({'results': []})
-
-    content_types = {
-        'Statement': ContentType.objects.get_for_model(Statement),
-        'TrameNarrative': ContentType.objects.get_for_model(TrameNarrative),
-        'EmailQuote': ContentType.objects.get_for_model(EmailQuote),
-        'PDFQuote': ContentType.objects.get_for_model(PDFQuote),
-        'Event': ContentType.objects.get_for_model(Event),
-        'PhotoDocument': ContentType.objects.get_for_model(PhotoDocument),
-    }
-
-    try:
-        reproduced_statements = Statement.objects.filter(is_user_created=False, text__icontains=query)[:RESULT_LIMIT]
-        for item in reproduced_statements:
-            results.append({
-                'content_type_id': content_types['Statement'].id, 'object_id': item.id,
-                'preview_text': f"'{item.text[:80]}...'", 'object_type': 'Reproduced Text'
-            })
-    except Exception as e:
-        logger.error(f"Error searching Statements: {e}")
+        return JsonResponse({'results': [], 'page': 1, 'has_next': False})
 
     try:
-        trames = TrameNarrative.objects.filter(Q(titre__icontains=query) | Q(resume__icontains=query))[:RESULT_LIMIT]
-        for item in trames:
-            results.append({
-                'content_type_id': content_types['TrameNarrative'].id, 'object_id': item.id,
-                'preview_text': f"{item.titre}: {item.resume[:60]}...", 'object_type': 'Narrative'
-            })
-    except Exception as e:
-        logger.error(f"Error searching TrameNarratives: {e}")
+        page = int(request.GET.get('page', 1))
+    except ValueError:
+        page = 1
+    # Vector leg is opt-out: pass semantic=0 for a purely lexical lookup.
+    semantic = request.GET.get('semantic', '1') != '0'
 
     try:
-        email_quotes = EmailQuote.objects.filter(quote_text__icontains=query).select_related('email')[:RESULT_LIMIT]
-        for item in email_quotes:
-            results.append({
-                'content_type_id': content_types['EmailQuote'].id, 'object_id': item.id,
-                'preview_text': f"Email from '{item.email.subject}': '{item.quote_text[:60]}...'", 'object_type': 'Email Quote'
-            })
-    except Exception as e:
-        logger.error(f"Error searching EmailQuotes: {e}")
-
-    try:
-        pdf_quotes = PDFQuote.objects.filter(quote_text__icontains=query).select_related('pdf_document')[:RESULT_LIMIT]
-        for item in pdf_quotes:
-            results.append({
-                'content_type_id': content_types['PDFQuote'].id, 'object_id': item.id,
-                'preview_text': f"PDF '{item.pdf_document.title}': '{item.quote_text[:60]}...'", 'object_type': 'PDF Quote'
-            })
-    except Exception as e:
-        logger.error(f"Error searching PDFQuotes: {e}")
-
-    try:
-        events = Event.objects.filter(explanation__icontains=query)[:RESULT_LIMIT]
-        for item in events:
-            results.append({
-                'content_type_id': content_types['Event'].id, 'object_id': item.id,
-                'preview_text': f"Event on {item.date.strftime('%Y-%m-%d')}: {item.explanation[:60]}...", 'object_type': 'Event'
-            })
-    except Exception as e:
-        logger.error(f"Error searching Events: {e}")
-        
-    try:
-        photo_documents = PhotoDocument.objects.filter(Q(title__icontains=query) | Q(description__icontains=query))[:RESULT_LIMIT]
-        for item in photo_documents:
-            results.append({
-                'content_type_id': content_types['PhotoDocument'].id, 'object_id': item.id,
-                'preview_text': f"Photo Doc: '{item.title}'", 'object_type': 'Photo Document'
-            })
+        results, has_next = hybrid_evidence_search(
+            query, page=page, page_size=RESULT_LIMIT, semantic=semantic
+        )
     except Exception as e:
-        logger.error(f"Error searching PhotoDocuments: {e}")
+        logger.error(f"Error during hybrid evidence search: {e}", exc_info=True)
+        return JsonResponse({'results': [], 'page': page, 'has_next': False, 'error': 'search_failed'}, status=500)
 
-    return JsonResponse({'results': results})
+    return JsonResponse({'results': results, 'page': max(1, page), 'has_next': has_next})
 
 
 @require_POST
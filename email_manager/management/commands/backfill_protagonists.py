@@ -25,7 +25,7 @@ class Command(BaseCommand):
                     sender_protagonist = get_or_create_protagonist_from_email_string(email.sender)
                     if sender_protagonist:
                         email.sender_protagonist = sender_protagonist
-                        email.save(update_fields=['sender_protagonist'])
+                        email.save(update_fields=['sender_protagonist', 'updated_at'])
                         updated_count += 1
 
                 # --- Process Recipients ---
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-17 02:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('email_manager', '0007_quote_email_quote_text_fts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='email',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
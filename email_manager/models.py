@@ -1,5 +1,8 @@
 from django.db import models
-from pgvector.django import VectorField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+from django.contrib.contenttypes.fields import GenericRelation
+from pgvector.django import HnswIndex, VectorField
 from django.urls import reverse
 from protagonist_manager.models import Protagonist
 from core.mixins import ExhibitableMixin
@@ -44,8 +47,14 @@ class Email(models.Model, ExhibitableMixin):
     date_sent = models.DateTimeField(blank=True, null=True)
     body_plain_text = models.TextField(blank=True, null=True)
     embedding = VectorField(dimensions=768, null=True, blank=True)
+    embedding_source_hash = models.CharField(
+        max_length=64, null=True, blank=True, editable=False,
+        help_text="Fingerprint of the text the embedding was computed from."
+    )
+    embedding_chunks = GenericRelation('ai_services.EmbeddingChunk')
     eml_file_path = models.CharField(max_length=1024)
     saved_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     eml_file = models.FileField(upload_to='emails/', blank=True, null=True)
 
     sender_protagonist = models.ForeignKey(
@@ -83,6 +92,15 @@ class Email(models.Model, ExhibitableMixin):
         verbose_name = "Email"
         verbose_name_plural = "Emails"
         ordering = ['date_sent']
+        indexes = [
+            HnswIndex(
+                name='email_embedding_hnsw',
+                fields=['embedding'],
+                m=16,
+                ef_construction=64,
+                opclasses=['vector_cosine_ops'],
+            ),
+        ]
 
     # --- Exhibitable Interface ---
     def get_exhibit_date(self):
@@ -104,6 +122,10 @@ class Email(models.Model, ExhibitableMixin):
 
 class Quote(models.Model):
     embedding = VectorField(dimensions=768, null=True, blank=True)
+    embedding_source_hash = models.CharField(
+        max_length=64, null=True, blank=True, editable=False,
+        help_text="Fingerprint of the text the embedding was computed from."
+    )
     """
     A specific quote extracted from an email.
     """
@@ -152,3 +174,13 @@ class Quote(models.Model):
         verbose_name = "Quote"
         verbose_name_plural = "Quotes"
         ordering = ['-created_at']
+        indexes = [
+            HnswIndex(
+                name='email_quote_embedding_hnsw',
+                fields=['embedding'],
+                m=16,
+                ef_construction=64,
+                opclasses=['vector_cosine_ops'],
+            ),
+            GinIndex(SearchVector('quote_text', config='french'), name='email_quote_text_fts'),
+        ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.4 on 2026-10-17 01:08
+
+import pgvector.django.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('email_manager', '0005_email_email_embedding_hnsw_and_more'),
+        ('events', '0003_event_embedding'),
+        ('photos', '0003_photodocument_embedding'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=pgvector.django.indexes.HnswIndex(ef_construction=64, fields=['embedding'], m=16, name='event_embedding_hnsw', opclasses=['vector_cosine_ops']),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-17 01:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0004_event_event_embedding_hnsw'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='embedding_source_hash',
+            field=models.CharField(blank=True, editable=False, help_text='Fingerprint of the text the embedding was computed from.', max_length=64, null=True),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.4 on 2026-10-17 01:15
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('email_manager', '0007_quote_email_quote_text_fts'),
+        ('events', '0005_event_embedding_source_hash'),
+        ('photos', '0005_photodocument_embedding_source_hash'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.SearchVector('explanation', config='french'), name='event_explanation_fts'),
+        ),
+    ]
@@ -1,5 +1,7 @@
 from django.db import models
-from pgvector.django import VectorField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+from pgvector.django import HnswIndex, VectorField
 from django.urls import reverse
 from email_manager.models import Email
 from photos.models import Photo
@@ -8,6 +10,10 @@ from datetime import datetime
 
 class Event(models.Model, ExhibitableMixin):
     embedding = VectorField(dimensions=768, null=True, blank=True)
+    embedding_source_hash = models.CharField(
+        max_length=64, null=True, blank=True, editable=False,
+        help_text="Fingerprint of the text the embedding was computed from."
+    )
     parent = models.ForeignKey(
         'self',
         on_delete=models.CASCADE,
@@ -41,12 +47,23 @@ class Event(models.Model, ExhibitableMixin):
         help_text="A collection of photos related to this event.",
         through='SupportingEvidenceLinkedPhotos',
     )
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = "Event"
         verbose_name_plural = "Events"
         db_table = 'SupportingEvidence_supportingevidence' 
         ordering = ['date']
+        indexes = [
+            HnswIndex(
+                name='event_embedding_hnsw',
+                fields=['embedding'],
+                m=16,
+                ef_construction=64,
+                opclasses=['vector_cosine_ops'],
+            ),
+            GinIndex(SearchVector('explanation', config='french'), name='event_explanation_fts'),
+        ]
 
     # --- Exhibitable Interface ---
     def get_exhibit_date(self):
@@ -77,7 +77,7 @@ def ajax_update_explanation(request, pk):
         new_explanation = data.get('explanation', '')
 
         event.explanation = new_explanation
-        event.save(update_fields=['explanation'])
+        event.save(update_fields=['explanation', 'updated_at'])
 
         return JsonResponse({
             'success': True,
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-17 02:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('googlechat_manager', '0003_alter_chatsequence_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatsequence',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
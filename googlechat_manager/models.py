@@ -62,6 +62,7 @@ class ChatSequence(models.Model):
     title = models.CharField(max_length=255)
     messages = models.ManyToManyField(ChatMessage, related_name='sequences')
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     start_date = models.DateTimeField(null=True, blank=True)
     end_date = models.DateTimeField(null=True, blank=True)
@@ -78,7 +79,7 @@ class ChatSequence(models.Model):
             )
             self.start_date = aggregates.get('start')
             self.end_date = aggregates.get('end')
-            self.save(update_fields=['start_date', 'end_date'])
+            self.save(update_fields=['start_date', 'end_date', 'updated_at'])
 
     def __str__(self):
         return self.title
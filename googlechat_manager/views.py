@@ -80,7 +80,7 @@ def update_sequence_ajax(request, pk):
     
     sequence = get_object_or_404(ChatSequence, pk=pk)
     sequence.title = title
-    sequence.save(update_fields=['title'])
+    sequence.save(update_fields=['title', 'updated_at'])
     
     msgs = ChatMessage.objects.filter(id__in=message_ids)
     sequence.messages.set(msgs)
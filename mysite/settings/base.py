@@ -46,6 +46,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'django.contrib.sites', # Required by django-allauth
+    'django.contrib.postgres',
 
     'django_extensions',
     'django_bootstrap5',
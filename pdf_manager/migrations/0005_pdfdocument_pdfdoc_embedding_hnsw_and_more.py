@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-17 01:08
+
+import pgvector.django.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pdf_manager', '0004_pdfdocument_embedding'),
+        ('protagonist_manager', '0002_protagonist_linkedin_url'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='pdfdocument',
+            index=pgvector.django.indexes.HnswIndex(ef_construction=64, fields=['embedding'], m=16, name='pdfdoc_embedding_hnsw', opclasses=['vector_cosine_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='quote',
+            index=pgvector.django.indexes.HnswIndex(ef_construction=64, fields=['embedding'], m=16, name='pdf_quote_embedding_hnsw', opclasses=['vector_cosine_ops']),
+        ),
+    ]
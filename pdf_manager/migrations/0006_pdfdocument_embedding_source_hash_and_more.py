@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-17 01:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pdf_manager', '0005_pdfdocument_pdfdoc_embedding_hnsw_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pdfdocument',
+            name='embedding_source_hash',
+            field=models.CharField(blank=True, editable=False, help_text='Fingerprint of the text the embedding was computed from.', max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='quote',
+            name='embedding_source_hash',
+            field=models.CharField(blank=True, editable=False, help_text='Fingerprint of the text the embedding was computed from.', max_length=64, null=True),
+        ),
+    ]
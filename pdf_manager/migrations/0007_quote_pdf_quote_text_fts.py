@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-17 01:15
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pdf_manager', '0006_pdfdocument_embedding_source_hash_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='quote',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.SearchVector('quote_text', config='french'), name='pdf_quote_text_fts'),
+        ),
+    ]
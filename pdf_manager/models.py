@@ -1,5 +1,8 @@
 from django.db import models
-from pgvector.django import VectorField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+from django.contrib.contenttypes.fields import GenericRelation
+from pgvector.django import HnswIndex, VectorField
 from django.core.validators import FileExtensionValidator
 from django.urls import reverse
 from core.mixins import ExhibitableMixin
@@ -54,11 +57,17 @@ class PDFDocument(models.Model, ExhibitableMixin):
         auto_now_add=True,
         help_text="The date and time the document was uploaded."
     )
+    updated_at = models.DateTimeField(auto_now=True)
     ai_analysis = models.TextField(
         blank=True, null=True,
         help_text="Analyse forensique et résumé généré par l'IA pour économiser les tokens multimodaux."
     )
     embedding = VectorField(dimensions=768, null=True, blank=True)
+    embedding_source_hash = models.CharField(
+        max_length=64, null=True, blank=True, editable=False,
+        help_text="Fingerprint of the text the embedding was computed from."
+    )
+    embedding_chunks = GenericRelation('ai_services.EmbeddingChunk')
 
     def __str__(self):
         return self.title
@@ -73,6 +82,15 @@ class PDFDocument(models.Model, ExhibitableMixin):
         verbose_name = "PDF Document"
         verbose_name_plural = "PDF Documents"
         ordering = ['-document_date']
+        indexes = [
+            HnswIndex(
+                name='pdfdoc_embedding_hnsw',
+                fields=['embedding'],
+                m=16,
+                ef_construction=64,
+                opclasses=['vector_cosine_ops'],
+            ),
+        ]
 
     # --- Exhibitable Interface ---
     def get_exhibit_date(self):
@@ -94,6 +112,10 @@ class PDFDocument(models.Model, ExhibitableMixin):
 
 class Quote(models.Model):
     embedding = VectorField(dimensions=768, null=True, blank=True)
+    embedding_source_hash = models.CharField(
+        max_length=64, null=True, blank=True, editable=False,
+        help_text="Fingerprint of the text the embedding was computed from."
+    )
     pdf_document = models.ForeignKey(PDFDocument, on_delete=models.CASCADE, related_name='quotes')
     quote_text = models.TextField()
     page_number = models.PositiveIntegerField(
@@ -129,3 +151,13 @@ class Quote(models.Model):
         verbose_name = "PDF Quote"
         verbose_name_plural = "PDF Quotes"
         ordering = ['-created_at']
+        indexes = [
+            HnswIndex(
+                name='pdf_quote_embedding_hnsw',
+                fields=['embedding'],
+                m=16,
+                ef_construction=64,
+                opclasses=['vector_cosine_ops'],
+            ),
+            GinIndex(SearchVector('quote_text', config='french'), name='pdf_quote_text_fts'),
+        ]
@@ -136,7 +136,7 @@ def ajax_update_pdf_quote(request, pk):
         new_text = data.get('quote_text', '')
 
         quote.quote_text = new_text
-        quote.save(update_fields=['quote_text'])
+        quote.save(update_fields=['quote_text', 'updated_at'])
 
         return JsonResponse({
             'success': True,
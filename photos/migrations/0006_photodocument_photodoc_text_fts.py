@@ -0,0 +1,20 @@
+# Generated by Django 5.2.4 on 2026-10-17 01:15
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('photos', '0005_photodocument_embedding_source_hash'),
+        ('protagonist_manager', '0002_protagonist_linkedin_url'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='photodocument',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.SearchVector('title', 'description', config='french'), name='photodoc_text_fts'),
+        ),
+    ]
@@ -1,7 +1,9 @@
 # your_project_root/photos/models.py
 
 from django.db import models
-from pgvector.django import VectorField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+from pgvector.django import HnswIndex, VectorField
 from django.urls import reverse
 from django.utils import timezone
 from django.db.models import Min
@@ -115,16 +117,34 @@ class PhotoDocument(models.Model, ExhibitableMixin):
         help_text="Description détaillée du contenu visuel générée par l'IA."
     )
     embedding = VectorField(dimensions=768, null=True, blank=True)
+    embedding_source_hash = models.CharField(
+        max_length=64, null=True, blank=True, editable=False,
+        help_text="Fingerprint of the text the embedding was computed from."
+    )
 
     class Meta:
         ordering = ['-created_at']
         verbose_name = "Photo Document"
         verbose_name_plural = "Photo Documents"
+        indexes = [
+            HnswIndex(
+                name='photodoc_embedding_hnsw',
+                fields=['embedding'],
+                m=16,
+                ef_construction=64,
+                opclasses=['vector_cosine_ops'],
+            ),
+            GinIndex(SearchVector('title', 'description', config='french'), name='photodoc_text_fts'),
+        ]
 
     # --- Exhibitable Interface ---
     def get_exhibit_date(self):
         # Prefer the date of the oldest photo in the document
-        min_date = self.photos.aggregate(Min('datetime_original'))['datetime_original__min']
+        if hasattr(self, 'first_photo_date'):
+            # Annotated by bulk loaders to avoid one aggregate per document
+            min_date = self.first_photo_date
+        else:
+            min_date = self.photos.aggregate(Min('datetime_original'))['datetime_original__min']
         return min_date or self.created_at
 
     def get_exhibit_title(self):
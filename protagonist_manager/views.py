@@ -3,6 +3,7 @@ from django.views import View
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.contrib import messages
 from django.db import transaction
+from django.utils import timezone
 from django.urls import reverse_lazy
 from django.http import JsonResponse
 from django.views.decorators.http import require_POST
@@ -93,10 +94,10 @@ class MergeProtagonistView(View):
         try:
             with transaction.atomic():
                 # 1. Re-assign Document authors
-                Document.objects.filter(author=duplicate).update(author=original)
+                Document.objects.filter(author=duplicate).update(author=original, updated_at=timezone.now())
 
                 # 2. Re-assign Email senders
-                Email.objects.filter(sender_protagonist=duplicate).update(sender_protagonist=original)
+                Email.objects.filter(sender_protagonist=duplicate).update(sender_protagonist=original, updated_at=timezone.now())
 
                 # 3. Re-assign Email recipients (ManyToManyField)
                 for email in Email.objects.filter(recipient_protagonists=duplicate):
@@ -107,10 +108,10 @@ class MergeProtagonistView(View):
                 duplicate.emails.all().update(protagonist=original)
 
                 # 5. Re-assign PDFDocument authors
-                PDFDocument.objects.filter(author=duplicate).update(author=original)
+                PDFDocument.objects.filter(author=duplicate).update(author=original, updated_at=timezone.now())
                 
                 # 6. Re-assign PhotoDocument authors
-                PhotoDocument.objects.filter(author=duplicate).update(author=original)
+                PhotoDocument.objects.filter(author=duplicate).update(author=original, updated_at=timezone.now())
 
                 # 7. Delete the duplicate protagonist
                 duplicate.delete()
@@ -4,6 +4,7 @@ from django.urls import reverse_lazy
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.contrib import messages
 from django.db import transaction
+from django.utils import timezone
 from django.views import View
 from django.db.models import Count, Q
 
@@ -207,14 +208,14 @@ class MergeProtagonistView(View):
 
         try:
             with transaction.atomic():
-                Document.objects.filter(author=duplicate).update(author=original)
-                Email.objects.filter(sender_protagonist=duplicate).update(sender_protagonist=original)
+                Document.objects.filter(author=duplicate).update(author=original, updated_at=timezone.now())
+                Email.objects.filter(sender_protagonist=duplicate).update(sender_protagonist=original, updated_at=timezone.now())
                 for email in Email.objects.filter(recipient_protagonists=duplicate):
                     email.recipient_protagonists.add(original)
                     email.recipient_protagonists.remove(duplicate)
                 duplicate.emails.all().update(protagonist=original)
-                PDFDocument.objects.filter(author=duplicate).update(author=original)
-                PhotoDocument.objects.filter(author=duplicate).update(author=original)
+                PDFDocument.objects.filter(author=duplicate).update(author=original, updated_at=timezone.now())
+                PhotoDocument.objects.filter(author=duplicate).update(author=original, updated_at=timezone.now())
                 duplicate.delete()
                 messages.success(request, f"Successfully merged '{duplicate.get_full_name()}' into '{original.get_full_name()}'.")
         except Exception as e: